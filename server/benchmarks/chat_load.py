@@ -0,0 +1,329 @@
+"""채팅 스트리밍 부하/지연 벤치마크 (가짜 provider, 오프라인)
+
+N개의 동시 SSE 클라이언트가 /api/chat/{chat_id}로 대화를 이어가며 TTFT, 토큰
+처리량, 요청 지연 p50/p99, DB 쓰기 처리량, RSS를 측정한다. in-process 모드는
+ASGI 앱을 직접 호출하고, uvicorn 모드는 별도 프로세스로 서버를 띄워 HTTP로 요청한다.
+
+    cd server && python -m benchmarks.chat_load --clients 16 --requests 5 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+PROMPT = "벤치마크 질문 {client}-{turn}: 스트리밍 응답을 생성해 주세요."
+
+# (경로, JSON 본문) -> (요청 시작 기준 경과 초, body chunk) 목록
+Transport = Callable[[str, dict], AsyncIterator[tuple[float, bytes]]]
+
+
+@dataclass
+class RequestResult:
+    ttft: float | None = None
+    latency: float = 0.0
+    tokens: int = 0
+    chat_id: str | None = None
+    error: str | None = None
+
+
+@dataclass
+class RunStats:
+    results: list[RequestResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    messages_written: int = 0
+    rss_mb: float | None = None
+
+
+def parse_sse(frames: list[tuple[float, bytes]]) -> RequestResult:
+    """SSE body chunk에서 첫 content frame 시각, 토큰 수, chat_id 추출"""
+    result = RequestResult()
+    text = b"".join(chunk for _, chunk in frames).decode()
+    elapsed = 0.0
+    for at, chunk in frames:
+        elapsed = at
+        if result.ttft is None and b'data: {"content"' in chunk:
+            result.ttft = at
+    result.latency = elapsed
+
+    event = None
+    for line in text.split("\n"):
+        if line.startswith("event: "):
+            event = line[7:].strip()
+        elif line.startswith("data: ") and event:
+            data = json.loads(line[6:])
+            if event == "chat_created":
+                result.chat_id = data["chat_id"]
+            elif event == "stats":
+                result.tokens = data["tokens"]
+            event = None
+    if "data: [DONE]" not in text:
+        result.error = "stream ended without [DONE]"
+    return result
+
+
+async def run_client(transport: Transport, client: int, turns: int) -> list[RequestResult]:
+    from benchmarks.fake_provider import FAKE_MODEL
+
+    results = []
+    chat_id = "new"
+    for turn in range(turns):
+        body = {"message": PROMPT.format(client=client, turn=turn), "model": FAKE_MODEL}
+        try:
+            frames = [frame async for frame in transport(f"/api/chat/{chat_id}", body)]
+            result = parse_sse(frames)
+        except Exception as e:
+            result = RequestResult(error=f"{type(e).__name__}: {e}")
+        chat_id = result.chat_id or chat_id
+        results.append(result)
+    return results
+
+
+async def run_load(transport: Transport, clients: int, turns: int) -> RunStats:
+    started = time.perf_counter()
+    per_client = await asyncio.gather(
+        *[run_client(transport, client, turns) for client in range(clients)]
+    )
+    stats = RunStats(wall_seconds=time.perf_counter() - started)
+    stats.results = [result for results in per_client for result in results]
+    return stats
+
+
+def count_messages(db_path: Path) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+
+def rss_mb(pid: int | None = None) -> float | None:
+    """현재 RSS (MB, /proc가 없으면 자기 프로세스의 최대 RSS)"""
+    status = Path(f"/proc/{pid or 'self'}/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    if pid is None:
+        # Linux는 KiB, macOS는 byte 단위
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return None
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(mode: str, stats: RunStats) -> dict:
+    ok = [r for r in stats.results if r.error is None]
+    ttfts = [r.ttft for r in ok if r.ttft is not None]
+    latencies = [r.latency for r in ok]
+    tokens = sum(r.tokens for r in ok)
+
+    def ms(value: float | None) -> float | None:
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        "mode": mode,
+        "requests": len(stats.results),
+        "errors": len(stats.results) - len(ok),
+        "wall_seconds": round(stats.wall_seconds, 2),
+        "requests_per_sec": round(len(ok) / stats.wall_seconds, 1),
+        "ttft_ms": {
+            "p50": ms(percentile(ttfts, 0.5)),
+            "p99": ms(percentile(ttfts, 0.99)),
+            "mean": ms(statistics.fmean(ttfts)) if ttfts else None,
+        },
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 0.5)),
+            "p99": ms(percentile(latencies, 0.99)),
+        },
+        "tokens_per_sec": round(tokens / stats.wall_seconds, 1),
+        "db_writes_per_sec": round(stats.messages_written / stats.wall_seconds, 1),
+        "rss_mb": stats.rss_mb,
+        "first_error": next((r.error for r in stats.results if r.error), None),
+    }
+
+
+def asgi_transport(app) -> Transport:
+    """ASGI 앱을 직접 호출하고 body chunk마다 도착 시각을 기록"""
+
+    async def request(path: str, body: dict) -> AsyncIterator[tuple[float, bytes]]:
+        payload = json.dumps(body).encode()
+        queue: asyncio.Queue = asyncio.Queue()
+        started = time.perf_counter()
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            # 클라이언트는 끊지 않음 (응답이 끝나면 서버 쪽에서 대기를 취소)
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                await queue.put((time.perf_counter() - started, message["body"]))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"content-type", b"application/json"), (b"host", b"bench")],
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+        }
+        task = asyncio.create_task(app(scope, receive, send))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        while (item := await queue.get()) is not None:
+            yield item
+        await task
+
+    return request
+
+
+def http_transport(client: httpx.AsyncClient) -> Transport:
+    async def request(path: str, body: dict) -> AsyncIterator[tuple[float, bytes]]:
+        started = time.perf_counter()
+        async with client.stream("POST", path, json=body) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_raw():
+                yield time.perf_counter() - started, chunk
+
+    return request
+
+
+async def bench_inprocess(args, config, workdir: Path) -> dict:
+    db_path = workdir / "inprocess.db"
+    os.environ.update(config.to_env())
+    from benchmarks.fake_app import app
+    from services.scheduler import admission_scheduler
+
+    admission_scheduler.configure("fake", max_in_flight=args.max_in_flight)
+    async with app.router.lifespan_context(app):
+        stats = await run_load(asgi_transport(app), args.clients, args.requests)
+    stats.messages_written = count_messages(db_path)
+    stats.rss_mb = rss_mb()
+    return summarize("inprocess", stats)
+
+
+async def bench_uvicorn(args, config, workdir: Path) -> dict:
+    db_path = workdir / "uvicorn.db"
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = {
+        **os.environ,
+        **config.to_env(),
+        "OTEMEE_DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+        "OTEMEE_CLOUD_MAX_IN_FLIGHT": str(args.max_in_flight),
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "benchmarks.fake_app:app",
+        "--port", str(port), "--log-level", "warning",
+    ]  # fmt: skip
+    server = subprocess.Popen(command, cwd=SERVER_DIR, env=env)
+    try:
+        limits = httpx.Limits(
+            max_connections=args.clients, max_keepalive_connections=args.clients
+        )
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits
+        ) as client:
+            await _wait_ready(client, server)
+            stats = await run_load(http_transport(client), args.clients, args.requests)
+        stats.rss_mb = rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    stats.messages_written = count_messages(db_path)
+    return summarize("uvicorn", stats)
+
+
+async def _wait_ready(
+    client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 30
+):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise TimeoutError("uvicorn did not become ready")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn", "both"], default="both")
+    parser.add_argument("--clients", type=int, default=16, help="동시 SSE 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=5, help="클라이언트당 요청 수")
+    parser.add_argument("--tokens", type=int, default=200, help="응답당 토큰 수")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="초당 토큰 수")
+    parser.add_argument("--chunk-size", type=int, default=1, help="chunk당 토큰 수")
+    parser.add_argument("--first-token-delay", type=float, default=0.05)
+    parser.add_argument(
+        "--max-in-flight", type=int, default=64, help="가짜 provider 동시 실행 한도"
+    )
+    parser.add_argument("--output", type=Path, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        # config/database는 import 시점에 환경 변수를 읽으므로 앱 코드 import 전에 설정
+        os.environ["OTEMEE_DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir / 'inprocess.db'}"
+        os.environ["OTEMEE_RESPONSE_CACHE"] = "0"
+        from benchmarks.fake_provider import FakeProviderConfig
+
+        config = FakeProviderConfig(
+            token_rate=args.token_rate,
+            chunk_size=args.chunk_size,
+            first_token_delay=args.first_token_delay,
+            tokens=args.tokens,
+        )
+        if args.mode in ("uvicorn", "both"):
+            results.append(await bench_uvicorn(args, config, workdir))
+        if args.mode in ("inprocess", "both"):
+            results.append(await bench_inprocess(args, config, workdir))
+
+    report = {
+        "benchmark": "chat_load",
+        "clients": args.clients,
+        "requests_per_client": args.requests,
+        "provider": vars(config),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
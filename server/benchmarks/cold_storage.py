@@ -0,0 +1,231 @@
+"""cold storage 압축률과 hot/cold 채팅 조회 지연 리포트
+
+임시 DB에 최근 채팅(hot)과 90일 지난 채팅(cold)을 만들고 압축 전후의 DB 크기
+(검색 색인 포함)와 get_chat과 같은 조회(채팅 + 메시지 로드 후 응답 직렬화)의
+지연을 비교한다.
+codec/dictionary 조합별 압축률과 풀기 속도도 메모리에서 따로 잰다. 메시지는
+마크다운/코드가 섞인 합성 텍스트라 실제 대화보다 압축이 잘 될 수 있다.
+
+    cd server && python -m benchmarks.cold_storage --chats 200 --output cold.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 서버 모듈을 import하기 전에 임시 DB를 지정
+_TMP = tempfile.TemporaryDirectory()
+DB_PATH = Path(_TMP.name) / "cold.db"
+os.environ["OTEMEE_DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["OTEMEE_DB_MAINTENANCE_IDLE"] = "0"
+
+from sqlalchemy import insert, select, text  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from config import COLD_DICT_SIZE  # noqa: E402
+from database import async_session, engine, init_db  # noqa: E402
+from models.chat import Chat, Message  # noqa: E402
+from schemas.chat import ChatDetailResponse  # noqa: E402
+from services import compression  # noqa: E402
+from services.cold_storage import ColdStorage  # noqa: E402
+from services.maintenance import db_maintenance  # noqa: E402
+from services.search import init_search_index  # noqa: E402
+
+WORDS = (
+    "the a to of and in is it for that this with you can use function value return "
+    "data list error file server request response model async await python code "
+    "example step first then call result type string number default config 설정 "
+    "함수 값 반환 예제 코드 서버 요청 응답 모델 데이터 오류 파일 사용 먼저 다음 경우"
+).split()
+# codec 비교에 쓰는 dictionary id (DB의 id와 겹치지 않게 최댓값 근처)
+BENCH_DICTIONARY_ID = 0xFFFFFFFF
+CODE = (
+    "```python\nasync def handler(request):\n    data = await request.json()\n"
+    "    return {\"status\": \"ok\", \"items\": data.get(\"items\", [])}\n```"
+)
+
+
+def synthetic_reply(rng: random.Random) -> str:
+    """마크다운 제목/목록/코드 블록이 섞인 assistant 응답 (수백 바이트 ~ 수 KB)"""
+    parts = [f"## {' '.join(rng.choices(WORDS, k=4))}"]
+    for _ in range(rng.randint(2, 24)):
+        kind = rng.random()
+        if kind < 0.5:
+            parts.append(" ".join(rng.choices(WORDS, k=rng.randint(20, 80))) + ".")
+        elif kind < 0.8:
+            parts.append(
+                "\n".join(f"- {' '.join(rng.choices(WORDS, k=8))}" for _ in range(4))
+            )
+        else:
+            parts.append(CODE.replace("items", rng.choice(WORDS)))
+    return "\n\n".join(parts)
+
+
+async def seed(chats: int, messages: int, rng: random.Random) -> tuple[list, list]:
+    """hot(방금 연) 채팅과 cold(90일 전) 채팅을 반씩 생성"""
+    now = datetime.utcnow()
+    hot, cold, rows = [], [], []
+    for i in range(chats):
+        created = now if i % 2 else now - timedelta(days=90)
+        chat_id = str(uuid.uuid4())
+        (hot if i % 2 else cold).append(
+            {"id": chat_id, "title": "bench", "created_at": created,
+             "updated_at": created, "opened_at": created}
+        )  # fmt: skip
+        for j in range(messages):
+            role = "assistant" if j % 2 else "user"
+            content = synthetic_reply(rng) if j % 2 else " ".join(rng.choices(WORDS, k=30))
+            rows.append(
+                {"id": str(uuid.uuid4()), "chat_id": chat_id, "role": role,
+                 "content": content, "created_at": created + timedelta(seconds=j)}
+            )  # fmt: skip
+    async with async_session() as db:
+        await db.execute(insert(Chat), hot + cold)
+        await db.execute(insert(Message), rows)
+        await db.commit()
+    return [c["id"] for c in hot], [c["id"] for c in cold]
+
+
+def codec_table(train: list[str], test: list[str]) -> list[dict]:
+    """codec/dictionary 조합별 압축률과 압축/풀기 속도 (학습과 측정 표본은 분리)"""
+    results = []
+    raw = sum(len(t.encode()) for t in test)
+    codecs = [c for c in ("zlib", "zstd") if compression.available(c)]
+    for codec in codecs:
+        # codec마다 다른 측정용 id (zstd 압축기는 id별로 캐시됨)
+        bench_id = BENCH_DICTIONARY_ID - len(results)
+        compression.dictionaries[bench_id] = compression.train_dictionary(
+            codec, train, COLD_DICT_SIZE
+        )
+        for dictionary_id in (0, bench_id):
+            started = time.perf_counter()
+            blobs = [compression.compress(t, codec, dictionary_id) for t in test]
+            compress_s = time.perf_counter() - started
+            started = time.perf_counter()
+            for blob in blobs:
+                compression.decompress(blob)
+            decompress_s = time.perf_counter() - started
+            results.append(
+                {
+                    "codec": codec,
+                    "dictionary": bool(dictionary_id),
+                    "ratio": round(sum(map(len, blobs)) / raw, 3),
+                    "compress_mb_s": round(raw / compress_s / 1e6, 1),
+                    "decompress_us_per_message": round(decompress_s / len(test) * 1e6, 1),
+                }
+            )
+    return results
+
+
+async def db_size() -> dict:
+    async with engine.connect() as conn:
+        await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        pages = (await conn.execute(text("PRAGMA page_count"))).scalar()
+        free = (await conn.execute(text("PRAGMA freelist_count"))).scalar()
+        page_size = (await conn.execute(text("PRAGMA page_size"))).scalar()
+    return {
+        "file_bytes": DB_PATH.stat().st_size,
+        "used_bytes": (pages - free) * page_size,
+    }
+
+
+async def read_latency(chat_ids: list[str], reads: int, rng: random.Random) -> dict:
+    """get_chat과 같은 조회 + 응답 직렬화 지연 (ms)"""
+    samples = []
+    for _ in range(reads):
+        chat_id = rng.choice(chat_ids)
+        started = time.perf_counter()
+        async with async_session() as db:
+            chat = (
+                await db.execute(
+                    select(Chat).where(Chat.id == chat_id).options(selectinload(Chat.messages))
+                )
+            ).scalar_one()
+            ChatDetailResponse.model_validate(chat).model_dump_json()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    await init_db()
+    # 검색 색인도 만들어 실제 DB와 같은 구성에서 크기를 잼
+    await init_search_index()
+    hot, cold = await seed(args.chats, args.messages, rng)
+    before = await db_size()
+    cold_before = await read_latency(cold, args.reads, rng)
+
+    storage = ColdStorage(enabled=True, codec=args.codec)
+    started = time.perf_counter()
+    compacted = await storage.compact()
+    compact_s = time.perf_counter() - started
+    # overflow 페이지만 회수되는 평소 경로와 전체 VACUUM 후를 각각 기록
+    await db_maintenance.run_once()
+    after = await db_size()
+    db_maintenance.notify(vacuum=True)
+    await db_maintenance.run_once()
+    after_vacuum = await db_size()
+
+    report = {
+        "benchmark": "cold_storage",
+        "chats": args.chats,
+        "messages_per_chat": args.messages,
+        "codec": storage.codec,
+        "compacted_messages": compacted,
+        "compact_seconds": round(compact_s, 2),
+        "content_bytes": {
+            "before": storage.bytes_before,
+            "after": storage.bytes_after,
+            "ratio": round(storage.bytes_after / max(storage.bytes_before, 1), 3),
+        },
+        "db_bytes": {
+            "before": before,
+            "after_incremental_vacuum": after,
+            "after_full_vacuum": after_vacuum,
+            "saved": before["used_bytes"] - after_vacuum["used_bytes"],
+        },
+        "read_latency": {
+            "hot": await read_latency(hot, args.reads, rng),
+            "cold_before_compaction": cold_before,
+            "cold": await read_latency(cold, args.reads, rng),
+        },
+    }
+
+    async with async_session() as db:
+        result = await db.execute(select(Message.content).where(Message.role == "assistant"))
+        texts = result.scalars().all()
+    report["codecs"] = codec_table(texts[: len(texts) // 2], texts[len(texts) // 2 :])
+    await engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=200, help="채팅 수 (절반은 cold)")
+    parser.add_argument("--messages", type=int, default=20, help="채팅당 메시지 수")
+    parser.add_argument("--reads", type=int, default=300, help="hot/cold별 조회 횟수")
+    parser.add_argument("--codec", default="auto", choices=["auto", "zstd", "zlib"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""SQLite 저장소 프로필 동시 읽기/쓰기 처리량 벤치마크
+
+기본 설정(rollback journal)과 튜닝 프로필(WAL + PRAGMA)을 같은 워크로드로 비교한다.
+
+    cd server && python -m benchmarks.db_throughput --seconds 5 --writers 4 --readers 8
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, create_engine
+from models.chat import Chat, Message
+
+SEED_CHATS = 20
+SEED_MESSAGES = 50
+
+
+async def _seed(session_factory) -> list[str]:
+    chat_ids = [str(uuid.uuid4()) for _ in range(SEED_CHATS)]
+    async with session_factory() as session:
+        await session.execute(
+            insert(Chat), [{"id": chat_id, "title": "bench"} for chat_id in chat_ids]
+        )
+        await session.execute(
+            insert(Message),
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "chat_id": chat_id,
+                    "role": "assistant",
+                    "content": "lorem ipsum " * 100,
+                }
+                for chat_id in chat_ids
+                for _ in range(SEED_MESSAGES)
+            ],
+        )
+        await session.commit()
+    return chat_ids
+
+
+async def _writer(session_factory, chat_ids: list[str], deadline: float) -> int:
+    ops = 0
+    while time.perf_counter() < deadline:
+        chat_id = random.choice(chat_ids)
+        async with session_factory() as session:
+            await session.execute(
+                insert(Message).values(
+                    id=str(uuid.uuid4()),
+                    chat_id=chat_id,
+                    role="assistant",
+                    content="lorem ipsum " * 100,
+                )
+            )
+            await session.execute(
+                update(Chat).where(Chat.id == chat_id).values(updated_at=datetime.utcnow())
+            )
+            await session.commit()
+        ops += 1
+    return ops
+
+
+async def _reader(session_factory, chat_ids: list[str], deadline: float) -> int:
+    ops = 0
+    while time.perf_counter() < deadline:
+        async with session_factory() as session:
+            await session.execute(
+                select(Message)
+                .where(Message.chat_id == random.choice(chat_ids))
+                .order_by(Message.created_at.desc())
+                .limit(50)
+            )
+            await session.execute(select(Chat).order_by(Chat.updated_at.desc()).limit(50))
+        ops += 1
+    return ops
+
+
+async def run_profile(tuned: bool, seconds: float, writers: int, readers: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_engine(url, tuned=tuned)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        chat_ids = await _seed(session_factory)
+
+        deadline = time.perf_counter() + seconds
+        results = await asyncio.gather(
+            *[_writer(session_factory, chat_ids, deadline) for _ in range(writers)],
+            *[_reader(session_factory, chat_ids, deadline) for _ in range(readers)],
+            return_exceptions=True,
+        )
+        await engine.dispose()
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    write_ops = sum(r for r in results[:writers] if isinstance(r, int))
+    read_ops = sum(r for r in results[writers:] if isinstance(r, int))
+    return {
+        "profile": "tuned" if tuned else "default",
+        "writes_per_sec": round(write_ops / seconds, 1),
+        "reads_per_sec": round(read_ops / seconds, 1),
+        "errors": len(errors),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--output", type=Path, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "db_throughput",
+        "writers": args.writers,
+        "readers": args.readers,
+        "seconds": args.seconds,
+        "results": [
+            await run_profile(False, args.seconds, args.writers, args.readers),
+            await run_profile(True, args.seconds, args.writers, args.readers),
+        ],
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,11 @@
+"""가짜 provider를 등록한 앱 (uvicorn 벤치마크 대상)
+
+    cd server && OTEMEE_BENCH_TOKEN_RATE=200 uvicorn benchmarks.fake_app:app
+"""
+
+from benchmarks.fake_provider import register
+from main import app
+
+register()
+
+__all__ = ["app"]
@@ -0,0 +1,80 @@
+"""벤치마크용 결정적 가짜 LLM provider
+
+실제 Ollama나 API 키 없이 토큰 속도, chunk 크기, 첫 토큰 지연을 재현한다.
+같은 프롬프트에는 항상 같은 응답을 만든다.
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+
+from services.llm import BaseLLMService, LLMServiceFactory, Prompt, to_messages
+
+FAKE_PROVIDER = "fake"
+FAKE_MODEL = "bench-fake"
+
+WORDS = (
+    "the of and to in is it that for on with as was at by this be from are or an "
+    "모델 응답 토큰 스트리밍 지연 처리량 데이터베이스 채팅 메시지 서버"
+).split()
+
+
+@dataclass
+class FakeProviderConfig:
+    token_rate: float = 100.0  # 초당 토큰 수 (0이면 지연 없음)
+    chunk_size: int = 1  # chunk 하나에 담을 토큰 수
+    first_token_delay: float = 0.05
+    tokens: int = 200  # 응답 길이
+
+    @classmethod
+    def from_env(cls) -> "FakeProviderConfig":
+        """OTEMEE_BENCH_* 환경 변수로 설정 (uvicorn 하위 프로세스용)"""
+        return cls(
+            token_rate=float(os.getenv("OTEMEE_BENCH_TOKEN_RATE", cls.token_rate)),
+            chunk_size=int(os.getenv("OTEMEE_BENCH_CHUNK_SIZE", cls.chunk_size)),
+            first_token_delay=float(
+                os.getenv("OTEMEE_BENCH_FIRST_TOKEN_DELAY", cls.first_token_delay)
+            ),
+            tokens=int(os.getenv("OTEMEE_BENCH_TOKENS", cls.tokens)),
+        )
+
+    def to_env(self) -> dict[str, str]:
+        return {
+            "OTEMEE_BENCH_TOKEN_RATE": str(self.token_rate),
+            "OTEMEE_BENCH_CHUNK_SIZE": str(self.chunk_size),
+            "OTEMEE_BENCH_FIRST_TOKEN_DELAY": str(self.first_token_delay),
+            "OTEMEE_BENCH_TOKENS": str(self.tokens),
+        }
+
+
+class FakeLLMService(BaseLLMService):
+    def __init__(self, config: FakeProviderConfig):
+        self.config = config
+
+    async def stream(self, message: Prompt, model: str = FAKE_MODEL) -> AsyncGenerator[str, None]:
+        config = self.config
+        prompt = to_messages(message)[-1].content
+        seed = hashlib.sha256(f"{model}\0{prompt}".encode()).digest()
+        rng = random.Random(seed)
+        chunk_delay = config.chunk_size / config.token_rate if config.token_rate > 0 else 0
+
+        await asyncio.sleep(config.first_token_delay)
+        remaining = config.tokens
+        while remaining > 0:
+            count = min(config.chunk_size, remaining)
+            remaining -= count
+            yield "".join(f"{rng.choice(WORDS)} " for _ in range(count))
+            if remaining and chunk_delay:
+                await asyncio.sleep(chunk_delay)
+
+
+def register(config: FakeProviderConfig | None = None):
+    """가짜 provider를 LLMServiceFactory에 등록하고 FAKE_MODEL을 연결"""
+    from routers.chat import MODEL_PROVIDER_MAP
+
+    config = config or FakeProviderConfig.from_env()
+    LLMServiceFactory.register(FAKE_PROVIDER, lambda _: FakeLLMService(config))
+    MODEL_PROVIDER_MAP[FAKE_MODEL] = FAKE_PROVIDER
@@ -0,0 +1,143 @@
+"""서버 cold start 벤치마크 (프로세스 시작부터 /health = ok까지)
+
+uvicorn 프로세스를 매번 새로 띄워 /health가 처음 ok를 반환하기까지의 시간과
+백그라운드 warm-up이 끝나기까지의 시간을 잰다. 첫 실행은 빈 DB에 스키마를 만들고,
+이후 실행은 같은 DB를 다시 연다. python -X importtime으로 main import 시간도
+최상위 패키지별로 집계한다.
+
+    cd server && python -m benchmarks.startup --runs 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+POLL_INTERVAL = 0.01
+
+
+def import_profile(env: dict, top: int) -> dict:
+    """python -X importtime 결과를 최상위 패키지별 self 시간으로 집계"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SERVER_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages: dict[str, int] = defaultdict(int)
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        packages[name.split(".")[0]] += int(self_us)
+        if name == "main":
+            total_us = int(cumulative_us)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "packages_ms": {name: round(us / 1000, 1) for name, us in ranked},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_health(env: dict, timeout: float) -> dict:
+    """uvicorn을 띄워 /health = ok, warm-up 완료까지의 경과 시간 측정"""
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--port", str(port), "--log-level", "warning",
+    ]  # fmt: skip
+    started = time.perf_counter()
+    server = subprocess.Popen(command, cwd=SERVER_DIR, env=env)
+    health = warmup = None
+    try:
+        deadline = started + timeout
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            while time.perf_counter() < deadline:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                try:
+                    body = client.get("/health").json()
+                except httpx.TransportError:
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                elapsed = time.perf_counter() - started
+                if health is None and body.get("status") == "ok":
+                    health = elapsed
+                if body.get("warmup") not in ("pending", "running"):
+                    warmup = elapsed
+                    break
+                time.sleep(POLL_INTERVAL)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    if health is None:
+        raise TimeoutError("/health did not become ok")
+    return {
+        "health_ms": round(health * 1000, 1),
+        "warmup_ms": round(warmup * 1000, 1) if warmup is not None else None,
+    }
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "min": min(values),
+        "median": round(statistics.median(values), 1),
+        "max": max(values),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="서버 시작 반복 횟수")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--top", type=int, default=15, help="import 시간 상위 패키지 수")
+    parser.add_argument("--output", type=Path, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "OTEMEE_DATABASE_URL": f"sqlite+aiosqlite:///{Path(tmp) / 'startup.db'}",
+            "OTEMEE_RESPONSE_CACHE": "0",
+        }
+        runs = [time_to_health(env, args.timeout) for _ in range(args.runs)]
+        imports = import_profile(env, args.top)
+
+    warm = runs[1:] or runs
+    report = {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "import_main": imports,
+        # 첫 실행은 빈 DB에 스키마를 만드는 비용 포함
+        "first_run": runs[0],
+        "health_ms": summarize([r["health_ms"] for r in warm]),
+        "warmup_ms": summarize([r["warmup_ms"] for r in warm if r["warmup_ms"] is not None]),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_map(name: str) -> dict[str, str]:
+    """"key=value,key=value" 형식 환경 변수를 dict로 변환"""
+    value = os.getenv(name, "")
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {key.strip(): val.strip() for key, val in pairs}
+
+
+def _keep_alive(value: str) -> str | int:
+    """Ollama keep_alive 값 (문자열은 "30m" 같은 duration으로만 읽히므로 숫자는 int로)"""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+# LLM 클라이언트 레지스트리
+LLM_CLIENT_MAX_SIZE = _env_int("OTEMEE_LLM_CLIENT_MAX_SIZE", 16)
+LLM_CLIENT_IDLE_TTL = _env_float("OTEMEE_LLM_CLIENT_IDLE_TTL", 600.0)
+
+# Provider HTTP 커넥션 풀
+LLM_HTTP_MAX_CONNECTIONS = _env_int("OTEMEE_LLM_HTTP_MAX_CONNECTIONS", 20)
+LLM_HTTP_MAX_KEEPALIVE = _env_int("OTEMEE_LLM_HTTP_MAX_KEEPALIVE", 10)
+LLM_HTTP_KEEPALIVE_EXPIRY = _env_float("OTEMEE_LLM_HTTP_KEEPALIVE_EXPIRY", 120.0)
+
+# 메시지 write-behind 큐
+WRITE_QUEUE_MAX_BATCH = _env_int("OTEMEE_WRITE_QUEUE_MAX_BATCH", 100)
+WRITE_QUEUE_FLUSH_INTERVAL = _env_float("OTEMEE_WRITE_QUEUE_FLUSH_INTERVAL", 0.05)
+
+# 스트리밍 응답 중간 저장 (chunk 수 또는 시간 간격 중 먼저 도달하는 쪽)
+CHECKPOINT_EVERY_CHUNKS = _env_int("OTEMEE_CHECKPOINT_EVERY_CHUNKS", 32)
+CHECKPOINT_INTERVAL = _env_float("OTEMEE_CHECKPOINT_INTERVAL", 1.0)
+
+# 대화 기록 컨텍스트 윈도우
+CONTEXT_TOKEN_BUDGET = _env_int("OTEMEE_CONTEXT_TOKEN_BUDGET", 4096)
+CONTEXT_MAX_MESSAGES = _env_int("OTEMEE_CONTEXT_MAX_MESSAGES", 200)
+SUMMARY_MIN_MESSAGES = _env_int("OTEMEE_SUMMARY_MIN_MESSAGES", 4)
+# 요약을 사용자 스트림이 끝날 때까지 미루는 최대 시간 (초, 지나면 스케줄러 대기열로)
+SUMMARY_MAX_DEFER = _env_float("OTEMEE_SUMMARY_MAX_DEFER", 30.0)
+
+# 목록 페이지네이션
+CHATS_PAGE_SIZE = _env_int("OTEMEE_CHATS_PAGE_SIZE", 50)
+CHATS_PAGE_MAX = _env_int("OTEMEE_CHATS_PAGE_MAX", 200)
+# 한 번에 지울 수 있는 채팅 수 (DELETE /api/chats?ids=...)
+CHATS_DELETE_MAX = _env_int("OTEMEE_CHATS_DELETE_MAX", 500)
+MESSAGES_PAGE_SIZE = _env_int("OTEMEE_MESSAGES_PAGE_SIZE", 50)
+MESSAGES_PAGE_MAX = _env_int("OTEMEE_MESSAGES_PAGE_MAX", 200)
+
+# SQLite 저장소 프로필 (연결 시 PRAGMA 적용)
+DATABASE_URL = os.getenv("OTEMEE_DATABASE_URL", "sqlite+aiosqlite:///./chats.db")
+SQLITE_TUNED = os.getenv("OTEMEE_SQLITE_TUNED", "1") != "0"
+SQLITE_JOURNAL_MODE = os.getenv("OTEMEE_SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("OTEMEE_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = _env_int("OTEMEE_SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+# 음수면 KiB 단위 (-65536 = 64MiB)
+SQLITE_CACHE_SIZE = _env_int("OTEMEE_SQLITE_CACHE_SIZE", -65536)
+SQLITE_BUSY_TIMEOUT = _env_int("OTEMEE_SQLITE_BUSY_TIMEOUT", 5000)
+
+# async 엔진 커넥션 풀
+DB_POOL_SIZE = _env_int("OTEMEE_DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("OTEMEE_DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_float("OTEMEE_DB_POOL_TIMEOUT", 30.0)
+
+# 모델 카탈로그 (Ollama 태그 목록 캐시)
+OLLAMA_BASE_URL = os.getenv("OTEMEE_OLLAMA_BASE_URL", "http://localhost:11434")
+MODEL_CATALOG_TTL = _env_float("OTEMEE_MODEL_CATALOG_TTL", 30.0)
+MODEL_CATALOG_REFRESH_INTERVAL = _env_float("OTEMEE_MODEL_CATALOG_REFRESH_INTERVAL", 15.0)
+
+# SSE chunk 병합 (크기 또는 시간 창 중 먼저 도달하면 전송)
+SSE_COALESCE_BYTES = _env_int("OTEMEE_SSE_COALESCE_BYTES", 256)
+SSE_COALESCE_WINDOW = _env_float("OTEMEE_SSE_COALESCE_WINDOW", 0.016)
+
+# 응답 캐시 (동일 provider/model/프롬프트 재요청 시 저장된 응답을 재생, 기본 비활성)
+RESPONSE_CACHE_ENABLED = os.getenv("OTEMEE_RESPONSE_CACHE", "0") == "1"
+RESPONSE_CACHE_PATH = os.getenv("OTEMEE_RESPONSE_CACHE_PATH", "./response_cache.db")
+RESPONSE_CACHE_MAX_BYTES = _env_int("OTEMEE_RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+RESPONSE_CACHE_TTL = _env_float("OTEMEE_RESPONSE_CACHE_TTL", 7 * 24 * 3600.0)
+
+# LLM 요청 스케줄러 (provider/모델별 동시 스트림 수와 대기열 길이)
+SCHEDULER_MAX_QUEUE = _env_int("OTEMEE_SCHEDULER_MAX_QUEUE", 64)
+OLLAMA_MAX_IN_FLIGHT = _env_int("OTEMEE_OLLAMA_MAX_IN_FLIGHT", 2)
+OLLAMA_MODEL_MAX_IN_FLIGHT = _env_int("OTEMEE_OLLAMA_MODEL_MAX_IN_FLIGHT", 1)
+CLOUD_MAX_IN_FLIGHT = _env_int("OTEMEE_CLOUD_MAX_IN_FLIGHT", 16)
+# provider별 분당 요청 수 (token bucket, 0이면 제한 없음)
+PROVIDER_RPM = {
+    "ollama": _env_float("OTEMEE_OLLAMA_RPM", 0),
+    "openai": _env_float("OTEMEE_OPENAI_RPM", 500),
+    "anthropic": _env_float("OTEMEE_ANTHROPIC_RPM", 50),
+    "google": _env_float("OTEMEE_GOOGLE_RPM", 15),
+    "groq": _env_float("OTEMEE_GROQ_RPM", 30),
+}
+
+# Ollama 모델 상주 관리 (keep_alive: "30m", "1h", 초 단위 숫자, -1이면 계속 상주)
+OLLAMA_KEEP_ALIVE = _keep_alive(os.getenv("OTEMEE_OLLAMA_KEEP_ALIVE", "30m"))
+# 모델별 keep_alive ("gemma3:1b=1h,qwen3:8b=600")
+OLLAMA_MODEL_KEEP_ALIVE = {
+    model: _keep_alive(value)
+    for model, value in _env_map("OTEMEE_OLLAMA_MODEL_KEEP_ALIVE").items()
+}
+OLLAMA_PRELOAD_RECENT = _env_int("OTEMEE_OLLAMA_PRELOAD_RECENT", 2)
+OLLAMA_WARMUP_TIMEOUT = _env_float("OTEMEE_OLLAMA_WARMUP_TIMEOUT", 120.0)
+
+# provider 라우팅 (fallback / hedged request)
+# 모델별 fallback 경로 ("gemma3:1b=groq/llama-3.3-70b-versatile|gemini-2.5-flash-lite")
+FALLBACK_MODELS = {
+    model: [route for route in routes.split("|") if route]
+    for model, routes in _env_map("OTEMEE_FALLBACK_MODELS").items()
+}
+ROUTING_HEDGE = os.getenv("OTEMEE_ROUTING_HEDGE", "0") == "1"
+# 첫 토큰이 이 시간 안에 오지 않으면 다음 경로 시작 (hedge를 끈 경우)
+ROUTING_FIRST_TOKEN_TIMEOUT = _env_float("OTEMEE_ROUTING_FIRST_TOKEN_TIMEOUT", 15.0)
+# hedge 시작 시점 = provider TTFT p95 * factor (min/max로 제한, 표본이 적으면 default)
+HEDGE_P95_FACTOR = _env_float("OTEMEE_HEDGE_P95_FACTOR", 1.0)
+HEDGE_MIN_DELAY = _env_float("OTEMEE_HEDGE_MIN_DELAY", 0.3)
+HEDGE_MAX_DELAY = _env_float("OTEMEE_HEDGE_MAX_DELAY", 5.0)
+HEDGE_DEFAULT_DELAY = _env_float("OTEMEE_HEDGE_DEFAULT_DELAY", 2.0)
+# provider 지연 통계
+LATENCY_WINDOW = _env_int("OTEMEE_LATENCY_WINDOW", 200)
+LATENCY_MIN_SAMPLES = _env_int("OTEMEE_LATENCY_MIN_SAMPLES", 20)
+# 연속 실패가 이만큼 쌓이면 cooldown 동안 fallback 경로에서 건너뜀
+CIRCUIT_FAILURES = _env_int("OTEMEE_CIRCUIT_FAILURES", 3)
+CIRCUIT_COOLDOWN = _env_float("OTEMEE_CIRCUIT_COOLDOWN", 30.0)
+
+# 요청 계측 (Server-Timing 헤더, 스트림 끝의 stats SSE 이벤트)
+SERVER_TIMING_ENABLED = os.getenv("OTEMEE_SERVER_TIMING", "1") == "1"
+SSE_STATS_EVENT = os.getenv("OTEMEE_SSE_STATS_EVENT", "1") == "1"
+
+# 일괄 생성 (provider별 동시 작업 수, 스케줄러 대기열을 넘치지 않게 제한)
+BATCH_MAX_JOBS = _env_int("OTEMEE_BATCH_MAX_JOBS", 500)
+BATCH_OLLAMA_CONCURRENCY = _env_int("OTEMEE_BATCH_OLLAMA_CONCURRENCY", 2)
+BATCH_CLOUD_CONCURRENCY = _env_int("OTEMEE_BATCH_CLOUD_CONCURRENCY", 4)
+
+# 채팅 기록 내보내기/가져오기 (server-side cursor 묶음 크기, executemany 묶음 크기)
+EXPORT_FETCH_SIZE = _env_int("OTEMEE_EXPORT_FETCH_SIZE", 500)
+IMPORT_BATCH_SIZE = _env_int("OTEMEE_IMPORT_BATCH_SIZE", 500)
+
+# semantic memory (이전 메시지 임베딩 색인, OTEMEE_MEMORY=1이면 백그라운드 색인)
+MEMORY_ENABLED = os.getenv("OTEMEE_MEMORY", "0") == "1"
+# "ollama" | "stub" (stub은 외부 호출 없는 결정적 해시 임베딩, 테스트용)
+MEMORY_EMBEDDER = os.getenv("OTEMEE_MEMORY_EMBEDDER", "ollama")
+MEMORY_EMBED_MODEL = os.getenv("OTEMEE_MEMORY_EMBED_MODEL", "nomic-embed-text")
+MEMORY_STUB_DIM = _env_int("OTEMEE_MEMORY_STUB_DIM", 256)
+MEMORY_INDEX_DIR = os.getenv("OTEMEE_MEMORY_INDEX_DIR", "./memory_index")
+MEMORY_BATCH_SIZE = _env_int("OTEMEE_MEMORY_BATCH_SIZE", 32)
+# 새 메시지 알림이 없어도 색인할 메시지를 확인하는 주기 (초)
+MEMORY_INTERVAL = _env_float("OTEMEE_MEMORY_INTERVAL", 60.0)
+# 임베딩할 메시지 최대 길이 (문자)
+MEMORY_MAX_CHARS = _env_int("OTEMEE_MEMORY_MAX_CHARS", 2000)
+# 채팅 요청에 붙이는 검색 결과 수, 최소 cosine 유사도, 결과당 최대 길이
+MEMORY_TOP_K = _env_int("OTEMEE_MEMORY_TOP_K", 4)
+MEMORY_MIN_SCORE = _env_float("OTEMEE_MEMORY_MIN_SCORE", 0.35)
+MEMORY_SNIPPET_CHARS = _env_int("OTEMEE_MEMORY_SNIPPET_CHARS", 500)
+
+# 재연결 가능한 SSE 스트림 (스트림별 frame 링 버퍼, 완료 후 보관 시간)
+REPLAY_BUFFER_FRAMES = _env_int("OTEMEE_REPLAY_BUFFER_FRAMES", 1024)
+REPLAY_GRACE_TTL = _env_float("OTEMEE_REPLAY_GRACE_TTL", 60.0)
+
+# 서버 시작 (준비 완료 후 LangChain/provider 모듈을 백그라운드에서 미리 import)
+STARTUP_PRELOAD = os.getenv("OTEMEE_STARTUP_PRELOAD", "1") == "1"
+
+# DB 유지보수 (삭제로 생긴 빈 페이지 회수와 PRAGMA optimize, 유휴 시간에만 실행)
+DB_MAINTENANCE_ENABLED = os.getenv("OTEMEE_DB_MAINTENANCE", "1") == "1"
+# 삭제 알림이 없어도 정리할 것이 있는지 확인하는 주기 (초)
+DB_MAINTENANCE_INTERVAL = _env_float("OTEMEE_DB_MAINTENANCE_INTERVAL", 600.0)
+# 진행 중인 스트림 없이 이만큼 지나야 유휴로 판단 (초)
+DB_MAINTENANCE_IDLE = _env_float("OTEMEE_DB_MAINTENANCE_IDLE", 30.0)
+# incremental_vacuum 한 번에 회수하는 페이지 수 (쓰기 잠금을 짧게 유지)
+DB_VACUUM_PAGES = _env_int("OTEMEE_DB_VACUUM_PAGES", 512)
+
+# 오래된 메시지 압축 보관 (cold storage, 백그라운드에서 content를 압축 BLOB으로 변환)
+COLD_STORAGE_ENABLED = os.getenv("OTEMEE_COLD_STORAGE", "0") == "1"
+# "auto" (zstandard가 설치돼 있으면 zstd, 없으면 zlib) | "zstd" | "zlib"
+COLD_STORAGE_CODEC = os.getenv("OTEMEE_COLD_STORAGE_CODEC", "auto")
+# 이보다 오래된 메시지, 또는 이 기간 동안 열지 않은 채팅의 메시지를 압축 (일)
+COLD_MESSAGE_AGE_DAYS = _env_float("OTEMEE_COLD_MESSAGE_AGE_DAYS", 30.0)
+COLD_CHAT_IDLE_DAYS = _env_float("OTEMEE_COLD_CHAT_IDLE_DAYS", 14.0)
+# 이보다 짧은 메시지는 압축 이득이 적어 그대로 둠 (문자)
+COLD_MIN_CHARS = _env_int("OTEMEE_COLD_MIN_CHARS", 200)
+COLD_BATCH_SIZE = _env_int("OTEMEE_COLD_BATCH_SIZE", 200)
+# 압축할 메시지를 찾는 주기 (초)
+COLD_INTERVAL = _env_float("OTEMEE_COLD_INTERVAL", 3600.0)
+# 공유 dictionary 크기 (바이트)와 학습에 쓰는 메시지 수 (이보다 적으면 dictionary 없이 압축)
+COLD_DICT_SIZE = _env_int("OTEMEE_COLD_DICT_SIZE", 32768)
+COLD_DICT_SAMPLES = _env_int("OTEMEE_COLD_DICT_SAMPLES", 1000)
+COLD_DICT_MIN_SAMPLES = _env_int("OTEMEE_COLD_DICT_MIN_SAMPLES", 100)
+# 압축으로 줄인 양이 이만큼 쌓이면 유휴 시간에 전체 VACUUM 요청 (페이지 안 빈 공간 회수)
+COLD_VACUUM_BYTES = _env_int("OTEMEE_COLD_VACUUM_BYTES", 16 * 1024 * 1024)
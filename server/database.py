@@ -1,16 +1,184 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import logging
+import zlib
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from config import (
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_CACHE_SIZE,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TUNED,
+)
+from services.compression import decompress
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_sqlite_profile(dbapi_connection, connection_record):
+    """연결마다 SQLite PRAGMA 적용 (WAL이면 쓰기 중에도 읽기가 막히지 않음)"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _message_text(value):
+    """SQL 함수 message_text(content): cold storage로 압축된 content를 원문으로 반환
+
+    검색 트리거가 색인에서 지울 원문을 구할 때 쓴다. 풀 수 없으면 (zstandard 미설치
+    등) 채팅 삭제가 막히지 않도록 NULL을 반환한다.
+    """
+    if not isinstance(value, bytes):
+        return value
+    try:
+        return decompress(value)
+    except Exception as e:
+        logger.warning(f"message_text() could not decompress content: {e}")
+        return None
+
+
+def _apply_sqlite_defaults(dbapi_connection, connection_record):
+    """프로필과 관계없이 연결마다 적용하는 PRAGMA와 SQL 함수
+
+    FK 제약을 켜야 채팅 삭제 시 메시지/요약이 ON DELETE CASCADE로 지워진다.
+    auto_vacuum은 빈 DB에서 첫 테이블(WAL 전환 포함) 전에만 적용되고, 기존 DB는
+    services.maintenance가 한 번 VACUUM해 전환한다.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+    dbapi_connection.create_function("message_text", 1, _message_text, deterministic=True)
+
+
+def create_engine(url: str = DATABASE_URL, tuned: bool = SQLITE_TUNED) -> AsyncEngine:
+    """async 엔진 생성 (tuned=False면 SQLite 기본 설정)"""
+    db_engine = create_async_engine(
+        url,
+        echo=False,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    event.listen(db_engine.sync_engine, "connect", _apply_sqlite_defaults)
+    if tuned:
+        event.listen(db_engine.sync_engine, "connect", _apply_sqlite_profile)
+    return db_engine
 
-DATABASE_URL = "sqlite+aiosqlite:///./chats.db"
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+engine = create_engine()
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
+# create_all이 기존 테이블에 추가하지 않는 컬럼: (테이블, 컬럼, DDL)
+MIGRATION_COLUMNS = [
+    (
+        "messages",
+        "status",
+        "ALTER TABLE messages ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'complete'",
+    ),
+    ("settings", "pinned_models", "ALTER TABLE settings ADD COLUMN pinned_models TEXT"),
+    ("chats", "opened_at", "ALTER TABLE chats ADD COLUMN opened_at DATETIME"),
+]
+
+
+def _rebuild_foreign_keys(conn):
+    """ON DELETE 규칙이 모델과 다른 테이블을 새로 만들어 옮김
+
+    SQLite는 기존 테이블의 FK 제약을 ALTER로 바꿀 수 없다. 새 테이블에 rowid까지
+    그대로 복사하므로 FTS 색인은 다시 만들 필요가 없다 (트리거는
+    init_search_index가 다시 생성). 부모가 없는 고아 행은 옮기지 않는다.
+    """
+    for table in Base.metadata.sorted_tables:
+        wanted = {
+            (fk.parent.name, fk.ondelete.upper()) for fk in table.foreign_keys if fk.ondelete
+        }
+        if not wanted:
+            continue
+        # foreign_key_list 행: (id, seq, table, from, to, on_update, on_delete, match)
+        rows = conn.execute(text(f"PRAGMA foreign_key_list({table.name})"))
+        if wanted <= {(row[3], row[6].upper()) for row in rows}:
+            continue
+
+        staging = f"_rebuild_{table.name}"
+        ddl = str(CreateTable(table).compile(dialect=conn.dialect)).strip()
+        ddl = ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {staging} ", 1)
+        conn.execute(text(ddl))
+        columns = ", ".join(column.name for column in table.columns)
+        parents = " AND ".join(
+            f"{fk.parent.name} IN (SELECT {fk.column.name} FROM {fk.column.table.name})"
+            for fk in table.foreign_keys
+        )
+        # 고아 행은 기존 테이블에서 지워 트리거로 FTS 색인에서도 빠지게 함
+        conn.execute(text(f"DELETE FROM {table.name} WHERE NOT ({parents})"))
+        conn.execute(
+            text(
+                f"INSERT INTO {staging} (rowid, {columns}) "
+                f"SELECT rowid, {columns} FROM {table.name}"
+            )
+        )
+        conn.execute(text(f"DROP TABLE {table.name}"))
+        conn.execute(text(f"ALTER TABLE {staging} RENAME TO {table.name}"))
+
+
+def _migrate(conn):
+    """기존 DB에 없는 컬럼, FK 규칙, 인덱스 반영"""
+    for table, column, ddl in MIGRATION_COLUMNS:
+        columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+        if column not in columns:
+            conn.execute(text(ddl))
+
+    _rebuild_foreign_keys(conn)
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def schema_version() -> int:
+    """모델의 테이블/컬럼/인덱스/FK 구성 해시 (PRAGMA user_version에 기록)"""
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f"{column.name}:{column.type}" for column in table.columns)
+        parts.extend(sorted(index.name for index in table.indexes))
+        parts.extend(
+            sorted(
+                f"{fk.parent.name}>{fk.target_fullname}:{fk.ondelete}"
+                for fk in table.foreign_keys
+            )
+        )
+    parts.extend(ddl for _, _, ddl in MIGRATION_COLUMNS)
+    return zlib.crc32("\n".join(parts).encode()) & 0x7FFFFFFF
+
 
 async def init_db():
+    """스키마가 바뀐 경우에만 create_all과 마이그레이션 실행
+
+    모델 구성 해시를 user_version과 비교하므로 평소 시작할 때는 PRAGMA 한 번으로 끝난다.
+    """
+    import models  # noqa: F401 (모든 테이블을 metadata에 등록)
+
+    version = schema_version()
     async with engine.begin() as conn:
+        if (await conn.execute(text("PRAGMA user_version"))).scalar() == version:
+            return
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_migrate)
+        await conn.execute(text(f"PRAGMA user_version = {version}"))
 
 
 async def get_db():
@@ -1,20 +1,67 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from database import init_db
+from routers.archive import router as archive_router
+from routers.batch import router as batch_router
 from routers.chat import router as chat_router
 from routers.chats import router as chats_router
+from routers.memory import router as memory_router
 from routers.models import router as models_router
+from routers.search import router as search_router
 from routers.settings import router as settings_router
+from services.checkpoint import mark_interrupted_streams
+from services.client_registry import client_registry
+from services.cold_storage import cold_storage
+from services.maintenance import db_maintenance
+from services.memory import memory_index
+from services.metrics import metrics
+from services.model_catalog import model_catalog
+from services.model_residency import model_residency
+from services.replay import replay_registry
+from services.response_cache import response_cache
+from services.search import init_search_index
+from services.warmup import warmup
+from services.write_queue import message_queue
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # 시작 시 DB 테이블 생성
+    # 요청 처리 전에 꼭 필요한 초기화만 기다리고 나머지는 백그라운드에서 진행
+    # DB 스키마 확인 (바뀐 경우에만 테이블 생성/마이그레이션)
     await init_db()
+    # 압축된 메시지를 풀 dictionary (압축 작업을 꺼도 필요)
+    await cold_storage.load()
+    await init_search_index()
+    await mark_interrupted_streams()
+    message_queue.start()
+    model_catalog.start()
+    # 기본 모델과 최근 모델을 미리 로드해 첫 응답 지연을 줄임
+    model_residency.start()
+    # 이전 메시지 임베딩 색인 (OTEMEE_MEMORY=1)
+    memory_index.start()
+    # LangChain 모듈 미리 import (첫 응답 지연 방지)
+    warmup.start()
+    # 유휴 시간에 삭제로 생긴 빈 페이지 회수
+    db_maintenance.start()
+    # 오래된 메시지 압축 (OTEMEE_COLD_STORAGE=1)
+    cold_storage.start()
     yield
+    await warmup.close()
+    # 진행 중인 응답 생성을 멈추고 중간 응답을 저장 큐에 넘김
+    await replay_registry.close()
+    await cold_storage.close()
+    await memory_index.close()
+    await model_residency.close()
+    await model_catalog.close()
+    # 종료 시 대기 중인 메시지 저장
+    await message_queue.close()
+    await db_maintenance.close()
+    # 종료 시 LLM 클라이언트 커넥션 정리
+    await client_registry.aclose()
+    response_cache.close()
 
 
 app = FastAPI(title="Otemee Server", lifespan=lifespan)
@@ -25,14 +72,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-Batch-Id"],
 )
 
+app.include_router(archive_router)
+app.include_router(batch_router)
 app.include_router(chat_router)
 app.include_router(chats_router)
+app.include_router(memory_router)
 app.include_router(models_router)
+app.include_router(search_router)
 app.include_router(settings_router)
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    """시작 초기화가 끝나면 ok (warm-up은 백그라운드에서 계속 진행)"""
+    return {"status": "ok", "warmup": warmup.status}
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text 포맷 지표"""
+    return Response(
+        content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
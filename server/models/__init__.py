@@ -1,4 +1,16 @@
-from .chat import Chat, Message
+from .batch import Batch, BatchJob
+from .chat import Chat, ChatSummary, Message
+from .compression import CompressionDictionary
+from .memory import MemoryEntry
 from .settings import Settings
 
-__all__ = ["Chat", "Message", "Settings"]
+__all__ = [
+    "Batch",
+    "BatchJob",
+    "Chat",
+    "ChatSummary",
+    "CompressionDictionary",
+    "MemoryEntry",
+    "Message",
+    "Settings",
+]
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from database import Base
+
+
+class Batch(Base):
+    """프롬프트 x 모델 일괄 생성 요청"""
+
+    __tablename__ = "batches"
+
+    id = Column(String, primary_key=True)
+    # "running" | "complete" | "partial" (일부 작업이 실패했거나 중단됨)
+    status = Column(String(20), nullable=False, default="running")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    jobs = relationship(
+        "BatchJob",
+        back_populates="batch",
+        cascade="all, delete-orphan",
+        order_by="BatchJob.position",
+    )
+
+
+class BatchJob(Base):
+    __tablename__ = "batch_jobs"
+    __table_args__ = (Index("ix_batch_jobs_batch_id_position", "batch_id", "position"),)
+
+    id = Column(String, primary_key=True)
+    batch_id = Column(String, ForeignKey("batches.id"), nullable=False)
+    position = Column(Integer, nullable=False)
+    prompt_index = Column(Integer, nullable=False)
+    prompt = Column(Text, nullable=False)
+    model = Column(String(100), nullable=False)
+    # "pending" | "complete" | "error" (pending/error는 재개 시 다시 실행)
+    status = Column(String(20), nullable=False, default="pending")
+    output = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    ttft_ms = Column(Float, nullable=True)
+    duration_ms = Column(Float, nullable=True)
+    # 출력 토큰 수 (추정치)
+    tokens = Column(Integer, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    batch = relationship("Batch", back_populates="jobs")
@@ -1,32 +1,78 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Text, text
 from sqlalchemy.orm import relationship
 
 from database import Base
+from .types import CompressedText
 
 
 class Chat(Base):
     __tablename__ = "chats"
+    # 사이드바 목록 keyset 페이지네이션용
+    __table_args__ = (Index("ix_chats_updated_at_id", "updated_at", "id"),)
 
     id = Column(String, primary_key=True)
     title = Column(String(255), nullable=False)
     model = Column(String(100), default="gemma3:1b")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 마지막으로 연 시각 (오래 열지 않은 채팅은 cold storage로 압축)
+    opened_at = Column(DateTime, nullable=True)
 
+    # 메시지/요약은 DB의 ON DELETE CASCADE로 지움 (삭제 전에 ORM으로 불러오지 않음)
     messages = relationship(
-        "Message", back_populates="chat", cascade="all, delete-orphan"
+        "Message",
+        back_populates="chat",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="Message.created_at",
+    )
+    summary = relationship(
+        "ChatSummary",
+        back_populates="chat",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        uselist=False,
     )
 
 
 class Message(Base):
     __tablename__ = "messages"
+    # 채팅별 메시지 조회/페이지네이션용
+    __table_args__ = (
+        Index("ix_messages_chat_id_created_at", "chat_id", "created_at", "id"),
+        # 시작 시 중단된 스트림 정리(mark_interrupted_streams)가 전체를 훑지 않도록
+        Index(
+            "ix_messages_streaming",
+            "status",
+            sqlite_where=text("status = 'streaming'"),
+        ),
+    )
 
     id = Column(String, primary_key=True)
-    chat_id = Column(String, ForeignKey("chats.id"), nullable=False)
+    chat_id = Column(String, ForeignKey("chats.id", ondelete="CASCADE"), nullable=False)
     role = Column(String(20), nullable=False)  # "user" | "assistant"
-    content = Column(Text, nullable=False)
+    # 오래된 메시지는 압축된 BLOB일 수 있음 (services.cold_storage, 읽을 때 자동으로 풂)
+    content = Column(CompressedText, nullable=False)
+    # "streaming" | "complete" | "aborted" (스트리밍 중간 저장 상태)
+    status = Column(
+        String(20), nullable=False, default="complete", server_default="complete"
+    )
     created_at = Column(DateTime, default=datetime.utcnow)
 
     chat = relationship("Chat", back_populates="messages")
+
+
+class ChatSummary(Base):
+    """오래된 대화를 요약한 rolling summary (컨텍스트 윈도우용)"""
+
+    __tablename__ = "chat_summaries"
+
+    chat_id = Column(String, ForeignKey("chats.id", ondelete="CASCADE"), primary_key=True)
+    content = Column(Text, nullable=False)
+    # 요약에 포함된 마지막 메시지의 created_at
+    covered_until = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    chat = relationship("Chat", back_populates="summary")
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+
+from database import Base
+
+
+class CompressionDictionary(Base):
+    """cold storage 압축에 쓰는 공유 dictionary (압축된 메시지가 id로 참조)"""
+
+    __tablename__ = "compression_dictionaries"
+
+    id = Column(Integer, primary_key=True)
+    codec = Column(String(10), nullable=False)  # "zstd" | "zlib"
+    data = Column(LargeBinary, nullable=False)
+    # 학습에 쓴 메시지 수
+    samples = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Index, Integer, String
+
+from database import Base
+
+
+class MemoryEntry(Base):
+    """임베딩 색인에 들어간 메시지 (row는 벡터 파일의 행 번호)"""
+
+    __tablename__ = "memory_entries"
+    __table_args__ = (Index("ix_memory_entries_row", "row"),)
+
+    message_id = Column(String, primary_key=True)
+    # 빈 메시지처럼 임베딩하지 않고 건너뛴 메시지는 None
+    row = Column(Integer, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Text
 
 from database import Base
 
@@ -12,3 +12,5 @@ class Settings(Base):
     google_api_key = Column(String, nullable=True)
     groq_api_key = Column(String, nullable=True)
     default_model = Column(String, default="gemma3:1b")
+    # 항상 메모리에 올려둘 Ollama 모델 (JSON 배열)
+    pinned_models = Column(Text, nullable=True)
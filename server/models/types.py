@@ -0,0 +1,16 @@
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+from services.compression import decompress
+
+
+class CompressedText(TypeDecorator):
+    """cold storage가 압축해 BLOB으로 바꾼 값은 읽을 때 풀어서 str로 반환하는 Text"""
+
+    impl = Text
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, bytes):
+            return decompress(value)
+        return value
@@ -0,0 +1,36 @@
+from dataclasses import asdict
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from schemas.archive import ImportResponse
+from services.archive import export_archive, import_archive
+from services.maintenance import db_maintenance
+from services.memory import memory_index
+
+router = APIRouter(prefix="/api", tags=["archive"])
+
+
+@router.get("/export")
+async def export_chats():
+    """전체 채팅 기록을 gzip NDJSON으로 내려받기"""
+    filename = f"otemee-export-{datetime.utcnow():%Y%m%d-%H%M%S}.ndjson.gz"
+    return StreamingResponse(
+        export_archive(),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import", response_model=ImportResponse)
+async def import_chats(request: Request):
+    """내보낸 아카이브 가져오기 (gzip 또는 plain NDJSON, 같은 id는 건너뜀)"""
+    try:
+        # 가져오는 동안 유휴 시간 VACUUM이 쓰기를 막지 않도록
+        with db_maintenance.writing():
+            stats = await import_archive(request.stream())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    memory_index.notify()
+    return ImportResponse(**asdict(stats))
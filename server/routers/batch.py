@@ -0,0 +1,122 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import BATCH_MAX_JOBS
+from database import get_db
+from models.batch import Batch, BatchJob
+from routers.chat import create_llm_service, get_api_key_for_provider, get_provider_from_model
+from schemas.batch import BatchJobResult, BatchRequest, BatchResponse
+from services.batch import JobTarget, stream_batch
+from services.llm import LLMServiceFactory
+
+router = APIRouter(prefix="/api")
+
+NDJSON_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+async def build_targets(db: AsyncSession, models: set[str]) -> dict[str, JobTarget]:
+    """모델별 LLM 서비스 생성 (API 키가 없으면 해당 모델 작업만 실패 처리)"""
+    targets = {}
+    for model in models:
+        provider = get_provider_from_model(model)
+        api_key = await get_api_key_for_provider(db, provider)
+        if LLMServiceFactory.requires_api_key(provider) and not api_key:
+            error = f"API key for {provider} is not configured"
+            targets[model] = JobTarget(provider, error=error)
+            continue
+        try:
+            service = await create_llm_service(db, model, provider, api_key)
+            targets[model] = JobTarget(provider, service=service)
+        except ValueError as e:
+            targets[model] = JobTarget(provider, error=str(e))
+    return targets
+
+
+def to_result(job: BatchJob) -> BatchJobResult:
+    return BatchJobResult(
+        job_id=job.id,
+        position=job.position,
+        prompt_index=job.prompt_index,
+        model=job.model,
+        status=job.status,
+        output=job.output,
+        error=job.error,
+        ttft_ms=job.ttft_ms,
+        duration_ms=job.duration_ms,
+        tokens=job.tokens,
+    )
+
+
+async def start_stream(
+    db: AsyncSession, batch_id: str, jobs: list[BatchJob]
+) -> StreamingResponse:
+    targets = await build_targets(db, {job.model for job in jobs if job.status != "complete"})
+    entries = [(to_result(job), job.prompt) for job in jobs]
+    return StreamingResponse(
+        stream_batch(batch_id, entries, targets),
+        media_type="application/x-ndjson",
+        headers={**NDJSON_HEADERS, "X-Batch-Id": batch_id},
+    )
+
+
+@router.post("/batch")
+async def create_batch(request: BatchRequest, db: AsyncSession = Depends(get_db)):
+    """프롬프트 x 모델 일괄 생성 (완료되는 순서대로 NDJSON 스트리밍)"""
+    total = len(request.prompts) * len(request.models)
+    if total > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"Too many jobs ({total} > {BATCH_MAX_JOBS})")
+
+    batch = Batch(id=str(uuid.uuid4()))
+    pairs = [
+        (prompt_index, prompt, model)
+        for prompt_index, prompt in enumerate(request.prompts)
+        for model in request.models
+    ]
+    jobs = [
+        BatchJob(
+            id=str(uuid.uuid4()),
+            batch_id=batch.id,
+            position=position,
+            prompt_index=prompt_index,
+            prompt=prompt,
+            model=model,
+        )
+        for position, (prompt_index, prompt, model) in enumerate(pairs)
+    ]
+    db.add(batch)
+    db.add_all(jobs)
+    await db.commit()
+    return await start_stream(db, batch.id, jobs)
+
+
+@router.post("/batch/{batch_id}/resume")
+async def resume_batch(batch_id: str, db: AsyncSession = Depends(get_db)):
+    """중단된 일괄 생성 재개 (완료된 결과는 바로 내보내고 나머지만 실행)"""
+    batch = await db.get(Batch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    result = await db.execute(
+        select(BatchJob).where(BatchJob.batch_id == batch_id).order_by(BatchJob.position)
+    )
+    return await start_stream(db, batch_id, list(result.scalars().all()))
+
+
+@router.get("/batch/{batch_id}", response_model=BatchResponse)
+async def get_batch(batch_id: str, db: AsyncSession = Depends(get_db)):
+    """일괄 생성 상태와 결과 조회"""
+    batch = await db.get(Batch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    result = await db.execute(
+        select(BatchJob).where(BatchJob.batch_id == batch_id).order_by(BatchJob.position)
+    )
+    return BatchResponse(
+        id=batch.id,
+        status=batch.status,
+        created_at=batch.created_at,
+        jobs=[to_result(job) for job in result.scalars()],
+    )
@@ -1,19 +1,33 @@
-import json
+import asyncio
 import logging
 import uuid
 from datetime import datetime
+from typing import Literal
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
+from config import FALLBACK_MODELS, SERVER_TIMING_ENABLED, SSE_STATS_EVENT
+from database import async_session, get_db
 from models.chat import Chat, Message
-from models.settings import Settings
+from routers.settings import API_KEY_FIELDS
 from schemas.chat import ChatRequest, ChatCreate
-from services.llm import LLMServiceFactory
+from services.checkpoint import ResponseCheckpointer
+from services.context import context_builder
+from services.llm import BaseLLMService, LLMServiceFactory, Prompt, QueuePosition
+from services.memory import memory_index
+from services.metrics import RequestTimer, timed_frames
+from services.model_catalog import model_catalog
+from services.model_residency import model_residency
+from services.replay import RESUMABLE_HEADER, ReplayBuffer, replay_registry
+from services.routing import Route, RoutedLLMService
+from services.scheduler import QueueFullError, admission_scheduler
+from services.settings_cache import settings_cache
+from services.sse import FRAMING_HEADER, StreamFramer
+from services.streams import ActiveStream, stream_registry, watch_disconnect
 
 logger = logging.getLogger(__name__)
 
@@ -31,46 +45,161 @@ def get_provider_from_model(model: str) -> str:
     return MODEL_PROVIDER_MAP.get(model, "ollama")
 
 
+def metrics_model(model: str) -> str:
+    """metrics label용 모델 이름
+
+    요청의 model은 클라이언트가 정하는 값이라 그대로 쓰면 series가 끝없이 늘어난다.
+    알려진 cloud 모델과 Ollama 카탈로그에 있는 모델만 쓰고 나머지는 "other"로 묶는다.
+    """
+    if model in MODEL_PROVIDER_MAP or model_catalog.has(model):
+        return model
+    return "other"
+
+
 async def get_api_key_for_provider(db: AsyncSession, provider: str) -> str | None:
-    """Provider에 해당하는 API 키 조회"""
-    result = await db.execute(select(Settings).where(Settings.id == 1))
-    settings = result.scalar_one_or_none()
+    """Provider에 해당하는 API 키 조회 (설정 캐시 사용)"""
+    settings = await settings_cache.get(db)
 
     if not settings:
         return None
 
-    key_map = {
-        "openai": settings.openai_api_key,
-        "anthropic": settings.anthropic_api_key,
-        "google": settings.google_api_key,
-        "groq": settings.groq_api_key,
+    return settings.api_key_for(provider)
+
+
+def parse_route(route: str) -> tuple[str, str]:
+    """fallback 경로 문자열을 (provider, model)로 변환
+
+    "groq/llama-3.3-70b-versatile"처럼 provider를 앞에 붙일 수 있고,
+    없으면 MODEL_PROVIDER_MAP으로 provider를 찾는다.
+    """
+    prefix, _, model = route.partition("/")
+    if model and prefix in API_KEY_FIELDS:
+        return prefix, model
+    return get_provider_from_model(route), route
+
+
+async def create_llm_service(
+    db: AsyncSession, model: str, provider: str, api_key: str | None
+) -> BaseLLMService:
+    """LLM 서비스 생성 (모델에 fallback 경로가 설정돼 있으면 라우팅 서비스)"""
+    service = LLMServiceFactory.create(provider, api_key)
+    routes = [Route(provider, model, service)]
+    for fallback in FALLBACK_MODELS.get(model, []):
+        fallback_provider, fallback_model = parse_route(fallback)
+        fallback_key = None
+        if LLMServiceFactory.requires_api_key(fallback_provider):
+            fallback_key = await get_api_key_for_provider(db, fallback_provider)
+            # 키가 없는 provider는 fallback 경로에서 제외
+            if not fallback_key:
+                continue
+        routes.append(
+            Route(
+                fallback_provider,
+                fallback_model,
+                LLMServiceFactory.create(fallback_provider, fallback_key),
+            )
+        )
+    if len(routes) == 1:
+        return service
+    return RoutedLLMService(routes)
+
+
+def ensure_capacity(provider: str):
+    """스케줄러 대기열이 가득 찼으면 스트리밍을 시작하기 전에 429로 거절"""
+    if not admission_scheduler.has_capacity(provider):
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many pending requests for {provider}",
+            headers={"Retry-After": "5"},
+        )
+
+
+Framing = Literal["json", "raw"]
+
+
+def stream_headers(framing: Framing, timer: RequestTimer | None = None) -> dict[str, str]:
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        FRAMING_HEADER: framing,
     }
-    return key_map.get(provider)
+    # 스트리밍 시작 전에 끝난 단계(설정 조회, 서비스 생성, DB 등)의 소요 시간
+    if timer is not None and SERVER_TIMING_ENABLED:
+        headers["Server-Timing"] = timer.server_timing()
+    return headers
+
+
+def stream_error_message(e: Exception) -> str:
+    """스트리밍 중 오류를 로그로 남기고 응답 끝에 붙일 안내 문구 반환"""
+    if isinstance(e, QueueFullError):
+        logger.warning(f"Rejected stream: {e}")
+        return "\n\n요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요."
+    if isinstance(e, httpx.TimeoutException):
+        logger.error(f"Timeout error during streaming: {e}")
+        return "\n\n요청 시간이 초과되었습니다. 다시 시도해주세요."
+    if isinstance(e, httpx.NetworkError):
+        logger.error(f"Network error during streaming: {e}")
+        return "\n\n네트워크 오류가 발생했습니다. 연결을 확인해주세요."
+    logger.error(f"Unexpected error during streaming: {e}")
+    return "\n\n오류가 발생했습니다. 다시 시도해주세요."
+
+
+def stream_outcome(active: ActiveStream) -> str:
+    return f"cancelled_{active.reason}" if active.is_cancelled else "completed"
 
 
 @router.post("/chat")
-async def chat(request: ChatRequest, db: AsyncSession = Depends(get_db)):
+async def chat(
+    request: ChatRequest,
+    http_request: Request,
+    framing: Framing = Header("json", alias=FRAMING_HEADER),
+    db: AsyncSession = Depends(get_db),
+):
     """기존 스트리밍 채팅 (저장 없음) - 임시 채팅용"""
     provider = get_provider_from_model(request.model)
-    api_key = await get_api_key_for_provider(db, provider) if provider != "ollama" else None
+    timer = RequestTimer("chat", provider, metrics_model(request.model))
+    with timer.stage("settings"):
+        api_key = await get_api_key_for_provider(db, provider) if provider != "ollama" else None
 
-    if provider != "ollama" and not api_key:
+    if LLMServiceFactory.requires_api_key(provider) and not api_key:
         raise HTTPException(status_code=400, detail=f"API key for {provider} is not configured")
+    ensure_capacity(provider)
 
-    llm_service = LLMServiceFactory.create(provider, api_key)
+    with timer.stage("service"):
+        llm_service = await create_llm_service(db, request.model, provider, api_key)
+    prompt: Prompt = request.message
+    if request.use_memory:
+        with timer.stage("memory"):
+            prompt = await memory_index.augment(prompt, request.message)
+    framer = StreamFramer(framing, on_token=timer.token)
 
     async def generate():
-        async for chunk in llm_service.stream(request.message, request.model):
-            yield f"data: {json.dumps({'content': chunk})}\n\n"
-        yield "data: [DONE]\n\n"
+        active = stream_registry.register(str(uuid.uuid4()))
+        watcher = asyncio.create_task(watch_disconnect(http_request, active))
+        try:
+            # 헤더를 보낸 뒤라 오류는 HTTP 상태 대신 안내 문구로 전달하고 [DONE]으로 마무리
+            try:
+                upstream = active.guard(llm_service.stream_events(prompt, request.model))
+                async for chunk in framer.coalesce(upstream):
+                    if isinstance(chunk, QueuePosition):
+                        yield framer.event("queued", {"position": chunk.position})
+                        continue
+                    yield framer.content(chunk)
+            except Exception as e:
+                yield framer.content(stream_error_message(e))
+            if SSE_STATS_EVENT:
+                yield framer.event("stats", timer.summary())
+            yield framer.done()
+            framer.log_report()
+        finally:
+            watcher.cancel()
+            stream_registry.finish(active, framer.tokens)
+            timer.finish(stream_outcome(active), framer.frames, framer.bytes)
 
     return StreamingResponse(
-        generate(),
+        timed_frames(generate(), timer),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        },
+        headers=stream_headers(framing, timer),
     )
 
 
@@ -86,6 +215,8 @@ async def create_chat(request: ChatCreate, db: AsyncSession = Depends(get_db)):
     db.add(chat)
     await db.commit()
     await db.refresh(chat)
+    # 바꾼 모델을 첫 메시지 전에 미리 로드
+    model_residency.warm_in_background(request.model)
     return chat
 
 
@@ -93,98 +224,171 @@ async def create_chat(request: ChatCreate, db: AsyncSession = Depends(get_db)):
 async def chat_with_save(
     chat_id: str,
     request: ChatRequest,
-    db: AsyncSession = Depends(get_db),
+    http_request: Request,
+    framing: Framing = Header("json", alias=FRAMING_HEADER),
+    resumable: bool = Header(False, alias=RESUMABLE_HEADER),
 ):
-    """스트리밍 채팅 + DB 저장"""
-    # Provider 및 API 키 확인
-    provider = get_provider_from_model(request.model)
-    api_key = await get_api_key_for_provider(db, provider) if provider != "ollama" else None
-
-    if provider != "ollama" and not api_key:
-        raise HTTPException(status_code=400, detail=f"API key for {provider} is not configured")
-
-    llm_service = LLMServiceFactory.create(provider, api_key)
+    """스트리밍 채팅 + DB 저장
 
+    응답은 서버 task에서 생성하고 frame마다 SSE id를 붙인다. X-Stream-Resumable: 1이면
+    연결이 끊겨도 생성을 계속하며 GET /api/chat/{chat_id}/stream으로 다시 붙을 수 있다.
+    """
     # "new" 채팅인지 확인
     is_new_chat = chat_id == "new"
     actual_chat_id = str(uuid.uuid4()) if is_new_chat else chat_id
-    chat = None
 
-    if not is_new_chat:
-        # 기존 채팅 조회
-        result = await db.execute(select(Chat).where(Chat.id == chat_id))
-        chat = result.scalar_one_or_none()
-        if not chat:
-            raise HTTPException(status_code=404, detail="Chat not found")
+    provider = get_provider_from_model(request.model)
+    timer = RequestTimer("chat_with_save", provider, metrics_model(request.model))
+
+    # 스트리밍 전에 짧은 트랜잭션으로 Chat + User 메시지 저장 후 세션 반환
+    async with async_session() as db:
+        # Provider 및 API 키 확인
+        with timer.stage("settings"):
+            api_key = (
+                await get_api_key_for_provider(db, provider) if provider != "ollama" else None
+            )
 
-    # AI 응답 스트리밍 + 저장
-    ai_content: list[str] = []
+        if LLMServiceFactory.requires_api_key(provider) and not api_key:
+            raise HTTPException(status_code=400, detail=f"API key for {provider} is not configured")
+        ensure_capacity(provider)
 
-    async def generate():
-        nonlocal ai_content
+        with timer.stage("service"):
+            llm_service = await create_llm_service(db, request.model, provider, api_key)
+        prompt: Prompt = request.message
 
-        # 새 채팅이면 chat_created 이벤트 먼저 전송
-        if is_new_chat:
-            yield f"event: chat_created\ndata: {json.dumps({'chat_id': actual_chat_id})}\n\n"
-
-        try:
-            async for chunk in llm_service.stream(request.message, request.model):
-                ai_content.append(chunk)
-                yield f"data: {json.dumps({'content': chunk})}\n\n"
-        except httpx.TimeoutException as e:
-            logger.error(f"Timeout error during streaming: {e}")
-            error_msg = "\n\n요청 시간이 초과되었습니다. 다시 시도해주세요."
-            ai_content.append(error_msg)
-            yield f"data: {json.dumps({'content': error_msg})}\n\n"
-        except httpx.NetworkError as e:
-            logger.error(f"Network error during streaming: {e}")
-            error_msg = "\n\n네트워크 오류가 발생했습니다. 연결을 확인해주세요."
-            ai_content.append(error_msg)
-            yield f"data: {json.dumps({'content': error_msg})}\n\n"
-        except Exception as e:
-            logger.error(f"Unexpected error during streaming: {e}")
-            error_msg = "\n\n오류가 발생했습니다. 다시 시도해주세요."
-            ai_content.append(error_msg)
-            yield f"data: {json.dumps({'content': error_msg})}\n\n"
-
-        # 스트리밍 성공 시에만 Chat + User + AI 메시지 함께 저장
         if is_new_chat:
             # 새 채팅 생성
-            new_chat = Chat(
-                id=actual_chat_id,
-                title=request.message[:50],
-                model=request.model,
+            db.add(
+                Chat(
+                    id=actual_chat_id,
+                    title=request.message[:50],
+                    model=request.model,
+                )
             )
-            db.add(new_chat)
         else:
-            # 기존 채팅 updated_at 갱신
+            # 기존 채팅 조회 + updated_at 갱신
+            with timer.stage("db"):
+                result = await db.execute(select(Chat).where(Chat.id == chat_id))
+                chat = result.scalar_one_or_none()
+            if not chat:
+                raise HTTPException(status_code=404, detail="Chat not found")
             chat.updated_at = datetime.utcnow()
 
-        user_msg = Message(
-            id=str(uuid.uuid4()),
-            chat_id=actual_chat_id,
-            role="user",
-            content=request.message,
+            # 이전 대화를 토큰 예산에 맞춰 포함 (현재 메시지 저장 전에 조회)
+            with timer.stage("context"):
+                prompt = await context_builder.build(
+                    db, chat_id, request.message, request.model, llm_service
+                )
+
+        db.add(
+            Message(
+                id=str(uuid.uuid4()),
+                chat_id=actual_chat_id,
+                role="user",
+                content=request.message,
+            )
         )
-        db.add(user_msg)
+        with timer.stage("db"):
+            await db.commit()
+
+    # 다른 채팅의 관련 메시지를 프롬프트 앞에 추가 (현재 채팅은 context가 담당)
+    if request.use_memory:
+        with timer.stage("memory"):
+            prompt = await memory_index.augment(
+                prompt, request.message, exclude_chat_id=actual_chat_id
+            )
 
-        ai_msg = Message(
-            id=str(uuid.uuid4()),
-            chat_id=actual_chat_id,
-            role="assistant",
-            content="".join(ai_content),
-        )
-        db.add(ai_msg)
+    # AI 응답 스트리밍 + 중간 저장
+    checkpoint = ResponseCheckpointer(actual_chat_id)
+    framer = StreamFramer(framing, on_token=timer.token)
 
-        await db.commit()
+    async def generate(buffer: ReplayBuffer):
+        """응답 생성 task (HTTP 연결과 별개로 실행, frame은 replay 버퍼로 전달)"""
+        # 새 채팅이면 chat_created 이벤트 먼저 전송
+        if is_new_chat:
+            buffer.push(framer.event("chat_created", {"chat_id": actual_chat_id}))
+
+        checkpoint.begin()
+        active = stream_registry.register(actual_chat_id)
+        # resumable이 아니면 연결이 끊길 때 upstream 생성을 중단 (토큰 대기 중에도 감지)
+        watcher = None
+        if not resumable:
+            watcher = asyncio.create_task(watch_disconnect(http_request, active))
+        try:
+            try:
+                upstream = active.guard(llm_service.stream_events(prompt, request.model))
+                async for chunk in framer.coalesce(upstream):
+                    # 동시 실행 한도에 걸려 대기 중이면 대기열 위치를 알림
+                    if isinstance(chunk, QueuePosition):
+                        buffer.push(framer.event("queued", {"position": chunk.position}))
+                        continue
+                    checkpoint.add(chunk)
+                    buffer.push(framer.content(chunk))
+            except Exception as e:
+                error_msg = stream_error_message(e)
+                checkpoint.add(error_msg)
+                buffer.push(framer.content(error_msg))
+
+            try:
+                # [DONE] 이후 채팅을 다시 조회해도 AI 메시지가 보이도록 commit까지 대기
+                with timer.stage("save"):
+                    if active.is_cancelled:
+                        await checkpoint.abort()
+                    else:
+                        await checkpoint.complete()
+                memory_index.notify()
+            except Exception as e:
+                logger.error(f"Failed to save assistant message: {e}")
+
+            if active.is_cancelled:
+                buffer.push(framer.event("cancelled", {"reason": active.reason}))
+            if SSE_STATS_EVENT:
+                buffer.push(framer.event("stats", timer.summary()))
+            buffer.push(framer.done())
+            framer.log_report()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            stream_registry.finish(active, framer.tokens)
+            timer.finish(stream_outcome(active), framer.frames, framer.bytes)
+            # 이번 응답이 끝난 뒤에 rolling summary 갱신 (응답과 슬롯을 다투지 않게)
+            context_builder.summarize_pending(actual_chat_id)
+            # 서버 종료 등으로 중단되면 지금까지의 응답을 aborted로 저장
+            checkpoint.abort()
+
+    buffer = replay_registry.start(actual_chat_id, framing, generate)
+    return StreamingResponse(
+        timed_frames(buffer.subscribe(), timer),
+        media_type="text/event-stream",
+        headers=stream_headers(framing, timer),
+    )
 
-        yield "data: [DONE]\n\n"
 
+@router.get("/chat/{chat_id}/stream")
+async def resume_chat_stream(
+    chat_id: str,
+    last_event_id: int | None = Header(None, alias="Last-Event-ID"),
+    cursor: int | None = Query(None, alias="last_event_id"),
+):
+    """끊긴 응답 스트림에 다시 연결
+
+    Last-Event-ID(헤더 또는 last_event_id 쿼리) 이후의 frame을 replay한 뒤
+    진행 중인 응답을 이어서 전달한다. 완료된 스트림도 REPLAY_GRACE_TTL 동안은
+    다시 받을 수 있다.
+    """
+    buffer = replay_registry.get(chat_id)
+    if buffer is None:
+        raise HTTPException(status_code=404, detail="No stream to resume for this chat")
     return StreamingResponse(
-        generate(),
+        buffer.subscribe(last_event_id if last_event_id is not None else cursor),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        },
+        headers=stream_headers(buffer.framing),
     )
+
+
+@router.post("/chat/{chat_id}/cancel")
+async def cancel_chat_stream(chat_id: str):
+    """진행 중인 응답 생성 중단 (지금까지의 응답은 aborted로 저장)"""
+    if not stream_registry.cancel(chat_id, reason="user"):
+        raise HTTPException(status_code=404, detail="No active stream for this chat")
+    return {"status": "cancelled"}
@@ -1,25 +1,94 @@
 import uuid
+from datetime import datetime, timedelta
+from typing import Literal
 
+from config import (
+    CHATS_DELETE_MAX,
+    CHATS_PAGE_MAX,
+    CHATS_PAGE_SIZE,
+    MESSAGES_PAGE_MAX,
+    MESSAGES_PAGE_SIZE,
+)
 from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
-from models.chat import Chat
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from models.chat import Chat, Message
 from schemas.chat import (
     ChatCreate,
     ChatDetailResponse,
+    ChatListItem,
     ChatResponse,
     ChatUpdate,
+    MessagePage,
 )
-from sqlalchemy import select
+from services.maintenance import db_maintenance
+from services.pagination import decode_cursor, encode_cursor
+from services.streams import stream_registry
+from sqlalchemy import delete, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 router = APIRouter(prefix="/api/chats", tags=["chats"])
 
+# opened_at 갱신 간격 (채팅을 열 때마다 쓰지 않도록)
+OPENED_AT_RESOLUTION = timedelta(hours=1)
+
+
+@router.get("", response_model=list[ChatResponse] | list[ChatListItem])
+async def list_chats(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=CHATS_PAGE_MAX),
+    cursor: str | None = None,
+    fields: Literal["full", "summary"] = "full",
+    db: AsyncSession = Depends(get_db),
+):
+    """채팅 목록 (updated_at 내림차순)
+
+    limit 또는 cursor를 주면 (updated_at, id) keyset 페이지네이션으로 동작하고
+    다음 페이지 cursor를 X-Next-Cursor 헤더로 반환한다.
+    fields=summary면 id, title, updated_at만 조회한다.
+    """
+    if fields == "summary":
+        query = select(Chat.id, Chat.title, Chat.updated_at)
+    else:
+        query = select(Chat)
+    query = query.order_by(Chat.updated_at.desc(), Chat.id.desc())
 
-@router.get("", response_model=list[ChatResponse])
-async def list_chats(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Chat).order_by(Chat.updated_at.desc()))
-    return result.scalars().all()
+    paginate = limit is not None or cursor is not None
+    if cursor:
+        try:
+            updated_at, chat_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Chat.updated_at, Chat.id) < (updated_at, chat_id))
+    if paginate:
+        page_size = limit or CHATS_PAGE_SIZE
+        # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+        query = query.limit(page_size + 1)
+
+    result = await db.execute(query)
+    chats = result.all() if fields == "summary" else result.scalars().all()
+
+    if paginate and len(chats) > page_size:
+        chats = chats[:page_size]
+        last = chats[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.updated_at, last.id)
+    return chats
+
+
+@router.delete("")
+async def delete_chats(
+    ids: list[str] = Query(..., description="?ids=a&ids=b 또는 ?ids=a,b"),
+    db: AsyncSession = Depends(get_db),
+):
+    """여러 채팅 삭제 (없는 id는 무시하고 지운 수 반환)"""
+    chat_ids = list(dict.fromkeys(i for value in ids for i in value.split(",") if i))
+    if not chat_ids:
+        raise HTTPException(status_code=400, detail="No chat ids")
+    if len(chat_ids) > CHATS_DELETE_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"Too many chats (max {CHATS_DELETE_MAX})"
+        )
+    return {"status": "deleted", "deleted": await _delete_chats(db, chat_ids)}
 
 
 @router.post("", response_model=ChatResponse)
@@ -31,28 +100,102 @@ async def create_chat(chat: ChatCreate, db: AsyncSession = Depends(get_db)):
     return new_chat
 
 
-@router.get("/{chat_id}", response_model=ChatDetailResponse)
-async def get_chat(chat_id: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Chat).where(Chat.id == chat_id).options(selectinload(Chat.messages))
-    )
+@router.get("/{chat_id}", response_model=ChatDetailResponse | ChatResponse)
+async def get_chat(
+    chat_id: str,
+    include_messages: bool = True,
+    db: AsyncSession = Depends(get_db),
+):
+    """채팅 조회 (include_messages=false면 메시지 없이 헤더만)"""
+    query = select(Chat).where(Chat.id == chat_id)
+    if include_messages:
+        query = query.options(selectinload(Chat.messages))
+    result = await db.execute(query)
     chat = result.scalar_one_or_none()
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
+    if not include_messages:
+        return ChatResponse.model_validate(chat)
+    await _mark_opened(db, chat)
     return chat
 
 
+@router.get("/{chat_id}/messages", response_model=MessagePage)
+async def list_messages(
+    chat_id: str,
+    limit: int = Query(MESSAGES_PAGE_SIZE, ge=1, le=MESSAGES_PAGE_MAX),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """최신 메시지 limit개 조회, next_cursor로 이전 메시지를 이어서 조회"""
+    chat = await db.get(Chat, chat_id)
+    if not chat:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    await _mark_opened(db, chat)
+
+    query = (
+        select(Message)
+        .where(Message.chat_id == chat_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        try:
+            created_at, message_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(Message.created_at, Message.id) < (created_at, message_id)
+        )
+
+    result = await db.execute(query)
+    messages = result.scalars().all()
+
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        oldest = messages[-1]
+        next_cursor = encode_cursor(oldest.created_at, oldest.id)
+
+    return MessagePage(messages=list(reversed(messages)), next_cursor=next_cursor)
+
+
 @router.delete("/{chat_id}")
 async def delete_chat(chat_id: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Chat).where(Chat.id == chat_id))
-    chat = result.scalar_one_or_none()
-    if not chat:
+    if not await _delete_chats(db, [chat_id]):
         raise HTTPException(status_code=404, detail="Chat not found")
-    await db.delete(chat)
-    await db.commit()
     return {"status": "deleted"}
 
 
+async def _mark_opened(db: AsyncSession, chat: Chat):
+    """채팅을 연 시각 기록 (cold storage 대상 판단용, 사이드바 순서는 유지)"""
+    now = datetime.utcnow()
+    if chat.opened_at and now - chat.opened_at < OPENED_AT_RESOLUTION:
+        return
+    await db.execute(
+        update(Chat)
+        .where(Chat.id == chat.id)
+        .values(opened_at=now, updated_at=Chat.updated_at)
+    )
+    await db.commit()
+
+
+async def _delete_chats(db: AsyncSession, chat_ids: list[str]) -> int:
+    """DELETE 한 번으로 채팅 삭제, 지운 채팅 수 반환
+
+    메시지와 요약은 FK의 ON DELETE CASCADE로 DB 안에서 지워지므로 ORM으로
+    불러오지 않는다. 빈 페이지는 유휴 시간에 db_maintenance가 회수한다.
+    """
+    # 진행 중인 응답 생성은 먼저 멈춤 (지워진 채팅에 중간 저장하지 않도록)
+    for chat_id in chat_ids:
+        stream_registry.cancel(chat_id, reason="deleted")
+    result = await db.execute(delete(Chat).where(Chat.id.in_(chat_ids)))
+    await db.commit()
+    if result.rowcount:
+        db_maintenance.notify()
+    return result.rowcount
+
+
 @router.patch("/{chat_id}", response_model=ChatResponse)
 async def update_chat(
     chat_id: str, update: ChatUpdate, db: AsyncSession = Depends(get_db)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from config import MEMORY_TOP_K
+from schemas.memory import MemorySearchResponse, MemoryStatus
+from services.memory import memory_index
+
+router = APIRouter(prefix="/api/memory", tags=["memory"])
+
+
+@router.get("/search", response_model=MemorySearchResponse)
+async def search_memory(
+    q: str = Query(..., min_length=1),
+    k: int = Query(MEMORY_TOP_K, ge=1, le=50),
+    exclude_chat_id: str | None = None,
+):
+    """의미가 비슷한 이전 메시지 검색 (exclude_chat_id의 메시지는 제외)"""
+    if not memory_index.enabled:
+        raise HTTPException(status_code=503, detail="Semantic memory is disabled")
+    results = await memory_index.search(q, k, exclude_chat_id=exclude_chat_id)
+    return MemorySearchResponse(results=results)
+
+
+@router.get("/status", response_model=MemoryStatus)
+async def memory_status():
+    return MemoryStatus(**memory_index.stats())
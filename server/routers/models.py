@@ -1,14 +1,21 @@
+import hashlib
+import json
+import logging
+
 import httpx
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
-from models.settings import Settings
+from routers.settings import get_or_create_settings
+from schemas.models import ModelPinUpdate, ModelResidencyResponse
+from services.model_catalog import model_catalog
+from services.model_residency import model_residency
+from services.settings_cache import SettingsSnapshot, settings_cache
 
-router = APIRouter(prefix="/api")
+logger = logging.getLogger(__name__)
 
-OLLAMA_BASE_URL = "http://localhost:11434"
+router = APIRouter(prefix="/api")
 
 # 각 Provider별 지원 모델 목록
 OPENAI_MODELS = []
@@ -22,39 +29,20 @@ GOOGLE_MODELS = [
 GROQ_MODELS = []
 
 
-async def get_settings(db: AsyncSession) -> Settings | None:
-    """설정 조회"""
-    result = await db.execute(select(Settings).where(Settings.id == 1))
-    return result.scalar_one_or_none()
+async def get_settings(db: AsyncSession) -> SettingsSnapshot | None:
+    """설정 조회 (설정 캐시 사용)"""
+    return await settings_cache.get(db)
 
 
 @router.get("/models")
-async def list_models(db: AsyncSession = Depends(get_db)):
-    """모델 목록 조회 (Ollama + API 키가 설정된 Provider)"""
-    models = []
-    ollama_status = "running"  # "running" | "not_running"
+async def list_models(request: Request, db: AsyncSession = Depends(get_db)):
+    """모델 목록 조회 (Ollama + API 키가 설정된 Provider)
 
-    # 1. Ollama 모델 목록 조회
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{OLLAMA_BASE_URL}/api/tags")
-            if response.status_code == 200:
-                data = response.json()
-                for model in data.get("models", []):
-                    name = model.get("name", "")
-                    size = model.get("size", 0)
-                    size_gb = round(size / (1024 * 1024 * 1024), 1)
-
-                    models.append(
-                        {
-                            "id": name,
-                            "name": name,
-                            "provider": "ollama",
-                            "size": f"{size_gb}GB" if size_gb > 0 else None,
-                        }
-                    )
-    except httpx.RequestError:
-        ollama_status = "not_running"
+    응답 본문 해시를 ETag로 내려주고, If-None-Match가 같으면 304를 반환한다.
+    """
+    # 1. Ollama 모델 목록 조회 (카탈로그 캐시)
+    ollama_models, ollama_status = await model_catalog.get_ollama_models()
+    models = list(ollama_models)
 
     # 2. API 키가 설정된 Provider 모델 추가
     settings = await get_settings(db)
@@ -68,4 +56,51 @@ async def list_models(db: AsyncSession = Depends(get_db)):
         if settings.groq_api_key:
             models.extend(GROQ_MODELS)
 
-    return {"models": models, "ollama_status": ollama_status}
+    content = {"models": models, "ollama_status": ollama_status}
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/models/residency", response_model=ModelResidencyResponse)
+async def get_model_residency():
+    """Ollama 모델 상주 상태 (로드 여부, 고정 여부, keep_alive)"""
+    _, ollama_status = await model_catalog.get_ollama_models()
+    if ollama_status == "running":
+        try:
+            await model_residency.refresh_loaded()
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to read loaded Ollama models: {e}")
+    return ModelResidencyResponse(
+        models=model_residency.status(), ollama_status=ollama_status
+    )
+
+
+@router.put("/models/pins", response_model=ModelResidencyResponse)
+async def update_model_pin(data: ModelPinUpdate, db: AsyncSession = Depends(get_db)):
+    """Ollama 모델 고정/해제 (고정한 모델은 keep_alive=-1로 계속 상주)"""
+    settings = await get_or_create_settings(db)
+    pinned = set(json.loads(settings.pinned_models or "[]"))
+    if data.pinned:
+        pinned.add(data.model)
+    else:
+        pinned.discard(data.model)
+    settings.pinned_models = json.dumps(sorted(pinned))
+    await db.commit()
+    await db.refresh(settings)
+    settings_cache.update(settings)
+
+    try:
+        if data.pinned:
+            await model_residency.pin(data.model)
+        else:
+            await model_residency.unpin(data.model)
+    except httpx.HTTPError as e:
+        # 고정 상태는 저장됐으므로 Ollama가 다시 뜨면 다음 시작 때 로드됨
+        logger.warning(f"Failed to apply keep_alive for {data.model}: {e}")
+
+    return await get_model_residency()
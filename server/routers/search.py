@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from schemas.search import SearchResponse
+from services.search import search
+
+router = APIRouter(prefix="/api", tags=["search"])
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_chats(
+    q: str = Query(..., min_length=1),
+    chat_id: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """채팅 기록 전문 검색 (chat_id로 특정 채팅만 검색)"""
+    conn = await db.connection()
+    # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+    results = await search(conn, q, chat_id=chat_id, limit=limit + 1, offset=offset)
+
+    next_offset = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_offset = offset + limit
+
+    return SearchResponse(results=results, next_offset=next_offset)
@@ -5,6 +5,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models.settings import Settings
 from schemas.settings import SettingsResponse, SettingsUpdate, mask_api_key
+from services.client_registry import client_registry
+from services.model_residency import model_residency
+from services.settings_cache import SettingsSnapshot, settings_cache
+
+API_KEY_FIELDS = {
+    "openai": "openai_api_key",
+    "anthropic": "anthropic_api_key",
+    "google": "google_api_key",
+    "groq": "groq_api_key",
+}
 
 router = APIRouter(prefix="/api")
 
@@ -23,11 +33,8 @@ async def get_or_create_settings(db: AsyncSession) -> Settings:
     return settings
 
 
-@router.get("/settings", response_model=SettingsResponse)
-async def get_settings(db: AsyncSession = Depends(get_db)):
-    """설정 조회 (API 키는 마스킹)"""
-    settings = await get_or_create_settings(db)
-
+def build_settings_response(settings: Settings | SettingsSnapshot) -> SettingsResponse:
+    """설정을 응답 스키마로 변환 (API 키는 마스킹)"""
     return SettingsResponse(
         openai_api_key=mask_api_key(settings.openai_api_key),
         anthropic_api_key=mask_api_key(settings.anthropic_api_key),
@@ -41,12 +48,27 @@ async def get_settings(db: AsyncSession = Depends(get_db)):
     )
 
 
+@router.get("/settings", response_model=SettingsResponse)
+async def get_settings(db: AsyncSession = Depends(get_db)):
+    """설정 조회 (API 키는 마스킹)"""
+    settings = await settings_cache.get(db)
+
+    if not settings:
+        settings = await get_or_create_settings(db)
+        settings_cache.update(settings)
+
+    return build_settings_response(settings)
+
+
 @router.patch("/settings", response_model=SettingsResponse)
 async def update_settings(
     data: SettingsUpdate, db: AsyncSession = Depends(get_db)
 ):
     """설정 업데이트"""
     settings = await get_or_create_settings(db)
+    previous_keys = {
+        provider: getattr(settings, field) for provider, field in API_KEY_FIELDS.items()
+    }
 
     # None이 아닌 값만 업데이트
     if data.openai_api_key is not None:
@@ -65,19 +87,20 @@ async def update_settings(
         settings.groq_api_key = data.groq_api_key if data.groq_api_key else None
 
     if data.default_model is not None:
+        if data.default_model != settings.default_model:
+            model_residency.warm_in_background(data.default_model)
         settings.default_model = data.default_model
 
     await db.commit()
     await db.refresh(settings)
 
-    return SettingsResponse(
-        openai_api_key=mask_api_key(settings.openai_api_key),
-        anthropic_api_key=mask_api_key(settings.anthropic_api_key),
-        google_api_key=mask_api_key(settings.google_api_key),
-        groq_api_key=mask_api_key(settings.groq_api_key),
-        default_model=settings.default_model or "gemma3:1b",
-        openai_enabled=bool(settings.openai_api_key),
-        anthropic_enabled=bool(settings.anthropic_api_key),
-        google_enabled=bool(settings.google_api_key),
-        groq_enabled=bool(settings.groq_api_key),
-    )
+    # 설정 캐시 write-through
+    settings_cache.update(settings)
+
+    # 키가 바뀐 provider의 캐시된 클라이언트 정리
+    for provider, field in API_KEY_FIELDS.items():
+        new_key = getattr(settings, field)
+        if new_key != previous_keys[provider]:
+            await client_registry.invalidate(provider, keep_api_key=new_key)
+
+    return build_settings_response(settings)
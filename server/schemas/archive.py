@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class ImportResponse(BaseModel):
+    chats_imported: int
+    chats_skipped: int
+    messages_imported: int
+    messages_skipped: int
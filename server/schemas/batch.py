@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class BatchRequest(BaseModel):
+    prompts: list[str] = Field(min_length=1)
+    models: list[str] = Field(min_length=1)
+
+
+class BatchJobResult(BaseModel):
+    """NDJSON으로 내려가는 작업 결과 한 줄"""
+
+    type: str = "job"
+    job_id: str
+    position: int
+    prompt_index: int
+    model: str
+    status: str
+    output: str | None = None
+    error: str | None = None
+    ttft_ms: float | None = None
+    duration_ms: float | None = None
+    # 출력 토큰 수 (services.context.estimate_tokens 추정치)
+    tokens: int | None = None
+    # 재개 시 이전 실행에서 이미 완료된 결과인지
+    resumed: bool = False
+
+    class Config:
+        from_attributes = True
+
+
+class BatchResponse(BaseModel):
+    id: str
+    status: str
+    created_at: datetime
+    jobs: list[BatchJobResult] = []
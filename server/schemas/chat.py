@@ -7,6 +7,8 @@ from pydantic import BaseModel
 class ChatRequest(BaseModel):
     message: str
     model: str = "gemma3:1b"
+    # 다른 채팅에서 관련 메시지를 검색해 프롬프트에 추가 (semantic memory)
+    use_memory: bool = False
 
 
 class ChatMessage(BaseModel):
@@ -25,6 +27,7 @@ class MessageResponse(BaseModel):
     chat_id: str
     role: str
     content: str
+    status: str = "complete"
     created_at: datetime
 
     class Config:
@@ -51,5 +54,24 @@ class ChatResponse(BaseModel):
         from_attributes = True
 
 
+class ChatListItem(BaseModel):
+    """사이드바용 경량 채팅 항목 (fields=summary)"""
+
+    id: str
+    title: str
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class ChatDetailResponse(ChatResponse):
     messages: list[MessageResponse] = []
+
+
+class MessagePage(BaseModel):
+    """최신 메시지부터 페이지 단위로 조회 (messages는 오래된 순)"""
+
+    messages: list[MessageResponse] = []
+    # 더 오래된 메시지를 불러올 cursor (없으면 None)
+    next_cursor: str | None = None
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class MemoryHit(BaseModel):
+    message_id: str
+    chat_id: str
+    chat_title: str
+    role: str
+    content: str
+    created_at: datetime
+    # cosine 유사도 (-1 ~ 1)
+    score: float
+
+
+class MemorySearchResponse(BaseModel):
+    results: list[MemoryHit] = []
+
+
+class MemoryStatus(BaseModel):
+    enabled: bool
+    embedder: str | None = None
+    dim: int | None = None
+    vectors: int
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+
+class ModelPinUpdate(BaseModel):
+    model: str
+    pinned: bool = True
+
+
+class ModelResidencyItem(BaseModel):
+    model: str
+    loaded: bool
+    pinned: bool
+    keep_alive: str | int
+    # Ollama가 알려준 만료 시각 (고정 모델은 먼 미래, 모르면 None)
+    expires_at: str | None = None
+
+
+class ModelResidencyResponse(BaseModel):
+    models: list[ModelResidencyItem] = []
+    ollama_status: str
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    chat_id: str
+    chat_title: str
+    # 채팅 제목이 일치한 경우 message_id, role은 None
+    message_id: str | None = None
+    role: str | None = None
+    snippet: str
+    # 같은 종류(제목/메시지) 결과끼리만 비교할 수 있는 bm25 점수 (작을수록 관련도 높음)
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    results: list[SearchResult] = []
+    # 다음 페이지 offset (없으면 None)
+    next_offset: int | None = None
@@ -0,0 +1,202 @@
+"""채팅 기록 내보내기/가져오기 (gzip NDJSON 아카이브)
+
+한 줄에 레코드 하나씩 header, chat, message 순서로 기록한다. 내보내기는
+server-side cursor로 EXPORT_FETCH_SIZE개씩 읽어 바로 압축해 내보내고, 가져오기는
+압축을 풀며 줄 단위로 읽어 IMPORT_BATCH_SIZE개씩 executemany로 넣는다. 어느 쪽도
+기록 전체를 메모리에 올리지 않는다.
+
+    {"type": "header", "format": "otemee-archive", "version": 1, ...}
+    {"type": "chat", "id": "...", "title": "...", ...}
+    {"type": "message", "id": "...", "chat_id": "...", "role": "user", ...}
+"""
+
+import json
+import zlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import DateTime, Table, bindparam, exists, insert, select
+
+from config import EXPORT_FETCH_SIZE, IMPORT_BATCH_SIZE
+from database import async_session
+from models.chat import Chat, Message
+from services.sse import dumps
+
+ARCHIVE_FORMAT = "otemee-archive"
+ARCHIVE_VERSION = 1
+GZIP_MAGIC = b"\x1f\x8b"
+# gzip header/trailer를 쓰는 zlib wbits
+GZIP_WBITS = 31
+
+# 레코드 type -> 테이블 (가져올 때 FK 순서대로 chat을 먼저 넣음)
+TABLES: dict[str, Table] = {"chat": Chat.__table__, "message": Message.__table__}
+
+
+@dataclass
+class ImportStats:
+    chats_imported: int = 0
+    chats_skipped: int = 0
+    messages_imported: int = 0
+    messages_skipped: int = 0
+
+
+def _encode(record_type: str, row) -> bytes:
+    record = {"type": record_type}
+    for key, value in row._mapping.items():
+        record[key] = value.isoformat() if isinstance(value, datetime) else value
+    return dumps(record) + b"\n"
+
+
+async def export_archive() -> AsyncIterator[bytes]:
+    """전체 채팅과 메시지를 gzip NDJSON chunk로 스트리밍
+
+    한 세션(읽기 트랜잭션) 안에서 읽으므로 내보내는 도중 쓰기가 있어도 chat과
+    message가 같은 시점의 snapshot으로 맞춰진다.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS)
+    header = {
+        "type": "header",
+        "format": ARCHIVE_FORMAT,
+        "version": ARCHIVE_VERSION,
+        "exported_at": datetime.utcnow().isoformat(),
+    }
+    yield compressor.compress(dumps(header) + b"\n")
+
+    queries = [
+        ("chat", select(Chat.__table__).order_by(Chat.created_at, Chat.id)),
+        (
+            "message",
+            select(Message.__table__).order_by(
+                Message.chat_id, Message.created_at, Message.id
+            ),
+        ),
+    ]
+    async with async_session() as session:
+        for record_type, query in queries:
+            result = await session.stream(
+                query.execution_options(yield_per=EXPORT_FETCH_SIZE)
+            )
+            async for rows in result.partitions():
+                chunk = compressor.compress(b"".join(_encode(record_type, r) for r in rows))
+                if chunk:
+                    yield chunk
+    yield compressor.flush()
+
+
+async def _read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """요청 body를 (gzip이면 압축을 풀며) 줄 단위로 읽음"""
+    decompressor = None
+    pending = b""
+    first = True
+    async for chunk in chunks:
+        if first and chunk:
+            first = False
+            if chunk.startswith(GZIP_MAGIC):
+                decompressor = zlib.decompressobj(GZIP_WBITS)
+        if decompressor is not None:
+            try:
+                chunk = decompressor.decompress(chunk)
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip archive: {e}") from e
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if decompressor is not None:
+        if not decompressor.eof:
+            raise ValueError("Truncated gzip archive")
+        pending += decompressor.flush()
+    yield pending
+
+
+def _row(table: Table, record: dict) -> dict:
+    """NDJSON 레코드를 테이블 컬럼 값으로 변환 (없는 값은 기본값으로 채움)"""
+    row = {}
+    for column in table.columns:
+        value = record.get(column.name)
+        if value is None:
+            if column.default is not None and column.default.is_scalar:
+                value = column.default.arg
+            elif column.server_default is not None:
+                value = column.server_default.arg
+            elif isinstance(column.type, DateTime):
+                value = datetime.utcnow()
+            elif not column.nullable:
+                raise ValueError(f"{table.name}.{column.name} is required")
+        elif isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        row[column.name] = value
+    return row
+
+
+def _insert_statement(table: Table):
+    """INSERT OR IGNORE (FK가 있으면 참조하는 행이 있을 때만 넣음)
+
+    FK 위반은 OR IGNORE로 건너뛰지 않고 묶음 전체를 실패시키므로, 아카이브에
+    chat 없이 들어 있는 message는 SELECT ... WHERE EXISTS로 걸러낸다.
+    """
+    statement = insert(table).prefix_with("OR IGNORE")
+    if not table.foreign_keys:
+        return statement
+    values = select(*[bindparam(column.name, type_=column.type) for column in table.columns])
+    for fk in table.foreign_keys:
+        values = values.where(exists().where(fk.column == bindparam(fk.parent.name)))
+    return statement.from_select([column.name for column in table.columns], values)
+
+
+async def _insert(table: Table, rows: list[dict]) -> int:
+    """INSERT OR IGNORE executemany (이미 있는 id는 건너뜀), 넣은 행 수 반환"""
+    async with async_session() as session:
+        result = await session.execute(_insert_statement(table), rows)
+        await session.commit()
+    return result.rowcount
+
+
+async def import_archive(chunks: AsyncIterator[bytes]) -> ImportStats:
+    """아카이브를 읽어 없는 채팅/메시지만 추가
+
+    묶음마다 커밋하므로 큰 아카이브를 가져오는 동안에도 채팅 저장이 오래 막히지
+    않는다. 중간에 실패해도 다시 가져오면 이미 들어간 id는 건너뛴다.
+    """
+    stats = ImportStats()
+    pending: dict[str, list[dict]] = {record_type: [] for record_type in TABLES}
+
+    async def flush():
+        # message가 참조하는 chat을 먼저 넣음
+        for record_type, table in TABLES.items():
+            rows = pending[record_type]
+            if not rows:
+                continue
+            inserted = await _insert(table, rows)
+            if record_type == "chat":
+                stats.chats_imported += inserted
+                stats.chats_skipped += len(rows) - inserted
+            else:
+                stats.messages_imported += inserted
+                stats.messages_skipped += len(rows) - inserted
+            pending[record_type] = []
+
+    line_no = 0
+    async for line in _read_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            record_type = record.get("type")
+            if record_type == "header":
+                if record.get("format") != ARCHIVE_FORMAT:
+                    raise ValueError(f"Unknown archive format: {record.get('format')}")
+                if record.get("version", 0) > ARCHIVE_VERSION:
+                    raise ValueError(f"Unsupported archive version: {record.get('version')}")
+                continue
+            if record_type not in TABLES:
+                raise ValueError(f"Unknown record type: {record_type}")
+            pending[record_type].append(_row(TABLES[record_type], record))
+        except (ValueError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid archive line {line_no}: {e}") from e
+        if len(pending[record_type]) >= IMPORT_BATCH_SIZE:
+            await flush()
+    await flush()
+    return stats
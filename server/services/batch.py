@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import update
+
+from config import BATCH_CLOUD_CONCURRENCY, BATCH_OLLAMA_CONCURRENCY
+from database import async_session
+from models.batch import Batch, BatchJob
+from schemas.batch import BatchJobResult
+from services.context import estimate_tokens
+from services.llm import BaseLLMService
+from services.maintenance import db_maintenance
+from services.sse import dumps
+
+logger = logging.getLogger(__name__)
+
+# provider별 일괄 작업 동시 실행 수 (모든 batch가 공유)
+_provider_slots: dict[str, asyncio.Semaphore] = {}
+
+
+def provider_slot(provider: str) -> asyncio.Semaphore:
+    slot = _provider_slots.get(provider)
+    if slot is None:
+        limit = BATCH_OLLAMA_CONCURRENCY if provider == "ollama" else BATCH_CLOUD_CONCURRENCY
+        slot = _provider_slots[provider] = asyncio.Semaphore(limit)
+    return slot
+
+
+@dataclass
+class JobTarget:
+    """모델별로 한 번만 만든 LLM 서비스 (생성 실패 시 error)"""
+
+    provider: str
+    service: BaseLLMService | None = None
+    error: str | None = None
+
+
+async def run_job(job: BatchJobResult, prompt: str, target: JobTarget) -> BatchJobResult:
+    """작업 하나 실행 후 결과 저장 (실행 중에는 전체 VACUUM을 미룸)"""
+    with db_maintenance.writing():
+        if target.error is not None:
+            job.status, job.error = "error", target.error
+        else:
+            async with provider_slot(target.provider):
+                started = time.perf_counter()
+                chunks: list[str] = []
+                try:
+                    async for chunk in target.service.stream(prompt, job.model):
+                        if not chunks:
+                            job.ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                        chunks.append(chunk)
+                    job.status = "complete"
+                except Exception as e:
+                    logger.warning(f"Batch job {job.job_id} ({job.model}) failed: {e}")
+                    job.status, job.error = "error", f"{type(e).__name__}: {e}"
+                job.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+                job.output = "".join(chunks)
+                # 스트림에는 provider usage 정보가 없으므로 출력으로 추정
+                job.tokens = estimate_tokens(job.output) if job.output else 0
+
+        async with async_session() as session:
+            await session.execute(
+                update(BatchJob)
+                .where(BatchJob.id == job.job_id)
+                .values(
+                    status=job.status,
+                    output=job.output,
+                    error=job.error,
+                    ttft_ms=job.ttft_ms,
+                    duration_ms=job.duration_ms,
+                    tokens=job.tokens,
+                    finished_at=datetime.utcnow(),
+                )
+            )
+            await session.commit()
+    return job
+
+
+async def set_batch_status(batch_id: str, status: str):
+    async with async_session() as session:
+        await session.execute(
+            update(Batch)
+            .where(Batch.id == batch_id)
+            .values(status=status, updated_at=datetime.utcnow())
+        )
+        await session.commit()
+
+
+async def stream_batch(
+    batch_id: str,
+    jobs: list[tuple[BatchJobResult, str]],
+    targets: dict[str, JobTarget],
+) -> AsyncIterator[bytes]:
+    """작업을 동시에 실행하며 끝나는 순서대로 NDJSON 줄을 내보냄
+
+    이미 완료된 작업(재개)은 바로 내보낸다. 연결이 끊기면 실행 중인 작업을
+    취소하고, 남은 작업은 pending으로 남아 /resume로 이어서 실행할 수 있다.
+    """
+    started = time.perf_counter()
+    yield dumps({"type": "batch", "batch_id": batch_id, "jobs": len(jobs)}) + b"\n"
+
+    done = [job for job, _ in jobs if job.status == "complete"]
+    for job in done:
+        job.resumed = True
+        yield dumps(job.model_dump()) + b"\n"
+
+    tasks = [
+        asyncio.create_task(run_job(job, prompt, targets[job.model]))
+        for job, prompt in jobs
+        if job.status != "complete"
+    ]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            job = await finished
+            done.append(job)
+            yield dumps(job.model_dump()) + b"\n"
+    finally:
+        failed = sum(job.status != "complete" for job in done)
+        status = "complete" if not failed and len(done) == len(jobs) else "partial"
+        # 연결이 끊겨 이 generator가 취소되는 중에도 상태는 기록되도록 별도 task로 저장
+        saving = asyncio.create_task(set_batch_status(batch_id, status))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.shield(saving)
+
+    yield dumps(
+        {
+            "type": "done",
+            "batch_id": batch_id,
+            "status": status,
+            "completed": len(done) - failed,
+            "failed": failed,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    ) + b"\n"
@@ -0,0 +1,89 @@
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import update
+
+from config import CHECKPOINT_EVERY_CHUNKS, CHECKPOINT_INTERVAL
+from database import async_session
+from models.chat import Message
+from services.write_queue import MessageWriteQueue, message_queue
+
+
+class ResponseCheckpointer:
+    """스트리밍 중인 AI 응답을 주기적으로 DB에 이어 붙이는 헬퍼
+
+    시작 시 status="streaming"인 빈 메시지를 만들고, chunk 수나 시간 간격에
+    도달할 때마다 모인 텍스트를 write-behind 큐로 넘긴다. 큐 쓰기는 기다리지
+    않으므로 토큰 스트림을 늦추지 않는다.
+    """
+
+    def __init__(
+        self,
+        chat_id: str,
+        queue: MessageWriteQueue = message_queue,
+        every_chunks: int = CHECKPOINT_EVERY_CHUNKS,
+        interval: float = CHECKPOINT_INTERVAL,
+    ):
+        self.chat_id = chat_id
+        self.message_id = str(uuid.uuid4())
+        self.queue = queue
+        self.every_chunks = every_chunks
+        self.interval = interval
+        self.chunks: list[str] = []
+        self._pending: list[str] = []
+        self._last_flush = time.monotonic()
+        self.finished = False
+
+    @property
+    def content(self) -> str:
+        return "".join(self.chunks)
+
+    def begin(self):
+        self.queue.enqueue(
+            {
+                "id": self.message_id,
+                "chat_id": self.chat_id,
+                "role": "assistant",
+                "content": "",
+                "status": "streaming",
+            }
+        )
+
+    def add(self, chunk: str):
+        self.chunks.append(chunk)
+        self._pending.append(chunk)
+        if (
+            len(self._pending) >= self.every_chunks
+            or time.monotonic() - self._last_flush >= self.interval
+        ):
+            self._flush("streaming")
+
+    def complete(self) -> asyncio.Future:
+        """남은 텍스트를 저장하고 status="complete"로 변경"""
+        return self._flush("complete")
+
+    def abort(self) -> asyncio.Future | None:
+        """남은 텍스트를 저장하고 status="aborted"로 변경 (연결 끊김 등)"""
+        if self.finished:
+            return None
+        return self._flush("aborted")
+
+    def _flush(self, status: str) -> asyncio.Future:
+        saved = self.queue.append(self.message_id, "".join(self._pending), status)
+        self._pending = []
+        self._last_flush = time.monotonic()
+        if status != "streaming":
+            self.finished = True
+        return saved
+
+
+async def mark_interrupted_streams():
+    """서버 재시작 전에 끝나지 못한 응답을 aborted로 표시"""
+    async with async_session() as session:
+        await session.execute(
+            update(Message)
+            .where(Message.status == "streaming")
+            .values(status="aborted")
+        )
+        await session.commit()
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+import httpx
+
+from config import (
+    LLM_CLIENT_IDLE_TTL,
+    LLM_CLIENT_MAX_SIZE,
+    LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE,
+)
+
+logger = logging.getLogger(__name__)
+
+ClientKey = tuple[str, str, str]
+
+
+def fingerprint_api_key(api_key: str | None) -> str:
+    """API 키 원문 대신 키로 사용할 짧은 해시"""
+    if not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def http_limits() -> httpx.Limits:
+    """provider 커넥션 풀 한도"""
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def new_http_transport() -> httpx.AsyncHTTPTransport:
+    """provider SDK가 httpx 클라이언트를 직접 만들 때 넘기는 커넥션 풀"""
+    return httpx.AsyncHTTPTransport(limits=http_limits())
+
+
+def new_http_client() -> httpx.AsyncClient:
+    """keep-alive 커넥션 풀을 유지하는 provider용 HTTP 클라이언트 생성"""
+    return httpx.AsyncClient(
+        limits=http_limits(), timeout=httpx.Timeout(600.0, connect=10.0)
+    )
+
+
+class AsyncCloseable(Protocol):
+    """레지스트리가 닫아야 하는 클라이언트 (httpx.AsyncClient 등)"""
+
+    async def aclose(self) -> None: ...
+
+
+@dataclass
+class ClientEntry:
+    llm: Any
+    client: AsyncCloseable | None = None
+    last_used: float = field(default_factory=time.monotonic)
+    in_use: int = 0
+    retired: bool = False
+
+
+class ClientRegistry:
+    """(provider, model, API 키 fingerprint)별 LangChain 채팅 모델을 재사용하는 레지스트리
+
+    요청마다 새 클라이언트를 만들지 않고 커넥션 풀을 유지한다.
+    유휴 TTL이 지나거나 LRU 한도를 넘으면 제거되고, 스트리밍 중인 클라이언트는
+    사용이 끝난 뒤에 닫힌다.
+    """
+
+    def __init__(
+        self,
+        max_size: int = LLM_CLIENT_MAX_SIZE,
+        idle_ttl: float = LLM_CLIENT_IDLE_TTL,
+    ):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._entries: OrderedDict[ClientKey, ClientEntry] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        provider: str,
+        model: str,
+        api_key: str | None,
+        build: Callable[[], tuple[Any, AsyncCloseable | None]],
+    ) -> AsyncIterator[Any]:
+        """클라이언트를 빌려 사용하고, 블록이 끝나면 반납
+
+        build는 (채팅 모델, 제거될 때 닫을 클라이언트)를 반환한다.
+        """
+        key = (provider, model, fingerprint_api_key(api_key))
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                llm, client = build()
+                entry = ClientEntry(llm=llm, client=client)
+                self._entries[key] = entry
+            else:
+                self._entries.move_to_end(key)
+            entry.in_use += 1
+            entry.last_used = time.monotonic()
+            stale = self._collect_stale()
+
+        await self._close_all(stale)
+        try:
+            yield entry.llm
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            if entry.retired and entry.in_use == 0:
+                await self._close(entry)
+
+    async def invalidate(self, provider: str, keep_api_key: str | None = None):
+        """provider의 클라이언트 제거 (API 키 교체 시)
+
+        keep_api_key와 fingerprint가 같은 클라이언트는 남긴다.
+        """
+        keep = fingerprint_api_key(keep_api_key) if keep_api_key else None
+        async with self._lock:
+            removed = [
+                self._entries.pop(key)
+                for key in list(self._entries)
+                if key[0] == provider and key[2] != keep
+            ]
+        await self._close_all(removed)
+
+    async def aclose(self):
+        """모든 클라이언트 종료 (서버 종료 시)"""
+        async with self._lock:
+            removed = list(self._entries.values())
+            self._entries.clear()
+        await self._close_all(removed)
+
+    def _collect_stale(self) -> list[ClientEntry]:
+        """TTL이 지났거나 LRU 한도를 넘은 항목을 맵에서 제거"""
+        now = time.monotonic()
+        stale = []
+        for key, entry in list(self._entries.items()):
+            if entry.in_use == 0 and now - entry.last_used > self.idle_ttl:
+                stale.append(self._entries.pop(key))
+        while len(self._entries) > self.max_size:
+            _, entry = self._entries.popitem(last=False)
+            stale.append(entry)
+        return stale
+
+    async def _close_all(self, entries: list[ClientEntry]):
+        for entry in entries:
+            entry.retired = True
+            if entry.in_use == 0:
+                await self._close(entry)
+
+    async def _close(self, entry: ClientEntry):
+        client, entry.client = entry.client, None
+        if client is None:
+            return
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close LLM client: {e}")
+
+
+client_registry = ClientRegistry()
@@ -0,0 +1,229 @@
+"""오래된 메시지 압축 보관 (cold storage)
+
+COLD_MESSAGE_AGE_DAYS보다 오래된 메시지와 COLD_CHAT_IDLE_DAYS 동안 열지 않은
+채팅의 메시지를 백그라운드에서 압축해 같은 content 컬럼에 BLOB으로 바꿔 쓴다.
+메시지 표본으로 학습한 공유 dictionary를 쓰므로 짧은 응답도 잘 줄어든다.
+Message.content(CompressedText)가 읽을 때 자동으로 풀기 때문에 get_chat 등
+조회 코드는 바뀌지 않는다. 줄어든 공간은 db_maintenance가 회수한다 (overflow
+페이지는 incremental_vacuum, 페이지 안 빈 공간은 COLD_VACUUM_BYTES마다 VACUUM).
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, func, literal_column, or_, select, update
+
+from config import (
+    COLD_BATCH_SIZE,
+    COLD_CHAT_IDLE_DAYS,
+    COLD_DICT_MIN_SAMPLES,
+    COLD_DICT_SAMPLES,
+    COLD_DICT_SIZE,
+    COLD_INTERVAL,
+    COLD_MESSAGE_AGE_DAYS,
+    COLD_MIN_CHARS,
+    COLD_STORAGE_CODEC,
+    COLD_STORAGE_ENABLED,
+    COLD_VACUUM_BYTES,
+)
+from database import async_session
+from models.chat import Chat, Message
+from models.compression import CompressionDictionary
+from services import compression
+from services.maintenance import db_maintenance
+
+logger = logging.getLogger(__name__)
+
+messages = Message.__table__
+rowid = literal_column("messages.rowid")
+# 아직 압축하지 않은 (content가 text인) 완료 메시지
+UNCOMPRESSED = (
+    messages.c.status != "streaming",
+    func.typeof(messages.c.content) == "text",
+    func.length(messages.c.content) >= COLD_MIN_CHARS,
+)
+# 읽은 뒤 이미 압축됐거나 다시 스트리밍 중인 메시지는 건너뜀
+COMPACT_STATEMENT = (
+    update(messages)
+    .where(
+        rowid == bindparam("b_rowid"),
+        messages.c.status != "streaming",
+        func.typeof(messages.c.content) == "text",
+    )
+    .values(content=bindparam("b_content"))
+)
+
+
+def _resolve_codec(codec: str) -> str:
+    if codec == "auto":
+        return "zstd" if compression.available("zstd") else "zlib"
+    if not compression.available(codec):
+        logger.warning(f"Compression codec {codec} is not available; using zlib")
+        return "zlib"
+    return codec
+
+
+class ColdStorage:
+    """오래된 메시지를 주기적으로 압축하는 백그라운드 작업"""
+
+    def __init__(
+        self,
+        enabled: bool = COLD_STORAGE_ENABLED,
+        codec: str = COLD_STORAGE_CODEC,
+        interval: float = COLD_INTERVAL,
+    ):
+        self.enabled = enabled
+        self.codec = _resolve_codec(codec)
+        self.interval = interval
+        self.dictionary_id: int | None = None
+        self.compacted = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self._unvacuumed_bytes = 0
+        self.last_run_seconds: float | None = None
+        self._worker: asyncio.Task | None = None
+
+    async def load(self):
+        """압축된 메시지를 읽을 수 있도록 dictionary를 메모리에 올림 (비활성이어도 필요)"""
+        async with async_session() as db:
+            result = await db.execute(select(CompressionDictionary))
+            for dictionary in result.scalars():
+                compression.dictionaries[dictionary.id] = dictionary.data
+                if dictionary.codec == self.codec:
+                    self.dictionary_id = dictionary.id
+
+    def start(self):
+        if self.enabled and (self._worker is None or self._worker.done()):
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "codec": self.codec,
+            "dictionary_id": self.dictionary_id,
+            "compacted_messages": self.compacted,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "last_run_seconds": self.last_run_seconds,
+        }
+
+    async def compact(self, now: datetime | None = None) -> int:
+        """압축 대상 메시지를 COLD_BATCH_SIZE개씩 압축, 압축한 메시지 수 반환
+
+        묶음마다 커밋하고, 그 사이 스트림이 시작돼 유휴 상태가 끝나면 남은
+        메시지는 다음 실행으로 미룬다.
+        """
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+        idle_chats = select(Chat.id).where(
+            func.coalesce(Chat.opened_at, Chat.updated_at)
+            < now - timedelta(days=COLD_CHAT_IDLE_DAYS)
+        )
+        candidates = (
+            select(rowid, messages.c.content)
+            .where(
+                *UNCOMPRESSED,
+                or_(
+                    messages.c.created_at < now - timedelta(days=COLD_MESSAGE_AGE_DAYS),
+                    messages.c.chat_id.in_(idle_chats),
+                ),
+                rowid > bindparam("after"),
+            )
+            .order_by(rowid)
+            .limit(COLD_BATCH_SIZE)
+        )
+
+        dictionary_id = await self._dictionary()
+        compacted, after = 0, 0
+        while True:
+            async with async_session() as db:
+                rows = (await db.execute(candidates, {"after": after})).all()
+            if not rows:
+                break
+            after = rows[-1][0]
+            updates = await asyncio.to_thread(self._compress, rows, dictionary_id)
+            if updates:
+                async with async_session() as db:
+                    await db.execute(COMPACT_STATEMENT, updates)
+                    await db.commit()
+                compacted += len(updates)
+            if not db_maintenance.idle():
+                break
+
+        self.compacted += compacted
+        self.last_run_seconds = round(time.perf_counter() - started, 3)
+        if compacted:
+            logger.info(f"Compressed {compacted} messages in {self.last_run_seconds}s")
+            vacuum = self._unvacuumed_bytes >= COLD_VACUUM_BYTES
+            if vacuum:
+                self._unvacuumed_bytes = 0
+            db_maintenance.notify(vacuum=vacuum)
+        return compacted
+
+    def _compress(self, rows, dictionary_id: int) -> list[dict]:
+        """원문보다 작아지는 메시지만 압축 결과로 반환 (스레드에서 실행)"""
+        updates = []
+        for message_rowid, content in rows:
+            blob = compression.compress(content, self.codec, dictionary_id)
+            size = len(content.encode())
+            if len(blob) < size:
+                updates.append({"b_rowid": message_rowid, "b_content": blob})
+                self.bytes_before += size
+                self.bytes_after += len(blob)
+                self._unvacuumed_bytes += size - len(blob)
+        return updates
+
+    async def _dictionary(self) -> int:
+        """현재 codec의 공유 dictionary id (없으면 메시지 표본으로 학습, 표본이 적으면 0)"""
+        if self.dictionary_id is not None:
+            return self.dictionary_id
+        async with async_session() as db:
+            samples = (
+                await db.execute(
+                    select(messages.c.content)
+                    .where(*UNCOMPRESSED)
+                    .order_by(func.random())
+                    .limit(COLD_DICT_SAMPLES)
+                )
+            ).scalars().all()
+        if len(samples) < COLD_DICT_MIN_SAMPLES:
+            return 0
+        try:
+            data = await asyncio.to_thread(
+                compression.train_dictionary, self.codec, samples, COLD_DICT_SIZE
+            )
+        except Exception as e:
+            logger.warning(f"Compression dictionary training failed: {e}")
+            return 0
+        dictionary = CompressionDictionary(codec=self.codec, data=data, samples=len(samples))
+        async with async_session() as db:
+            db.add(dictionary)
+            await db.commit()
+        # 이 dictionary로 압축한 메시지를 쓰기 전에 읽을 수 있도록 먼저 등록
+        compression.dictionaries[dictionary.id] = data
+        self.dictionary_id = dictionary.id
+        logger.info(
+            f"Trained {self.codec} compression dictionary {dictionary.id} "
+            f"({len(data)} bytes from {len(samples)} messages)"
+        )
+        return dictionary.id
+
+    async def _run(self):
+        while True:
+            await db_maintenance.wait_idle()
+            try:
+                await self.compact()
+            except Exception as e:
+                logger.warning(f"Cold storage compaction failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+cold_storage = ColdStorage()
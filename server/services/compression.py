@@ -0,0 +1,135 @@
+"""메시지 content 압축 형식 (cold storage)
+
+압축한 content는 같은 TEXT 컬럼에 BLOB으로 저장한다 (SQLite는 값마다 타입을
+따로 가짐). 읽을 때 typeof가 blob이면 앞 5바이트 header로 codec과 공유
+dictionary를 찾아 푼다. dictionary 내용은 DB(compression_dictionaries)에 있고
+시작 시 dictionaries에 올려 둔다.
+
+    [codec 1바이트][dictionary id 4바이트, 0이면 없음][압축 데이터]
+"""
+
+import struct
+import zlib
+from collections import Counter
+
+# zstandard는 선택 의존성 (없으면 zlib + preset dictionary)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+HEADER = struct.Struct(">BI")
+CODECS = {"zlib": 1, "zstd": 2}
+CODEC_NAMES = {codec_id: name for name, codec_id in CODECS.items()}
+ZLIB_LEVEL = 9
+# 압축은 백그라운드에서 한 번만 하므로 높은 레벨 (풀기 속도는 레벨과 거의 무관)
+ZSTD_LEVEL = 19
+# header 없는 raw deflate (zlib header/checksum 6바이트 절약)
+ZLIB_WBITS = -15
+# zlib preset dictionary가 참조할 수 있는 최대 거리 (window 크기)
+ZLIB_MAX_DICT = 32 * 1024
+# zlib dictionary 학습에 쓰는 단어 n-gram 길이와 표본 최대 크기
+ZLIB_TRAIN_NGRAM = 3
+ZLIB_TRAIN_BYTES = 1024 * 1024
+
+# dictionary id -> 내용 (services.cold_storage가 시작 시 불러오고 학습하면 추가)
+dictionaries: dict[int, bytes] = {}
+_zstd_compressors: dict[int, "zstandard.ZstdCompressor"] = {}
+_zstd_decompressors: dict[int, "zstandard.ZstdDecompressor"] = {}
+
+
+def available(codec: str) -> bool:
+    return codec == "zlib" or (codec == "zstd" and zstandard is not None)
+
+
+def compress(text: str, codec: str, dictionary_id: int = 0) -> bytes:
+    """content를 header가 붙은 BLOB으로 압축"""
+    data = text.encode()
+    if codec == "zstd":
+        payload = _zstd_compressor(dictionary_id).compress(data)
+    else:
+        options = {"zdict": dictionaries[dictionary_id]} if dictionary_id else {}
+        compressor = zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, ZLIB_WBITS, **options)
+        payload = compressor.compress(data) + compressor.flush()
+    return HEADER.pack(CODECS[codec], dictionary_id) + payload
+
+
+def decompress(blob: bytes) -> str:
+    """compress()로 만든 BLOB을 원래 content로 복원"""
+    codec_id, dictionary_id = HEADER.unpack_from(blob)
+    if dictionary_id and dictionary_id not in dictionaries:
+        raise LookupError(f"Compression dictionary {dictionary_id} is not loaded")
+    payload = memoryview(blob)[HEADER.size :]
+    codec = CODEC_NAMES.get(codec_id)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed messages")
+        data = _zstd_decompressor(dictionary_id).decompress(payload)
+    elif codec == "zlib":
+        options = {"zdict": dictionaries[dictionary_id]} if dictionary_id else {}
+        decompressor = zlib.decompressobj(ZLIB_WBITS, **options)
+        data = decompressor.decompress(payload) + decompressor.flush()
+    else:
+        raise ValueError(f"Unknown compression codec: {codec_id}")
+    return data.decode()
+
+
+def train_dictionary(codec: str, samples: list[str], size: int) -> bytes:
+    """메시지 표본으로 공유 dictionary 학습"""
+    encoded = [sample.encode() for sample in samples]
+    if codec == "zstd":
+        return zstandard.train_dictionary(size, encoded).as_bytes()
+    return _train_zlib_dictionary(encoded, min(size, ZLIB_MAX_DICT))
+
+
+def _train_zlib_dictionary(samples: list[bytes], size: int) -> bytes:
+    """자주 나오는 단어 n-gram을 이어 붙인 zlib preset dictionary
+
+    zlib은 dictionary를 입력 바로 앞에 있던 데이터처럼 참조하므로 끝쪽일수록
+    짧은 거리로 부호화된다. 절약량(빈도 x 길이)이 큰 n-gram을 끝에 둔다.
+    """
+    counts: Counter[bytes] = Counter()
+    budget = ZLIB_TRAIN_BYTES
+    for sample in samples:
+        words = sample[:budget].split()
+        budget -= len(sample)
+        for n in range(1, ZLIB_TRAIN_NGRAM + 1):
+            for i in range(len(words) - n + 1):
+                counts[b" ".join(words[i : i + n])] += 1
+        if budget <= 0:
+            break
+
+    ranked = sorted(
+        (gram for gram, count in counts.items() if count > 1 and len(gram) > 3),
+        key=lambda gram: counts[gram] * len(gram),
+        reverse=True,
+    )
+    picked, total = [], 0
+    for gram in ranked:
+        if total + len(gram) + 1 <= size:
+            picked.append(gram)
+            total += len(gram) + 1
+    return b" ".join(reversed(picked))
+
+
+def _zstd_compressor(dictionary_id: int) -> "zstandard.ZstdCompressor":
+    # dictionary를 매번 다시 준비하지 않도록 dictionary별로 재사용
+    if dictionary_id not in _zstd_compressors:
+        _zstd_compressors[dictionary_id] = zstandard.ZstdCompressor(
+            level=ZSTD_LEVEL, dict_data=_zstd_dict(dictionary_id)
+        )
+    return _zstd_compressors[dictionary_id]
+
+
+def _zstd_decompressor(dictionary_id: int) -> "zstandard.ZstdDecompressor":
+    if dictionary_id not in _zstd_decompressors:
+        _zstd_decompressors[dictionary_id] = zstandard.ZstdDecompressor(
+            dict_data=_zstd_dict(dictionary_id)
+        )
+    return _zstd_decompressors[dictionary_id]
+
+
+def _zstd_dict(dictionary_id: int) -> "zstandard.ZstdCompressionDict | None":
+    if not dictionary_id:
+        return None
+    return zstandard.ZstdCompressionDict(dictionaries[dictionary_id])
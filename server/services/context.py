@@ -0,0 +1,216 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import (
+    CONTEXT_MAX_MESSAGES,
+    CONTEXT_TOKEN_BUDGET,
+    SUMMARY_MAX_DEFER,
+    SUMMARY_MIN_MESSAGES,
+)
+from database import async_session
+from models.chat import ChatSummary, Message
+from services.llm import BaseLLMService
+from services.streams import stream_registry
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+logger = logging.getLogger(__name__)
+
+# 모델별 대화 기록 토큰 예산 (없으면 CONTEXT_TOKEN_BUDGET)
+MODEL_TOKEN_BUDGETS = {
+    "gemma3:1b": 2048,
+    "gemini-2.5-flash-lite": 16384,
+}
+
+# 요약은 사용자 스트림이 없을 때 실행하되 (스케줄러 슬롯을 먼저 차지하지 않게)
+# SUMMARY_MAX_DEFER가 지나면 바쁜 서버에서도 스케줄러 대기열에 들어가 차례를 기다림
+SUMMARY_IDLE_POLL = 1.0
+
+SUMMARY_PROMPT = (
+    "다음은 사용자와 AI의 이전 대화입니다. 이후 대화에 필요한 사실, 결정, "
+    "사용자 선호를 빠짐없이 담아 간결하게 요약하세요."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 빠르게 토큰 수 추정 (ASCII 4자당 1토큰, 그 외 문자당 1토큰)"""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 4
+
+
+def to_langchain_message(role: str, content: str) -> "BaseMessage":
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    if role == "assistant":
+        return AIMessage(content=content)
+    return HumanMessage(content=content)
+
+
+class ContextBuilder:
+    """채팅의 이전 메시지를 토큰 예산에 맞춰 astream에 넘길 메시지 목록으로 구성
+
+    최신 메시지부터 예산이 허락하는 만큼 포함하고, 그보다 오래된 대화는
+    chat_summaries에 저장된 rolling summary로 대체한다. 요약은 매 턴 다시
+    만들지 않고, 예산 밖으로 밀려난 메시지가 쌓였을 때만 갱신한다. 갱신은 그
+    턴의 응답이 끝난 뒤(summarize_pending) 진행 중인 스트림이 없을 때 (최대
+    SUMMARY_MAX_DEFER까지 기다린 뒤에는 스케줄러 대기열로) 실행하고,
+    한 번에 모델 예산만큼의 대화만 요약에 넣는다 (나머지는 다음 갱신에서).
+    """
+
+    def __init__(self):
+        self._summarizing: dict[str, asyncio.Task] = {}
+        self._pending: dict[str, tuple[datetime, str, BaseLLMService]] = {}
+
+    async def build(
+        self,
+        db: AsyncSession,
+        chat_id: str,
+        message: str,
+        model: str,
+        llm_service: BaseLLMService | None = None,
+    ) -> list["BaseMessage"]:
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        budget = MODEL_TOKEN_BUDGETS.get(model, CONTEXT_TOKEN_BUDGET)
+        budget -= estimate_tokens(message)
+
+        summary = await db.get(ChatSummary, chat_id)
+        if summary:
+            budget -= estimate_tokens(summary.content)
+
+        query = (
+            select(Message.role, Message.content, Message.created_at)
+            .where(Message.chat_id == chat_id, Message.status != "streaming")
+            .order_by(Message.created_at.desc())
+            .limit(CONTEXT_MAX_MESSAGES)
+        )
+        if summary:
+            query = query.where(Message.created_at > summary.covered_until)
+        rows = (await db.execute(query)).all()
+
+        history: list["BaseMessage"] = []
+        dropped = 0
+        for role, content, _ in rows:
+            cost = estimate_tokens(content)
+            if dropped or cost > budget:
+                dropped += 1
+                continue
+            budget -= cost
+            history.append(to_langchain_message(role, content))
+        history.reverse()
+
+        if dropped >= SUMMARY_MIN_MESSAGES and llm_service is not None:
+            # 밀려난 메시지 중 가장 최신 것까지 요약에 포함
+            covered_until = rows[len(rows) - dropped][2]
+            self._pending[chat_id] = (covered_until, model, llm_service)
+
+        messages: list["BaseMessage"] = []
+        if summary:
+            messages.append(SystemMessage(content=f"이전 대화 요약:\n{summary.content}"))
+        messages.extend(history)
+        messages.append(HumanMessage(content=message))
+        return messages
+
+    def summarize_pending(self, chat_id: str):
+        """build()에서 필요하다고 판단한 요약을 예약 (응답 스트림이 끝난 뒤 호출)"""
+        pending = self._pending.pop(chat_id, None)
+        if pending is not None:
+            self.schedule_summary(chat_id, *pending)
+
+    def schedule_summary(
+        self,
+        chat_id: str,
+        covered_until: datetime,
+        model: str,
+        llm_service: BaseLLMService,
+    ):
+        """rolling summary 갱신 작업 예약 (채팅당 하나만 실행)"""
+        running = self._summarizing.get(chat_id)
+        if running is not None and not running.done():
+            return
+        task = asyncio.create_task(
+            self._summarize(chat_id, covered_until, model, llm_service)
+        )
+        self._summarizing[chat_id] = task
+        task.add_done_callback(lambda _: self._summarizing.pop(chat_id, None))
+
+    async def _summarize(
+        self,
+        chat_id: str,
+        covered_until: datetime,
+        model: str,
+        llm_service: BaseLLMService,
+    ):
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + SUMMARY_MAX_DEFER
+            while stream_registry.idle_for() == 0 and loop.time() < deadline:
+                await asyncio.sleep(SUMMARY_IDLE_POLL)
+            async with async_session() as db:
+                summary = await db.get(ChatSummary, chat_id)
+                previous = summary.content if summary else None
+                query = (
+                    select(Message.role, Message.content, Message.created_at)
+                    .where(
+                        Message.chat_id == chat_id,
+                        Message.created_at <= covered_until,
+                        Message.status != "streaming",
+                    )
+                    .order_by(Message.created_at)
+                    .limit(CONTEXT_MAX_MESSAGES)
+                )
+                if summary:
+                    query = query.where(Message.created_at > summary.covered_until)
+                rows = (await db.execute(query)).all()
+            if not rows:
+                return
+
+            budget = MODEL_TOKEN_BUDGETS.get(model, CONTEXT_TOKEN_BUDGET)
+            budget -= estimate_tokens(SUMMARY_PROMPT)
+            if previous:
+                budget -= estimate_tokens(previous)
+            lines = []
+            for role, content, created_at in rows:
+                line = f"{role}: {content}"
+                cost = estimate_tokens(line)
+                # 남은 예산이 없으면 요약에 넣지 않음 (covered_until도 여기서 멈춤)
+                if budget <= 0 or (lines and cost > budget):
+                    break
+                # 한 메시지가 예산보다 길면 앞부분만 (문자 수 >= 추정 토큰 수)
+                lines.append(line[:budget] if cost > budget else line)
+                budget -= cost
+                covered_until = created_at
+            if not lines:
+                return
+            transcript = "\n".join(lines)
+            if previous:
+                transcript = f"[기존 요약]\n{previous}\n\n[이후 대화]\n{transcript}"
+            prompt = [SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=transcript)]
+            # 요약 생성 동안 DB 연결을 잡고 있지 않도록 세션 밖에서 실행
+            content = "".join([chunk async for chunk in llm_service.stream(prompt, model)])
+
+            async with async_session() as db:
+                summary = await db.get(ChatSummary, chat_id)
+                if summary:
+                    summary.content = content
+                    summary.covered_until = covered_until
+                else:
+                    db.add(
+                        ChatSummary(
+                            chat_id=chat_id, content=content, covered_until=covered_until
+                        )
+                    )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to summarize chat {chat_id}: {e}")
+
+
+context_builder = ContextBuilder()
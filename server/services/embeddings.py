@@ -0,0 +1,77 @@
+import hashlib
+import math
+import re
+from abc import ABC, abstractmethod
+
+import httpx
+
+from config import MEMORY_EMBED_MODEL, MEMORY_EMBEDDER, MEMORY_STUB_DIM, OLLAMA_BASE_URL
+
+_WORD = re.compile(r"\w+")
+
+
+class BaseEmbedder(ABC):
+    """텍스트 묶음을 같은 차원의 벡터로 변환"""
+
+    # 색인 파일에 기록해 임베더가 바뀌면 색인을 새로 만듦
+    name: str
+
+    @abstractmethod
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        pass
+
+    async def close(self):
+        pass
+
+
+class OllamaEmbedder(BaseEmbedder):
+    """Ollama /api/embed (예: nomic-embed-text)"""
+
+    def __init__(self, model: str = MEMORY_EMBED_MODEL, base_url: str = OLLAMA_BASE_URL):
+        self.model = model
+        self.name = f"ollama:{model}"
+        self._client = httpx.AsyncClient(base_url=base_url, timeout=120)
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        response = await self._client.post(
+            "/api/embed", json={"model": self.model, "input": texts}
+        )
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class StubEmbedder(BaseEmbedder):
+    """외부 호출 없는 결정적 임베딩 (단어/문자 bigram feature hashing)
+
+    의미를 이해하지는 못하지만 같은 단어를 공유하는 텍스트끼리 유사도가 높아
+    테스트와 오프라인 개발에 쓸 수 있다.
+    """
+
+    def __init__(self, dim: int = MEMORY_STUB_DIM):
+        self.dim = dim
+        self.name = f"stub:{dim}"
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.dim
+        for word in _WORD.findall(text.lower()):
+            features = [word] + [word[i : i + 2] for i in range(len(word) - 1)]
+            for feature in features:
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                index = int.from_bytes(digest[:4], "little") % self.dim
+                vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+def create_embedder(kind: str = MEMORY_EMBEDDER) -> BaseEmbedder:
+    if kind == "ollama":
+        return OllamaEmbedder()
+    if kind == "stub":
+        return StubEmbedder()
+    raise ValueError(f"Unsupported embedder: {kind}")
@@ -0,0 +1,82 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from config import CIRCUIT_COOLDOWN, CIRCUIT_FAILURES, LATENCY_MIN_SAMPLES, LATENCY_WINDOW
+
+
+@dataclass
+class ProviderLatency:
+    # 최근 첫 토큰 지연(초), 슬롯을 얻은 시점부터 측정
+    ttft: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_failure: float = 0.0
+
+    def percentile(self, q: float) -> float | None:
+        if not self.ttft:
+            return None
+        ordered = sorted(self.ttft)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class LatencyTracker:
+    """provider별 첫 토큰 지연과 실패 통계 (라우팅 정책의 입력)"""
+
+    def __init__(self):
+        self._providers: dict[str, ProviderLatency] = {}
+
+    def record_first_token(self, provider: str, seconds: float):
+        stats = self._get(provider)
+        stats.ttft.append(seconds)
+
+    def record_success(self, provider: str):
+        stats = self._get(provider)
+        stats.successes += 1
+        stats.consecutive_failures = 0
+
+    def record_failure(self, provider: str):
+        stats = self._get(provider)
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        stats.last_failure = time.monotonic()
+
+    def p95(self, provider: str) -> float | None:
+        """표본이 충분하면 TTFT p95, 아니면 None"""
+        stats = self._get(provider)
+        if len(stats.ttft) < LATENCY_MIN_SAMPLES:
+            return None
+        return stats.percentile(0.95)
+
+    def available(self, provider: str) -> bool:
+        """연속 실패로 차단(circuit open)된 상태가 아닌지"""
+        stats = self._get(provider)
+        if stats.consecutive_failures < CIRCUIT_FAILURES:
+            return True
+        return time.monotonic() - stats.last_failure >= CIRCUIT_COOLDOWN
+
+    def stats(self) -> dict:
+        result = {}
+        for provider, stats in self._providers.items():
+            p50 = stats.percentile(0.5)
+            p95 = stats.percentile(0.95)
+            result[provider] = {
+                "samples": len(stats.ttft),
+                "ttft_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "ttft_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "successes": stats.successes,
+                "failures": stats.failures,
+                "available": self.available(provider),
+            }
+        return result
+
+    def _get(self, provider: str) -> ProviderLatency:
+        stats = self._providers.get(provider)
+        if stats is None:
+            stats = self._providers[provider] = ProviderLatency()
+        return stats
+
+
+latency_tracker = LatencyTracker()
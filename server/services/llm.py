@@ -1,24 +1,72 @@
 from abc import ABC, abstractmethod
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from langchain_core.messages import HumanMessage
-from langchain_ollama import ChatOllama
+from config import RESPONSE_CACHE_ENABLED
+from services.client_registry import (
+    client_registry,
+    new_http_client,
+    new_http_transport,
+)
+from services.model_residency import model_residency
+
+# LangChain은 import만 1초 가까이 걸려 서버 시작을 늦추므로 처음 쓸 때 불러옴
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+
+Prompt = str | list["BaseMessage"]
+
+
+def to_messages(message: Prompt) -> list["BaseMessage"]:
+    """문자열 프롬프트를 LangChain 메시지 목록으로 변환"""
+    if isinstance(message, str):
+        from langchain_core.messages import HumanMessage
+
+        return [HumanMessage(content=message)]
+    return message
+
+
+@dataclass
+class QueuePosition:
+    """스케줄러 대기열 위치 알림 (stream_events 전용, 1부터 시작)"""
+
+    position: int
 
 
 class BaseLLMService(ABC):
     @abstractmethod
-    async def stream(self, message: str, model: str) -> AsyncGenerator[str, None]:
+    async def stream(self, message: Prompt, model: str) -> AsyncGenerator[str, None]:
         pass
 
+    async def stream_events(
+        self, message: Prompt, model: str
+    ) -> AsyncGenerator[str | QueuePosition, None]:
+        """stream()과 같지만 대기열 위치 같은 이벤트도 함께 전달"""
+        async for chunk in self.stream(message, model):
+            yield chunk
+
 
 class OllamaService(BaseLLMService):
     async def stream(
-        self, message: str, model: str = "gemma3:1b"
+        self, message: Prompt, model: str = "gemma3:1b"
     ) -> AsyncGenerator[str, None]:
-        llm = ChatOllama(model=model)
-        async for chunk in llm.astream([HumanMessage(content=message)]):
-            if chunk.content:
-                yield chunk.content
+        async with client_registry.lease(
+            "ollama", model, None, lambda: self._build(model)
+        ) as llm:
+            # 요청마다 모델별 keep_alive를 넘겨 자주 쓰는 모델이 내려가지 않게 함
+            keep_alive = model_residency.keep_alive_for(model)
+            async for chunk in llm.astream(to_messages(message), keep_alive=keep_alive):
+                if chunk.content:
+                    yield chunk.content
+
+    def _build(self, model: str):
+        from langchain_ollama import ChatOllama
+
+        # 커넥션 풀(transport)을 레지스트리가 소유해 제거될 때 닫음
+        transport = new_http_transport()
+        llm = ChatOllama(model=model, async_client_kwargs={"transport": transport})
+        return llm, transport
 
 
 class OpenAIService(BaseLLMService):
@@ -26,14 +74,26 @@ class OpenAIService(BaseLLMService):
         self.api_key = api_key
 
     async def stream(
-        self, message: str, model: str = "gpt-4o-mini"
+        self, message: Prompt, model: str = "gpt-4o-mini"
     ) -> AsyncGenerator[str, None]:
+        async with client_registry.lease(
+            "openai", model, self.api_key, lambda: self._build(model)
+        ) as llm:
+            async for chunk in llm.astream(to_messages(message)):
+                if chunk.content:
+                    yield chunk.content
+
+    def _build(self, model: str):
         from langchain_openai import ChatOpenAI
 
-        llm = ChatOpenAI(model=model, api_key=self.api_key, streaming=True)
-        async for chunk in llm.astream([HumanMessage(content=message)]):
-            if chunk.content:
-                yield chunk.content
+        http_client = new_http_client()
+        llm = ChatOpenAI(
+            model=model,
+            api_key=self.api_key,
+            streaming=True,
+            http_async_client=http_client,
+        )
+        return llm, http_client
 
 
 class AnthropicService(BaseLLMService):
@@ -41,14 +101,22 @@ class AnthropicService(BaseLLMService):
         self.api_key = api_key
 
     async def stream(
-        self, message: str, model: str = "claude-3-5-sonnet-20241022"
+        self, message: Prompt, model: str = "claude-3-5-sonnet-20241022"
     ) -> AsyncGenerator[str, None]:
+        async with client_registry.lease(
+            "anthropic", model, self.api_key, lambda: self._build(model)
+        ) as llm:
+            async for chunk in llm.astream(to_messages(message)):
+                if chunk.content:
+                    yield chunk.content
+
+    def _build(self, model: str):
         from langchain_anthropic import ChatAnthropic
 
+        # ChatAnthropic은 HTTP 클라이언트를 받는 인자가 없고 base_url별로 프로세스 전체가
+        # 공유하는 커넥션 풀을 쓰므로, 인스턴스를 제거해도 닫을 클라이언트가 없음
         llm = ChatAnthropic(model=model, api_key=self.api_key, streaming=True)
-        async for chunk in llm.astream([HumanMessage(content=message)]):
-            if chunk.content:
-                yield chunk.content
+        return llm, None
 
 
 class GoogleService(BaseLLMService):
@@ -56,16 +124,23 @@ class GoogleService(BaseLLMService):
         self.api_key = api_key
 
     async def stream(
-        self, message: str, model: str = "gemini-1.5-flash"
+        self, message: Prompt, model: str = "gemini-1.5-flash"
     ) -> AsyncGenerator[str, None]:
+        async with client_registry.lease(
+            "google", model, self.api_key, lambda: self._build(model)
+        ) as llm:
+            async for chunk in llm.astream(to_messages(message)):
+                if chunk.content:
+                    yield chunk.content
+
+    def _build(self, model: str):
         from langchain_google_genai import ChatGoogleGenerativeAI
 
         llm = ChatGoogleGenerativeAI(
             model=model, google_api_key=self.api_key, streaming=True
         )
-        async for chunk in llm.astream([HumanMessage(content=message)]):
-            if chunk.content:
-                yield chunk.content
+        # 인스턴스마다 google-genai 클라이언트를 만들므로 제거될 때 async 쪽을 닫음
+        return llm, llm.async_client
 
 
 class GroqService(BaseLLMService):
@@ -73,19 +148,67 @@ class GroqService(BaseLLMService):
         self.api_key = api_key
 
     async def stream(
-        self, message: str, model: str = "llama-3.3-70b-versatile"
+        self, message: Prompt, model: str = "llama-3.3-70b-versatile"
     ) -> AsyncGenerator[str, None]:
+        async with client_registry.lease(
+            "groq", model, self.api_key, lambda: self._build(model)
+        ) as llm:
+            async for chunk in llm.astream(to_messages(message)):
+                if chunk.content:
+                    yield chunk.content
+
+    def _build(self, model: str):
         from langchain_groq import ChatGroq
 
-        llm = ChatGroq(model=model, api_key=self.api_key, streaming=True)
-        async for chunk in llm.astream([HumanMessage(content=message)]):
-            if chunk.content:
-                yield chunk.content
+        http_client = new_http_client()
+        llm = ChatGroq(
+            model=model,
+            api_key=self.api_key,
+            streaming=True,
+            http_async_client=http_client,
+        )
+        return llm, http_client
 
 
 class LLMServiceFactory:
+    # 추가 provider (벤치마크용 가짜 provider 등): 이름 -> (생성 함수, API 키 필요 여부)
+    _extra_providers: dict[str, tuple[Callable[[str | None], BaseLLMService], bool]] = {}
+
+    @staticmethod
+    def register(
+        provider: str,
+        build: Callable[[str | None], BaseLLMService],
+        requires_api_key: bool = False,
+    ):
+        """내장 provider 외의 서비스 등록 (스케줄러/캐시 래핑은 동일하게 적용)"""
+        LLMServiceFactory._extra_providers[provider] = (build, requires_api_key)
+
+    @staticmethod
+    def requires_api_key(provider: str) -> bool:
+        extra = LLMServiceFactory._extra_providers.get(provider)
+        if extra is not None:
+            return extra[1]
+        return provider != "ollama"
+
     @staticmethod
     def create(provider: str = "ollama", api_key: str | None = None) -> BaseLLMService:
+        from services.scheduler import ScheduledLLMService
+
+        # 모든 provider 호출은 스케줄러를 거쳐 동시 실행 수와 요청 속도를 제한
+        service = ScheduledLLMService(
+            LLMServiceFactory._create_provider(provider, api_key), provider
+        )
+        if RESPONSE_CACHE_ENABLED:
+            from services.response_cache import CachedLLMService
+
+            service = CachedLLMService(service, provider)
+        return service
+
+    @staticmethod
+    def _create_provider(provider: str, api_key: str | None) -> BaseLLMService:
+        extra = LLMServiceFactory._extra_providers.get(provider)
+        if extra is not None:
+            return extra[0](api_key)
         if provider == "ollama":
             return OllamaService()
         elif provider == "openai":
@@ -0,0 +1,172 @@
+"""유휴 시간 SQLite 유지보수 (빈 페이지 회수, PRAGMA optimize)
+
+채팅을 지우면 빈 페이지가 freelist에 남을 뿐 chats.db 파일은 줄지 않는다.
+auto_vacuum=INCREMENTAL인 DB는 incremental_vacuum으로 freelist 페이지를 파일
+끝에서 조금씩 잘라낼 수 있다. 진행 중인 스트림이 없는 상태가 DB_MAINTENANCE_IDLE
+이상 이어질 때만 DB_VACUUM_PAGES개씩 회수해 쓰기 잠금을 오래 잡지 않는다.
+페이지 안의 빈 공간(작아진 행)은 VACUUM으로만 회수되므로 cold storage처럼 많은
+행을 줄인 작업은 notify(vacuum=True)로 다음 유휴 시간의 전체 VACUUM을 요청한다.
+일괄 생성이나 가져오기처럼 스트림 밖에서 DB를 쓰는 작업은 writing()으로 감싸
+그동안 VACUUM이 시작되지 않게 한다 (VACUUM 중에는 모든 쓰기가 막힘).
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+from config import (
+    DB_MAINTENANCE_ENABLED,
+    DB_MAINTENANCE_IDLE,
+    DB_MAINTENANCE_INTERVAL,
+    DB_VACUUM_PAGES,
+)
+from database import engine
+from services.streams import stream_registry
+
+logger = logging.getLogger(__name__)
+
+# PRAGMA auto_vacuum 값 (0 = NONE, 1 = FULL, 2 = INCREMENTAL)
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class DatabaseMaintenance:
+    """삭제 후 또는 interval마다 유휴 시간을 기다려 DB 정리"""
+
+    def __init__(
+        self,
+        enabled: bool = DB_MAINTENANCE_ENABLED,
+        interval: float = DB_MAINTENANCE_INTERVAL,
+        idle_seconds: float = DB_MAINTENANCE_IDLE,
+        vacuum_pages: int = DB_VACUUM_PAGES,
+    ):
+        self.enabled = enabled
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.vacuum_pages = vacuum_pages
+        self.runs = 0
+        self.pages_reclaimed = 0
+        self.last_run_seconds: float | None = None
+        self._vacuum_requested = False
+        self._writers = 0
+        self._last_write = time.monotonic()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+
+    def start(self):
+        if self.enabled and (self._worker is None or self._worker.done()):
+            self._worker = asyncio.create_task(self._run())
+
+    def notify(self, vacuum: bool = False):
+        """빈 페이지가 생김 (다음 유휴 시간에 회수, vacuum=True면 전체 VACUUM)"""
+        self._vacuum_requested |= vacuum
+        if self._worker is not None:
+            self._wakeup.set()
+
+    async def close(self):
+        """워커를 멈추고 종료 직전 PRAGMA optimize (SQLite 권장 사항)"""
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("PRAGMA optimize"))
+            except Exception as e:
+                logger.warning(f"PRAGMA optimize failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "runs": self.runs,
+            "pages_reclaimed": self.pages_reclaimed,
+            "last_run_seconds": self.last_run_seconds,
+        }
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        """스트림 외의 쓰기 작업 (일괄 생성, 가져오기) 동안 유지보수를 미룸"""
+        self._writers += 1
+        try:
+            yield
+        finally:
+            self._writers -= 1
+            self._last_write = time.monotonic()
+
+    def idle_for(self) -> float:
+        """진행 중인 스트림과 쓰기 작업이 없으면 마지막 활동 후 경과 시간 (초), 있으면 0"""
+        if self._writers:
+            return 0.0
+        return min(stream_registry.idle_for(), time.monotonic() - self._last_write)
+
+    def idle(self) -> bool:
+        return not self._writers and self.idle_for() >= self.idle_seconds
+
+    async def wait_idle(self):
+        """진행 중인 스트림과 쓰기 작업 없이 idle_seconds가 지날 때까지 대기"""
+        while (idle := self.idle_for()) < self.idle_seconds:
+            await asyncio.sleep(self.idle_seconds - idle)
+
+    async def run_once(self) -> int:
+        """빈 페이지를 회수하고 통계 갱신, 회수한 페이지 수 반환
+
+        auto_vacuum이 꺼진 기존 DB는 회수할 페이지가 생겼을 때 한 번 VACUUM해서
+        INCREMENTAL로 전환한다. 전체 VACUUM은 DB 전체를 다시 쓰므로 이 경우와
+        요청받은 경우에만 한다. 유휴 상태가 끝나면 남은 페이지는 다음 실행으로 미룬다.
+        """
+        started = time.perf_counter()
+        reclaimed = 0
+        async with engine.connect() as conn:
+            # VACUUM은 트랜잭션 안에서 실행할 수 없음
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+            async def pragma(name: str) -> int:
+                return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+            free_pages = await pragma("freelist_count")
+            convert = free_pages and await pragma("auto_vacuum") != AUTO_VACUUM_INCREMENTAL
+            # 유휴 대기 후 그 사이에 시작된 쓰기 작업이 있으면 전체 VACUUM은 다음으로 미룸
+            if (convert or self._vacuum_requested) and self.idle():
+                self._vacuum_requested = False
+                pages = await pragma("page_count")
+                await conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+                await conn.execute(text("VACUUM"))
+                reclaimed = pages - await pragma("page_count")
+                logger.info(f"Vacuumed database ({reclaimed} pages reclaimed)")
+            else:
+                while free_pages and self.idle():
+                    await conn.execute(text(f"PRAGMA incremental_vacuum({self.vacuum_pages})"))
+                    remaining = await pragma("freelist_count")
+                    if remaining >= free_pages:
+                        break
+                    reclaimed += free_pages - remaining
+                    free_pages = remaining
+                    # 청크 사이에 다른 요청이 DB를 쓸 수 있게 양보
+                    await asyncio.sleep(0)
+            await conn.execute(text("PRAGMA optimize"))
+
+        self.runs += 1
+        self.pages_reclaimed += reclaimed
+        self.last_run_seconds = round(time.perf_counter() - started, 3)
+        if reclaimed:
+            logger.info(f"Reclaimed {reclaimed} database pages in {self.last_run_seconds}s")
+        return reclaimed
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.wait_idle()
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Database maintenance failed: {e}")
+
+
+db_maintenance = DatabaseMaintenance()
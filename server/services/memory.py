@@ -0,0 +1,295 @@
+"""이전 메시지 임베딩 색인 (semantic memory)
+
+완료된 메시지를 백그라운드에서 MEMORY_BATCH_SIZE개씩 임베딩해 float32 행렬
+파일(vectors.f32)에 이어 붙이고, 메시지와 행 번호의 대응은 memory_entries
+테이블에 기록한다. 검색은 파일을 memmap으로 열어 정규화된 벡터와 내적(cosine
+유사도)을 NumPy로 한 번에 계산한다. 색인된 메시지는 다시 임베딩하지 않으므로
+재시작해도 새 메시지만 색인한다. 임베더가 바뀌면 색인을 처음부터 다시 만든다.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+
+from sqlalchemy import delete, insert, select, text
+
+from config import (
+    MEMORY_BATCH_SIZE,
+    MEMORY_ENABLED,
+    MEMORY_INDEX_DIR,
+    MEMORY_INTERVAL,
+    MEMORY_MAX_CHARS,
+    MEMORY_MIN_SCORE,
+    MEMORY_SNIPPET_CHARS,
+    MEMORY_TOP_K,
+)
+from database import async_session
+from models.chat import Chat, Message
+from models.memory import MemoryEntry
+from services.embeddings import BaseEmbedder, create_embedder
+from services.llm import Prompt, to_messages
+
+# numpy는 semantic memory를 켠 경우에만 불러옴 (없으면 비활성화)
+np = None
+if MEMORY_ENABLED:
+    try:
+        import numpy as np
+    except ImportError:
+        pass
+
+logger = logging.getLogger(__name__)
+
+# 아직 색인하지 않은 완료 메시지 (최신 메시지부터)
+PENDING_QUERY = text(
+    """
+    SELECT m.id, m.content FROM messages m
+    WHERE m.status != 'streaming'
+      AND NOT EXISTS (SELECT 1 FROM memory_entries e WHERE e.message_id = m.id)
+    ORDER BY m.rowid DESC
+    LIMIT :limit
+    """
+).columns(Message.id, Message.content)  # 압축된 content는 CompressedText가 풂
+# 검색 후 삭제된 메시지 등을 걸러내도 k개가 남도록 더 많이 뽑음
+CANDIDATE_FACTOR = 4
+
+
+class VectorIndex:
+    """append 전용 float32 벡터 행렬 파일 (읽기는 memmap)"""
+
+    def __init__(self, directory: Path):
+        self.vectors_path = directory / "vectors.f32"
+        self.meta_path = directory / "meta.json"
+        self.embedder: str | None = None
+        self.dim = 0
+        self._matrix = None
+
+    @property
+    def rows(self) -> int:
+        return 0 if self._matrix is None else len(self._matrix)
+
+    def load(self, embedder: str) -> bool:
+        """기존 색인 열기 (없거나 다른 임베더로 만든 색인이면 False)"""
+        try:
+            meta = json.loads(self.meta_path.read_text())
+        except (OSError, ValueError):
+            return False
+        if meta.get("embedder") != embedder or not self.vectors_path.exists():
+            return False
+        self.embedder, self.dim = embedder, meta["dim"]
+        # 추가 도중 종료돼 마지막 행이 잘렸으면 버림
+        row_bytes = self.dim * 4
+        size = self.vectors_path.stat().st_size
+        if size % row_bytes:
+            os.truncate(self.vectors_path, size - size % row_bytes)
+        self._remap()
+        return True
+
+    def reset(self, embedder: str, dim: int):
+        self.vectors_path.parent.mkdir(parents=True, exist_ok=True)
+        self.vectors_path.write_bytes(b"")
+        tmp = self.meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"embedder": embedder, "dim": dim}))
+        os.replace(tmp, self.meta_path)
+        self.embedder, self.dim = embedder, dim
+        self._matrix = None
+
+    def append(self, vectors) -> int:
+        """정규화된 벡터를 파일 끝에 추가하고 첫 행 번호 반환"""
+        start = self.rows
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        self._remap()
+        return start
+
+    def search(self, query, k: int) -> list[tuple[int, float]]:
+        """cosine 유사도 상위 k개 (행 번호, 점수)"""
+        matrix = self._matrix
+        if matrix is None or k <= 0:
+            return []
+        scores = matrix @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def _remap(self):
+        rows = self.vectors_path.stat().st_size // (self.dim * 4)
+        self._matrix = (
+            np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            if rows
+            else None
+        )
+
+
+def _normalize(vectors: list[list[float]]):
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class MemoryIndex:
+    """메시지 임베딩 색인과 검색
+
+    새 메시지가 저장되면 notify()로 색인 작업을 깨우고, 알림이 없어도
+    MEMORY_INTERVAL마다 빠진 메시지(가져오기 등)가 있는지 확인한다.
+    """
+
+    def __init__(self, directory: str = MEMORY_INDEX_DIR, enabled: bool = MEMORY_ENABLED):
+        self.index = VectorIndex(Path(directory))
+        self.enabled = enabled and np is not None
+        if enabled and np is None:
+            logger.warning("numpy is not installed; semantic memory is disabled")
+        self.embedder: BaseEmbedder | None = None
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._ready = asyncio.Event()
+
+    def start(self, embedder: BaseEmbedder | None = None):
+        if not self.enabled or (self._worker is not None and not self._worker.done()):
+            return
+        self.embedder = embedder or create_embedder()
+        self._worker = asyncio.create_task(self._run())
+
+    def notify(self):
+        """새 메시지가 저장됨 (색인 작업 깨우기)"""
+        if self._worker is not None:
+            self._wakeup.set()
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        if self.embedder is not None:
+            await self.embedder.close()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "embedder": self.embedder.name if self.embedder else None,
+            "dim": self.index.dim or None,
+            "vectors": self.index.rows,
+        }
+
+    async def index_pending(self) -> int:
+        """색인하지 않은 메시지 한 묶음을 임베딩해 추가, 처리한 메시지 수 반환"""
+        async with async_session() as db:
+            rows = (await db.execute(PENDING_QUERY, {"limit": MEMORY_BATCH_SIZE})).all()
+        if not rows:
+            return 0
+
+        texts = {message_id: content.strip()[:MEMORY_MAX_CHARS] for message_id, content in rows}
+        targets = [message_id for message_id, content in texts.items() if content]
+        entries = {message_id: None for message_id in texts}
+        if targets:
+            vectors = _normalize(await self.embedder.embed([texts[m] for m in targets]))
+            if self.index.embedder is None:
+                self.index.reset(self.embedder.name, vectors.shape[1])
+            start = self.index.append(vectors)
+            for offset, message_id in enumerate(targets):
+                entries[message_id] = start + offset
+
+        async with async_session() as db:
+            await db.execute(
+                insert(MemoryEntry).prefix_with("OR IGNORE"),
+                [{"message_id": m, "row": row} for m, row in entries.items()],
+            )
+            await db.commit()
+        return len(rows)
+
+    async def search(
+        self,
+        query: str,
+        k: int = MEMORY_TOP_K,
+        exclude_chat_id: str | None = None,
+        min_score: float | None = None,
+    ) -> list[dict]:
+        """질의와 비슷한 이전 메시지 상위 k개 (유사도 내림차순)"""
+        await self._ready.wait()
+        [vector] = _normalize(await self.embedder.embed([query]))
+        candidates = await asyncio.to_thread(
+            self.index.search, vector, k * CANDIDATE_FACTOR
+        )
+        if not candidates:
+            return []
+        scores = dict(candidates)
+
+        async with async_session() as db:
+            result = await db.execute(
+                select(
+                    MemoryEntry.row,
+                    Message.id.label("message_id"),
+                    Message.chat_id,
+                    Chat.title.label("chat_title"),
+                    Message.role,
+                    Message.content,
+                    Message.created_at,
+                )
+                .join(Message, Message.id == MemoryEntry.message_id)
+                .join(Chat, Chat.id == Message.chat_id)
+                .where(MemoryEntry.row.in_(list(scores)))
+            )
+            hits = [
+                {**row, "score": scores[row["row"]]}
+                for row in result.mappings()
+                if row["chat_id"] != exclude_chat_id
+                and (min_score is None or scores[row["row"]] >= min_score)
+            ]
+        hits.sort(key=lambda hit: hit["score"], reverse=True)
+        return hits[:k]
+
+    async def augment(
+        self, prompt: Prompt, query: str, exclude_chat_id: str | None = None
+    ) -> Prompt:
+        """관련된 이전 대화를 시스템 메시지로 프롬프트 앞에 추가 (실패하면 그대로)"""
+        if not self.enabled or self._worker is None:
+            return prompt
+        try:
+            hits = await self.search(
+                query, exclude_chat_id=exclude_chat_id, min_score=MEMORY_MIN_SCORE
+            )
+        except Exception as e:
+            logger.warning(f"Memory retrieval failed: {e}")
+            return prompt
+        if not hits:
+            return prompt
+        from langchain_core.messages import SystemMessage
+
+        lines = [
+            f"- [{hit['chat_title']}] {hit['role']}: {hit['content'][:MEMORY_SNIPPET_CHARS]}"
+            for hit in hits
+        ]
+        memory = SystemMessage(content="다른 대화에서 찾은 관련 내용 (참고용):\n" + "\n".join(lines))
+        return [memory, *to_messages(prompt)]
+
+    async def _open(self):
+        async with async_session() as db:
+            if self.index.load(self.embedder.name):
+                # 벡터 파일에 없는 행을 가리키는 항목은 다시 색인
+                await db.execute(delete(MemoryEntry).where(MemoryEntry.row >= self.index.rows))
+            else:
+                # 색인이 없거나 임베더가 바뀌면 첫 묶음에서 새로 만듦
+                await db.execute(delete(MemoryEntry))
+            await db.commit()
+
+    async def _run(self):
+        try:
+            await self._open()
+        finally:
+            self._ready.set()
+        while True:
+            self._wakeup.clear()
+            try:
+                while await self.index_pending():
+                    pass
+            except Exception as e:
+                logger.warning(f"Memory indexing failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), MEMORY_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+memory_index = MemoryIndex()
@@ -0,0 +1,337 @@
+"""스트리밍 hot path 계측과 Prometheus text 포맷 내보내기
+
+외부 의존성 없이 고정 bucket 히스토그램과 카운터만 구현한다. 관측 한 번은
+bisect + 덧셈 정도라 운영 환경에서 켜 둬도 부담이 없다.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import AsyncIterator, Callable
+from contextlib import contextmanager
+
+from services.cold_storage import cold_storage
+from services.latency import latency_tracker
+from services.maintenance import db_maintenance
+from services.replay import replay_registry
+from services.scheduler import admission_scheduler
+from services.streams import stream_registry
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+GAP_BUCKETS = (0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+RATE_BUCKETS = (1, 5, 10, 20, 35, 50, 75, 100, 150, 250, 500)
+# 클라이언트로 쓰는 시간 단계 (스트림 구독자가 끝날 때 따로 기록)
+WRITE_STAGE = "sse_write"
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [bucket별 개수..., +Inf 개수, 합계]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series[:-1]):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {series[-1]}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], list[str]]] = []
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], list[str]]):
+        """scrape 시점에 값을 읽어 오는 gauge류 등록"""
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "otemee_request_stage_seconds",
+    "Time spent in each stage of a chat request",
+    ("endpoint", "stage", "provider", "model"),
+)
+TTFT_SECONDS = metrics.histogram(
+    "otemee_ttft_seconds",
+    "Time from request start to first streamed token",
+    ("provider", "model"),
+)
+INTER_TOKEN_SECONDS = metrics.histogram(
+    "otemee_inter_token_seconds",
+    "Gap between consecutive upstream tokens",
+    ("provider", "model"),
+    GAP_BUCKETS,
+)
+TOKENS_PER_SECOND = metrics.histogram(
+    "otemee_tokens_per_second",
+    "Upstream token rate per stream after the first token",
+    ("provider", "model"),
+    RATE_BUCKETS,
+)
+STREAM_SECONDS = metrics.histogram(
+    "otemee_stream_duration_seconds",
+    "Total duration of a streamed response",
+    ("provider", "model"),
+)
+TOKENS_TOTAL = metrics.counter(
+    "otemee_tokens_total", "Upstream tokens streamed", ("provider", "model")
+)
+STREAMS_TOTAL = metrics.counter(
+    "otemee_streams_total", "Finished streams by outcome", ("provider", "model", "outcome")
+)
+SSE_FRAMES_TOTAL = metrics.counter("otemee_sse_frames_total", "SSE frames written")
+SSE_BYTES_TOTAL = metrics.counter("otemee_sse_bytes_total", "SSE bytes written")
+
+
+def _gauge(name: str, help: str, samples: list[tuple[dict, float]]) -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        names = tuple(labels)
+        lines.append(f"{name}{_format_labels(names, tuple(labels.values()))} {value}")
+    return lines
+
+
+@metrics.collector
+def _collect_runtime() -> list[str]:
+    streams = stream_registry.stats()
+    scheduler = admission_scheduler.stats()
+    latency = latency_tracker.stats()
+    lines = _gauge(
+        "otemee_active_streams", "Streams in progress", [({}, streams["active_streams"])]
+    )
+    lines += _gauge(
+        "otemee_cancelled_streams",
+        "Cancelled streams by reason",
+        [({"reason": r}, count) for r, count in streams["cancelled_streams"].items()],
+    )
+    lines += _gauge(
+        "otemee_estimated_tokens_saved",
+        "Estimated tokens not generated thanks to cancellation",
+        [({}, streams["estimated_tokens_saved"])],
+    )
+    for field in ("in_flight", "queued", "rejected"):
+        lines += _gauge(
+            f"otemee_scheduler_{field}",
+            f"Admission scheduler {field.replace('_', ' ')} per provider",
+            [({"provider": p}, s[field]) for p, s in scheduler.items()],
+        )
+    replay = replay_registry.stats()
+    lines += _gauge(
+        "otemee_replay_buffers", "Resumable stream buffers held", [({}, replay["buffers"])]
+    )
+    lines += _gauge(
+        "otemee_replay_frames", "SSE frames held for replay", [({}, replay["frames"])]
+    )
+    cold = cold_storage.stats()
+    lines += _gauge(
+        "otemee_cold_storage_bytes_saved",
+        "Message bytes saved by cold storage compression since start",
+        [({}, cold["bytes_before"] - cold["bytes_after"])],
+    )
+    maintenance = db_maintenance.stats()
+    lines += _gauge(
+        "otemee_db_pages_reclaimed",
+        "Database pages reclaimed by incremental vacuum",
+        [({}, maintenance["pages_reclaimed"])],
+    )
+    lines += _gauge(
+        "otemee_provider_ttft_p95_seconds",
+        "Live provider TTFT p95 used for hedging",
+        [
+            ({"provider": p}, s["ttft_p95_ms"] / 1000)
+            for p, s in latency.items()
+            if s["ttft_p95_ms"] is not None
+        ],
+    )
+    return lines
+
+
+class RequestTimer:
+    """채팅 요청 한 건의 단계별 소요 시간
+
+    stage()로 감싼 구간, 첫 토큰/토큰 간격, SSE 쓰기 시간을 모아 두었다가
+    finish()에서 히스토그램에 기록한다. 스트리밍 전에 끝난 단계는
+    server_timing()으로 Server-Timing 헤더를 만들 수 있다.
+    """
+
+    def __init__(self, endpoint: str, provider: str = "", model: str = ""):
+        self.endpoint = endpoint
+        self.provider = provider
+        self.model = model
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.tokens = 0
+        self.first_token_at: float | None = None
+        self.last_token_at: float | None = None
+        self._finished = False
+        self._write_finished = False
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def token(self):
+        """upstream 토큰 하나 도착 (StreamFramer on_token hook)"""
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        else:
+            INTER_TOKEN_SECONDS.observe(now - self.last_token_at, self.provider, self.model)
+        self.last_token_at = now
+        self.tokens += 1
+
+    @property
+    def ttft(self) -> float | None:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        if self.tokens < 2:
+            return None
+        return (self.tokens - 1) / max(self.last_token_at - self.first_token_at, 1e-9)
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()
+        )
+
+    def summary(self) -> dict:
+        ttft = self.ttft
+        rate = self.tokens_per_second
+        return {
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "tokens": self.tokens,
+            "tokens_per_sec": round(rate, 1) if rate is not None else None,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages_ms": {name: round(s * 1000, 1) for name, s in self.stages.items()},
+        }
+
+    def finish(self, outcome: str, frames: int = 0, bytes_: int = 0):
+        """히스토그램/카운터에 기록 (한 번만, sse_write는 finish_write()에서)"""
+        if self._finished:
+            return
+        self._finished = True
+        labels = (self.provider, self.model)
+        for name, seconds in self.stages.items():
+            if name != WRITE_STAGE:
+                STAGE_SECONDS.observe(seconds, self.endpoint, name, *labels)
+        if self.ttft is not None:
+            TTFT_SECONDS.observe(self.ttft, *labels)
+        if self.tokens_per_second is not None:
+            TOKENS_PER_SECOND.observe(self.tokens_per_second, *labels)
+        STREAM_SECONDS.observe(time.perf_counter() - self.started, *labels)
+        TOKENS_TOTAL.inc(*labels, amount=self.tokens)
+        STREAMS_TOTAL.inc(*labels, outcome)
+        SSE_FRAMES_TOTAL.inc(amount=frames)
+        SSE_BYTES_TOTAL.inc(amount=bytes_)
+
+    def finish_write(self):
+        """클라이언트로 쓰기가 끝난 뒤 sse_write 기록
+
+        저장 채팅은 생성 task가 구독자보다 먼저 끝나므로 finish()와 따로 기록한다.
+        """
+        if self._write_finished or WRITE_STAGE not in self.stages:
+            return
+        self._write_finished = True
+        STAGE_SECONDS.observe(
+            self.stages[WRITE_STAGE], self.endpoint, WRITE_STAGE, self.provider, self.model
+        )
+
+
+async def timed_frames(frames: AsyncIterator[bytes], timer: RequestTimer) -> AsyncIterator[bytes]:
+    """frame을 넘긴 뒤 다음 요청이 올 때까지(= 클라이언트로 쓰는 시간)를 sse_write로 기록"""
+    try:
+        async for frame in frames:
+            started = time.perf_counter()
+            yield frame
+            timer.add(WRITE_STAGE, time.perf_counter() - started)
+    finally:
+        await frames.aclose()
+        timer.finish_write()
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+
+import httpx
+
+from config import MODEL_CATALOG_REFRESH_INTERVAL, MODEL_CATALOG_TTL, OLLAMA_BASE_URL
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCatalog:
+    """Ollama 모델 목록을 TTL 동안 캐시하는 카탈로그
+
+    캐시가 오래되면 이전 값을 그대로 반환하면서 백그라운드에서 갱신한다
+    (stale-while-revalidate). lifespan에서 start()하면 주기적으로 미리 갱신하므로
+    /api/models 요청이 Ollama 응답을 기다리는 일이 없다.
+    """
+
+    def __init__(
+        self,
+        ttl: float = MODEL_CATALOG_TTL,
+        refresh_interval: float = MODEL_CATALOG_REFRESH_INTERVAL,
+    ):
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._models: list[dict] = []
+        self._status = "not_running"  # "running" | "not_running"
+        self._fetched_at: float | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._refreshing: asyncio.Task | None = None
+        self._loop_task: asyncio.Task | None = None
+
+    async def get_ollama_models(self) -> tuple[list[dict], str]:
+        """(Ollama 모델 목록, 상태) 반환"""
+        if self._fetched_at is None:
+            # 최초 1회는 결과를 기다림
+            await self.refresh()
+        elif time.monotonic() - self._fetched_at > self.ttl:
+            self._refresh_in_background()
+        return self._models, self._status
+
+    def has(self, model: str) -> bool:
+        """마지막으로 조회한 Ollama 모델 목록에 있는지 (조회 없이 캐시만 확인)"""
+        return any(m["id"] == model for m in self._models)
+
+    async def refresh(self):
+        """Ollama /api/tags를 조회해 캐시 갱신"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=OLLAMA_BASE_URL, timeout=5.0)
+
+        models = []
+        status = "running"
+        try:
+            response = await self._client.get("/api/tags")
+            if response.status_code == 200:
+                data = response.json()
+                for model in data.get("models", []):
+                    name = model.get("name", "")
+                    size = model.get("size", 0)
+                    size_gb = round(size / (1024 * 1024 * 1024), 1)
+
+                    models.append(
+                        {
+                            "id": name,
+                            "name": name,
+                            "provider": "ollama",
+                            "size": f"{size_gb}GB" if size_gb > 0 else None,
+                        }
+                    )
+        except httpx.RequestError:
+            status = "not_running"
+
+        self._models = models
+        self._status = status
+        self._fetched_at = time.monotonic()
+
+    def start(self):
+        """주기적 백그라운드 갱신 시작"""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        for task in (self._loop_task, self._refreshing):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _refresh_in_background(self):
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self.refresh())
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Model catalog refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+model_catalog = ModelCatalog()
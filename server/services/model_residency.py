@@ -0,0 +1,160 @@
+import asyncio
+import logging
+
+import httpx
+from sqlalchemy import func, select
+
+from config import (
+    OLLAMA_BASE_URL,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_MODEL_KEEP_ALIVE,
+    OLLAMA_PRELOAD_RECENT,
+    OLLAMA_WARMUP_TIMEOUT,
+)
+from database import async_session
+from models.chat import Chat
+from services.model_catalog import model_catalog
+from services.settings_cache import SettingsSnapshot, settings_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ModelResidency:
+    """Ollama 모델을 미리 메모리에 올리고 상주 시간을 관리
+
+    Ollama는 첫 요청 때 모델을 로드하므로 시작 직후나 모델을 바꾼 뒤의 첫 응답이
+    수 초씩 늦어진다. 시작 시 기본 모델과 최근 사용한 모델을 빈 프롬프트로 미리
+    로드하고, 스트리밍 요청마다 모델별 keep_alive를 넘겨 자주 쓰는 모델이
+    내려가지 않게 한다. 고정(pin)한 모델은 keep_alive=-1로 계속 상주한다.
+    """
+
+    def __init__(self):
+        self.pinned: set[str] = set()
+        # 모델 이름 -> Ollama /api/ps의 만료 시각 (아직 모르면 None)
+        self.loaded: dict[str, str | None] = {}
+        self._client: httpx.AsyncClient | None = None
+        self._warming: dict[str, asyncio.Task] = {}
+        self._preload_task: asyncio.Task | None = None
+        self._background: set[asyncio.Task] = set()
+
+    def keep_alive_for(self, model: str) -> str | int:
+        if model in self.pinned:
+            return -1
+        return OLLAMA_MODEL_KEEP_ALIVE.get(model, OLLAMA_KEEP_ALIVE)
+
+    def start(self):
+        """백그라운드에서 기본 모델과 최근 모델 preload (서버 시작을 막지 않음)"""
+        if self._preload_task is None or self._preload_task.done():
+            self._preload_task = asyncio.create_task(self._preload())
+
+    async def warm(self, model: str):
+        """모델을 로드하고 keep_alive 갱신 (같은 모델 요청이 겹치면 하나만 실행)"""
+        task = self._warming.get(model)
+        if task is None or task.done():
+            task = asyncio.create_task(self._load(model))
+            self._warming[model] = task
+            task.add_done_callback(lambda _: self._warming.pop(model, None))
+        await asyncio.shield(task)
+
+    def warm_in_background(self, model: str):
+        task = asyncio.create_task(self._warm_quietly(model))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def pin(self, model: str):
+        self.pinned.add(model)
+        await self.warm(model)
+
+    async def unpin(self, model: str):
+        self.pinned.discard(model)
+        # 기본 keep_alive로 다시 로드해 만료 시각을 되돌림
+        if model in self.loaded:
+            await self.warm(model)
+
+    async def refresh_loaded(self):
+        """Ollama /api/ps 기준으로 로드된 모델 목록 갱신"""
+        response = await self._http().get("/api/ps")
+        response.raise_for_status()
+        self.loaded = {
+            item["name"]: item.get("expires_at")
+            for item in response.json().get("models", [])
+        }
+
+    def status(self) -> list[dict]:
+        models = sorted(set(self.loaded) | self.pinned)
+        return [
+            {
+                "model": model,
+                "loaded": model in self.loaded,
+                "pinned": model in self.pinned,
+                "keep_alive": self.keep_alive_for(model),
+                "expires_at": self.loaded.get(model),
+            }
+            for model in models
+        ]
+
+    async def close(self):
+        tasks = [self._preload_task, *self._warming.values(), *self._background]
+        for task in tasks:
+            if task is not None and not task.done():
+                task.cancel()
+        await asyncio.gather(*(t for t in tasks if t is not None), return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=OLLAMA_BASE_URL, timeout=OLLAMA_WARMUP_TIMEOUT
+            )
+        return self._client
+
+    async def _load(self, model: str):
+        # prompt 없이 generate를 호출하면 Ollama는 모델만 로드하고 바로 응답
+        keep_alive = self.keep_alive_for(model)
+        response = await self._http().post(
+            "/api/generate", json={"model": model, "keep_alive": keep_alive}
+        )
+        response.raise_for_status()
+        self.loaded.setdefault(model, None)
+        logger.info(f"Ollama model {model} loaded (keep_alive={keep_alive})")
+
+    async def _warm_quietly(self, model: str):
+        try:
+            # 설치된 Ollama 모델만 로드 (클라우드 모델 제외)
+            models, status = await model_catalog.get_ollama_models()
+            if status != "running" or model not in {m["id"] for m in models}:
+                return
+            await self.warm(model)
+        except Exception as e:
+            logger.warning(f"Failed to warm up Ollama model {model}: {e}")
+
+    async def _preload(self):
+        try:
+            async with async_session() as db:
+                settings = await settings_cache.get(db)
+                recent = (
+                    await db.execute(
+                        select(Chat.model)
+                        .where(Chat.model.is_not(None))
+                        .group_by(Chat.model)
+                        .order_by(func.max(Chat.updated_at).desc())
+                        .limit(OLLAMA_PRELOAD_RECENT)
+                    )
+                ).scalars().all()
+
+            settings = settings or SettingsSnapshot()
+            self.pinned.update(settings.pinned_models)
+            candidates = [*settings.pinned_models, settings.default_model, *recent]
+
+            for model in dict.fromkeys(m for m in candidates if m):
+                await self._warm_quietly(model)
+            _, status = await model_catalog.get_ollama_models()
+            if status == "running":
+                await self.refresh_loaded()
+        except Exception as e:
+            logger.warning(f"Ollama model preload failed: {e}")
+
+
+model_residency = ModelResidency()
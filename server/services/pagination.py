@@ -0,0 +1,19 @@
+import base64
+from datetime import datetime
+
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    """(timestamp, id) keyset 위치를 불투명한 cursor 문자열로 인코딩"""
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """cursor 문자열을 (timestamp, id)로 디코딩 (형식이 잘못되면 ValueError)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        timestamp, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), row_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,128 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from config import REPLAY_BUFFER_FRAMES, REPLAY_GRACE_TTL
+from services.sse import dumps
+
+logger = logging.getLogger(__name__)
+
+# "1"이면 연결이 끊겨도 응답 생성을 계속하고 GET .../stream으로 다시 붙을 수 있음
+RESUMABLE_HEADER = "X-Stream-Resumable"
+
+# SSE event id (재시작 후에도 이전 id보다 크도록 시각으로 시작, 모든 스트림 공용)
+_event_ids = itertools.count(int(time.time() * 1000))
+
+
+class ReplayBuffer:
+    """한 응답 스트림에서 내보낸 SSE frame의 링 버퍼
+
+    frame마다 id를 붙여 최근 capacity개를 보관한다. 구독자는 Last-Event-ID
+    이후의 frame을 replay로 받은 뒤 새 frame을 이어서 받는다. 받지 못한 frame이
+    링에서 밀려났으면 (재연결 시든 느린 구독자든) replay_gap 이벤트를 보내고
+    남은 frame부터 이어간다. 빠진 내용은 GET /api/chats/{id}로 다시 받는다.
+    """
+
+    def __init__(self, key: str, framing: str, capacity: int = REPLAY_BUFFER_FRAMES):
+        self.key = key
+        self.framing = framing
+        self.frames: deque[tuple[int, bytes]] = deque(maxlen=capacity)
+        self.last_id = 0
+        # 링에서 밀려난 마지막 frame id (event id는 스트림 공용이라 연속이 아님)
+        self.evicted_id = 0
+        self.done = False
+        self.task: asyncio.Task | None = None
+        self._signal = asyncio.Event()
+
+    def push(self, frame: bytes):
+        event_id = next(_event_ids)
+        if len(self.frames) == self.frames.maxlen:
+            self.evicted_id = self.frames[0][0]
+        self.frames.append((event_id, b"id: %d\n" % event_id + frame))
+        self.last_id = event_id
+        self._wake()
+
+    def close(self):
+        self.done = True
+        self._wake()
+
+    async def subscribe(self, last_event_id: int | None = None) -> AsyncIterator[bytes]:
+        """last_event_id 이후 frame을 replay한 뒤 스트림이 끝날 때까지 이어서 전달"""
+        cursor = last_event_id or 0
+        while True:
+            signal = self._signal
+            done = self.done
+            # await 없이 끝에서부터 새 frame만 모음 (그동안 버퍼가 바뀌지 않음)
+            batch = []
+            if cursor < self.evicted_id:
+                gap = {"resume_from": self.frames[0][0]}
+                batch.append(b"event: replay_gap\ndata: " + dumps(gap) + b"\n\n")
+            new = []
+            for event_id, frame in reversed(self.frames):
+                if event_id <= cursor:
+                    break
+                new.append(frame)
+            batch.extend(reversed(new))
+            if batch:
+                cursor = self.last_id
+                yield b"".join(batch)
+            if done:
+                return
+            await signal.wait()
+
+    def _wake(self):
+        self._signal.set()
+        self._signal = asyncio.Event()
+
+
+class ReplayRegistry:
+    """채팅별 재연결 가능한 스트림 (완료 후 grace_ttl이 지나면 버퍼 제거)"""
+
+    def __init__(self, grace_ttl: float = REPLAY_GRACE_TTL):
+        self.grace_ttl = grace_ttl
+        self._buffers: dict[str, ReplayBuffer] = {}
+
+    def start(
+        self, key: str, framing: str, produce: Callable[[ReplayBuffer], Awaitable[None]]
+    ) -> ReplayBuffer:
+        """produce(buffer)를 HTTP 연결과 별개의 task로 실행 (같은 채팅의 이전 버퍼는 교체)"""
+        buffer = ReplayBuffer(key, framing)
+        self._buffers[key] = buffer
+        buffer.task = asyncio.create_task(produce(buffer))
+        buffer.task.add_done_callback(lambda task: self._finished(buffer, task))
+        return buffer
+
+    def get(self, key: str) -> ReplayBuffer | None:
+        return self._buffers.get(key)
+
+    async def close(self):
+        """서버 종료 시 진행 중인 생성 중단 (중간 응답 저장까지 대기)"""
+        tasks = [b.task for b in self._buffers.values() if b.task and not b.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._buffers.clear()
+
+    def stats(self) -> dict:
+        buffers = list(self._buffers.values())
+        return {
+            "buffers": len(buffers),
+            "live": sum(not b.done for b in buffers),
+            "frames": sum(len(b.frames) for b in buffers),
+        }
+
+    def _finished(self, buffer: ReplayBuffer, task: asyncio.Task):
+        buffer.close()
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Stream {buffer.key} failed: {task.exception()}")
+        asyncio.get_running_loop().call_later(self.grace_ttl, self._evict, buffer)
+
+    def _evict(self, buffer: ReplayBuffer):
+        if self._buffers.get(buffer.key) is buffer:
+            del self._buffers[buffer.key]
+
+
+replay_registry = ReplayRegistry()
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from collections.abc import AsyncGenerator
+
+from config import (
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_PATH,
+    RESPONSE_CACHE_TTL,
+)
+from services.llm import BaseLLMService, Prompt, QueuePosition, to_messages
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 정규화 (NFC + 앞뒤 공백 제거)
+
+    줄바꿈과 들여쓰기는 모델 입력의 일부이므로 그대로 둔다.
+    """
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def cache_key(provider: str, model: str, message: Prompt) -> str:
+    """provider/model/정규화한 메시지의 해시
+
+    provider 서비스는 샘플링 파라미터를 따로 설정하지 않고 각 SDK 기본값을
+    쓰므로 키에 넣지 않는다. 파라미터를 설정하게 되면 키에 추가해야 한다.
+    """
+    payload = {
+        "provider": provider,
+        "model": model,
+        "messages": [
+            [m.type, normalize_text(str(m.content))] for m in to_messages(message)
+        ],
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    """크기 제한 + LRU + TTL을 갖는 SQLite 파일 기반 응답 캐시
+
+    값은 chunk 목록을 zlib으로 압축해 저장한다. sqlite3 호출은 스레드에서
+    실행해 이벤트 루프를 막지 않는다.
+    """
+
+    def __init__(
+        self,
+        path: str = RESPONSE_CACHE_PATH,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        ttl: float = RESPONSE_CACHE_TTL,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> list[str] | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, chunks: list[str]):
+        await asyncio.to_thread(self._set, key, chunks)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)"
+            )
+        return self._conn
+
+    def _get(self, key: str) -> list[str] | None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+        return json.loads(zlib.decompress(value))
+
+    def _set(self, key: str, chunks: list[str]):
+        value = zlib.compress(json.dumps(chunks, ensure_ascii=False).encode())
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """TTL이 지난 항목 삭제 후 최대 크기를 넘으면 오래 사용하지 않은 순으로 삭제"""
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        victims = []
+        for key, size in rows:
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+
+response_cache = ResponseCache()
+
+
+class CachedLLMService(BaseLLMService):
+    """동일한 요청이면 캐시된 응답을 스트림으로 재생하는 래퍼
+
+    캐시 miss면 내부 서비스로 스트리밍하면서 chunk를 모으고, 끝까지 성공한
+    응답만 저장한다.
+    """
+
+    def __init__(
+        self,
+        inner: BaseLLMService,
+        provider: str,
+        cache: ResponseCache = response_cache,
+    ):
+        self.inner = inner
+        self.provider = provider
+        self.cache = cache
+
+    async def stream(self, message: Prompt, model: str) -> AsyncGenerator[str, None]:
+        async for item in self.stream_events(message, model):
+            if isinstance(item, str):
+                yield item
+
+    async def stream_events(
+        self, message: Prompt, model: str
+    ) -> AsyncGenerator[str | QueuePosition, None]:
+        key = cache_key(self.provider, model, message)
+        try:
+            cached = await self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            cached = None
+
+        if cached is not None:
+            for chunk in cached:
+                yield chunk
+            return
+
+        # 대기열 위치 같은 이벤트는 그대로 전달하고 응답 chunk만 모음
+        chunks: list[str] = []
+        async for item in self.inner.stream_events(message, model):
+            if isinstance(item, str):
+                chunks.append(item)
+            yield item
+
+        try:
+            await self.cache.set(key, chunks)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
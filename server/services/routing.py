@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+
+from config import (
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_MAX_DELAY,
+    HEDGE_MIN_DELAY,
+    HEDGE_P95_FACTOR,
+    ROUTING_FIRST_TOKEN_TIMEOUT,
+    ROUTING_HEDGE,
+)
+from services.latency import LatencyTracker, latency_tracker
+from services.llm import BaseLLMService, Prompt, QueuePosition
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+@dataclass
+class Route:
+    provider: str
+    model: str
+    service: BaseLLMService
+
+
+class _Attempt:
+    """경로 하나의 스트림을 공유 큐로 읽어 들이는 task"""
+
+    def __init__(self, route: Route, message: Prompt, queue: asyncio.Queue):
+        self.route = route
+        self.task = asyncio.create_task(self._pump(message, queue))
+
+    async def _pump(self, message: Prompt, queue: asyncio.Queue):
+        chunks = self.route.service.stream_events(message, self.route.model)
+        try:
+            async for item in chunks:
+                await queue.put((self, item))
+            await queue.put((self, _END))
+        except Exception as e:
+            await queue.put((self, e))
+        finally:
+            await chunks.aclose()
+
+    async def cancel(self):
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+
+
+class RoutedLLMService(BaseLLMService):
+    """여러 provider 경로를 순서대로 시도하는 라우팅 서비스
+
+    첫 토큰이 오기 전에 실패하면 다음 경로로 넘어가고(fallback), 첫 토큰이 제한
+    시간 안에 오지 않으면 다음 경로를 함께 시작해 먼저 토큰을 보낸 쪽을 쓴다.
+    hedge를 켜면 제한 시간을 provider의 최근 TTFT p95로 잡아 꼬리 지연만 줄이고,
+    끄면 ROUTING_FIRST_TOKEN_TIMEOUT을 쓴다. 연속 실패로 차단된 provider는 건너뛴다.
+    첫 토큰 이후의 오류는 응답이 섞이지 않도록 그대로 전달한다.
+    """
+
+    def __init__(
+        self,
+        routes: list[Route],
+        hedge: bool = ROUTING_HEDGE,
+        tracker: LatencyTracker | None = None,
+    ):
+        self.routes = routes
+        self.hedge = hedge
+        self.tracker = tracker or latency_tracker
+        self.last_route: Route | None = None
+
+    async def stream(self, message: Prompt, model: str) -> AsyncGenerator[str, None]:
+        async for item in self.stream_events(message, model):
+            if isinstance(item, str):
+                yield item
+
+    async def stream_events(
+        self, message: Prompt, model: str
+    ) -> AsyncGenerator[str | QueuePosition, None]:
+        routes = [r for r in self.routes if self.tracker.available(r.provider)]
+        routes = routes or self.routes[:1]
+        queue: asyncio.Queue = asyncio.Queue()
+        attempts: list[_Attempt] = []
+        next_route = 0
+        last_error: Exception | None = None
+        loop = asyncio.get_running_loop()
+        # 다음 경로를 시작할 시각 (대기열 위치 등 토큰이 아닌 이벤트로 늦춰지지 않음)
+        hedge_at: float | None = None
+
+        def launch():
+            nonlocal next_route, hedge_at
+            route = routes[next_route]
+            next_route += 1
+            attempts.append(_Attempt(route, message, queue))
+            hedge_at = None
+            if next_route < len(routes):
+                hedge_at = loop.time() + self._deadline(route.provider)
+            if next_route > 1:
+                logger.info(f"Routing to fallback {route.provider}/{route.model}")
+
+        try:
+            launch()
+            winner: _Attempt | None = None
+            while winner is None:
+                timeout = None
+                if hedge_at is not None:
+                    timeout = max(hedge_at - loop.time(), 0)
+                try:
+                    attempt, item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    # 첫 토큰이 늦으면 기존 요청은 두고 다음 경로를 함께 시작
+                    launch()
+                    continue
+
+                if isinstance(item, QueuePosition):
+                    if len(attempts) == 1:
+                        yield item
+                    continue
+                if isinstance(item, str) or item is _END:
+                    winner = attempt
+                    break
+
+                # 첫 토큰 전에 실패하면 다음 경로로
+                logger.warning(
+                    f"{attempt.route.provider}/{attempt.route.model} failed "
+                    f"before first token: {item}"
+                )
+                last_error = item
+                attempts.remove(attempt)
+                if not attempts:
+                    if next_route >= len(routes):
+                        raise last_error
+                    launch()
+
+            self.last_route = winner.route
+            for attempt in attempts:
+                if attempt is not winner:
+                    await attempt.cancel()
+            if item is _END:
+                return
+            yield item
+
+            while True:
+                attempt, item = await queue.get()
+                if attempt is not winner or isinstance(item, QueuePosition):
+                    continue
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for attempt in attempts:
+                await attempt.cancel()
+
+    def _deadline(self, provider: str) -> float:
+        if not self.hedge:
+            return ROUTING_FIRST_TOKEN_TIMEOUT
+        p95 = self.tracker.p95(provider)
+        if p95 is None:
+            return HEDGE_DEFAULT_DELAY
+        return min(max(p95 * HEDGE_P95_FACTOR, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
@@ -0,0 +1,281 @@
+import asyncio
+import time
+from collections import Counter, deque
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
+
+from config import (
+    CLOUD_MAX_IN_FLIGHT,
+    OLLAMA_MAX_IN_FLIGHT,
+    OLLAMA_MODEL_MAX_IN_FLIGHT,
+    PROVIDER_RPM,
+    SCHEDULER_MAX_QUEUE,
+)
+from services.latency import latency_tracker
+from services.llm import BaseLLMService, Prompt, QueuePosition
+
+# token bucket 용량 (분당 한도 중 몇 초 분량까지 한 번에 허용할지)
+BURST_SECONDS = 10
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차 요청을 받을 수 없음"""
+
+
+class TokenBucket:
+    """분당 요청 수 한도를 맞추기 위한 token bucket"""
+
+    def __init__(self, requests_per_minute: float):
+        self.rate = requests_per_minute / 60
+        self.capacity = max(1.0, self.rate * BURST_SECONDS)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """다음 토큰이 생길 때까지 남은 초"""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+@dataclass(eq=False)
+class Ticket:
+    """스케줄러 대기열의 요청 하나"""
+
+    provider: str
+    model: str
+    position: int = 0
+    admitted: bool = False
+    released: bool = False
+    enqueued_at: float = field(default_factory=time.monotonic)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    async def wait(self):
+        """대기열 위치가 바뀌거나 입장할 때까지 대기"""
+        await self._changed.wait()
+        self._changed.clear()
+
+    def _notify(self):
+        self._changed.set()
+
+
+class _ProviderLane:
+    def __init__(
+        self,
+        max_in_flight: int,
+        model_max_in_flight: int,
+        max_queue: int,
+        requests_per_minute: float,
+    ):
+        self.max_in_flight = max_in_flight
+        self.model_max_in_flight = model_max_in_flight
+        self.max_queue = max_queue
+        self.bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.in_flight = 0
+        self.model_in_flight: Counter[str] = Counter()
+        self.waiters: deque[Ticket] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wakeup: asyncio.TimerHandle | None = None
+
+
+class AdmissionScheduler:
+    """provider/모델별 동시 스트림 수 제한과 FIFO 대기열
+
+    provider마다 전체 동시 실행 수, 모델별 동시 실행 수, 분당 요청 수(token bucket)를
+    따로 제한한다. 대기열은 도착 순서대로 처리하되, 모델 한도에 걸린 요청은
+    건너뛰고 다른 모델 요청을 먼저 입장시켜 한 모델이 provider 전체를 막지 않게 한다.
+    """
+
+    def __init__(self, max_queue: int = SCHEDULER_MAX_QUEUE):
+        self.max_queue = max_queue
+        self._lanes: dict[str, _ProviderLane] = {}
+
+    def configure(
+        self,
+        provider: str,
+        *,
+        max_in_flight: int | None = None,
+        model_max_in_flight: int | None = None,
+        max_queue: int | None = None,
+        requests_per_minute: float | None = None,
+    ):
+        """provider 한도 변경 (이미 실행 중인 요청에는 영향 없음)"""
+        lane = self._lane(provider)
+        if max_in_flight is not None:
+            lane.max_in_flight = max_in_flight
+        if model_max_in_flight is not None:
+            lane.model_max_in_flight = model_max_in_flight
+        if max_queue is not None:
+            lane.max_queue = max_queue
+        if requests_per_minute is not None:
+            lane.bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._dispatch(lane)
+
+    def has_capacity(self, provider: str) -> bool:
+        """새 요청이 대기열에 들어갈 자리가 있는지"""
+        lane = self._lane(provider)
+        return len(lane.waiters) < lane.max_queue
+
+    def enqueue(self, provider: str, model: str) -> Ticket:
+        """요청을 대기열에 넣고 가능하면 바로 입장 (대기열이 가득 차면 QueueFullError)"""
+        lane = self._lane(provider)
+        ticket = Ticket(provider, model)
+        lane.waiters.append(ticket)
+        self._dispatch(lane)
+        if not ticket.admitted and len(lane.waiters) > lane.max_queue:
+            lane.waiters.remove(ticket)
+            ticket.released = True
+            lane.rejected += 1
+            raise QueueFullError(f"{provider} queue is full")
+        return ticket
+
+    def release(self, ticket: Ticket):
+        """스트림 종료 또는 대기 취소 시 호출 (여러 번 호출해도 안전)"""
+        if ticket.released:
+            return
+        ticket.released = True
+        lane = self._lane(ticket.provider)
+        if ticket.admitted:
+            lane.in_flight -= 1
+            lane.model_in_flight[ticket.model] -= 1
+            if lane.model_in_flight[ticket.model] <= 0:
+                del lane.model_in_flight[ticket.model]
+        else:
+            lane.waiters.remove(ticket)
+        self._dispatch(lane)
+
+    def stats(self) -> dict:
+        return {
+            provider: {
+                "in_flight": lane.in_flight,
+                "queued": len(lane.waiters),
+                "admitted": lane.admitted,
+                "rejected": lane.rejected,
+                "avg_wait_ms": round(lane.wait_total / lane.admitted * 1000, 1)
+                if lane.admitted
+                else 0.0,
+            }
+            for provider, lane in self._lanes.items()
+        }
+
+    def _lane(self, provider: str) -> _ProviderLane:
+        lane = self._lanes.get(provider)
+        if lane is None:
+            if provider == "ollama":
+                # 로컬 Ollama는 GPU 하나를 나눠 쓰므로 동시 실행을 작게 유지
+                lane = _ProviderLane(
+                    OLLAMA_MAX_IN_FLIGHT,
+                    OLLAMA_MODEL_MAX_IN_FLIGHT,
+                    self.max_queue,
+                    PROVIDER_RPM.get(provider, 0),
+                )
+            else:
+                lane = _ProviderLane(
+                    CLOUD_MAX_IN_FLIGHT,
+                    CLOUD_MAX_IN_FLIGHT,
+                    self.max_queue,
+                    PROVIDER_RPM.get(provider, 0),
+                )
+            self._lanes[provider] = lane
+        return lane
+
+    def _dispatch(self, lane: _ProviderLane):
+        for ticket in list(lane.waiters):
+            if lane.in_flight >= lane.max_in_flight:
+                break
+            if lane.model_in_flight[ticket.model] >= lane.model_max_in_flight:
+                continue
+            if lane.bucket is not None and not lane.bucket.try_take():
+                self._schedule_wakeup(lane, lane.bucket.wait_time())
+                break
+            lane.waiters.remove(ticket)
+            self._admit(lane, ticket)
+
+        for position, ticket in enumerate(lane.waiters, start=1):
+            if ticket.position != position:
+                ticket.position = position
+                ticket._notify()
+
+    def _admit(self, lane: _ProviderLane, ticket: Ticket):
+        ticket.admitted = True
+        ticket.position = 0
+        lane.in_flight += 1
+        lane.model_in_flight[ticket.model] += 1
+        lane.admitted += 1
+        lane.wait_total += time.monotonic() - ticket.enqueued_at
+        ticket._notify()
+
+    def _schedule_wakeup(self, lane: _ProviderLane, delay: float):
+        if lane.wakeup is not None:
+            return
+
+        def wakeup():
+            lane.wakeup = None
+            self._dispatch(lane)
+
+        lane.wakeup = asyncio.get_running_loop().call_later(delay, wakeup)
+
+
+class ScheduledLLMService(BaseLLMService):
+    """스케줄러에서 입장 허가를 받은 뒤에만 provider 스트림을 여는 래퍼"""
+
+    def __init__(
+        self,
+        inner: BaseLLMService,
+        provider: str,
+        scheduler: AdmissionScheduler | None = None,
+    ):
+        self.inner = inner
+        self.provider = provider
+        self.scheduler = scheduler or admission_scheduler
+
+    async def stream(self, message: Prompt, model: str) -> AsyncGenerator[str, None]:
+        async for item in self.stream_events(message, model):
+            if isinstance(item, str):
+                yield item
+
+    async def stream_events(
+        self, message: Prompt, model: str
+    ) -> AsyncGenerator[str | QueuePosition, None]:
+        ticket = self.scheduler.enqueue(self.provider, model)
+        try:
+            reported = 0
+            while not ticket.admitted:
+                if ticket.position != reported:
+                    reported = ticket.position
+                    yield QueuePosition(reported)
+                await ticket.wait()
+            # 대기열 시간을 뺀 provider 자체의 첫 토큰 지연을 기록
+            started = time.monotonic()
+            first = True
+            try:
+                async for chunk in self.inner.stream(message, model):
+                    if first:
+                        latency_tracker.record_first_token(
+                            self.provider, time.monotonic() - started
+                        )
+                        first = False
+                    yield chunk
+            except Exception:
+                latency_tracker.record_failure(self.provider)
+                raise
+            latency_tracker.record_success(self.provider)
+        finally:
+            # 대기 중 연결이 끊기면 대기열에서 빠지고, 스트림이 끝나면 슬롯 반환
+            self.scheduler.release(ticket)
+
+
+admission_scheduler = AdmissionScheduler()
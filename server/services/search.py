@@ -0,0 +1,284 @@
+"""SQLite FTS5 기반 채팅 기록 검색
+
+chats_fts는 chats.title의 사본을 rowid로 연결해 보관한다. messages_fts는 원문을
+저장하지 않는 contentless 색인(content='')이라 메시지 본문이 DB에 두 번 들어가지
+않고, cold storage가 content를 압축하면 그만큼 DB가 실제로 줄어든다. 트리거가
+INSERT/UPDATE/DELETE 때마다 증분 갱신하며, 스트리밍 중인(status="streaming")
+메시지는 완료될 때 한 번만 색인한다. contentless 색인에서 지우려면 색인했던
+원문이 필요하므로 트리거는 message_text(content) SQL 함수(database.py)로 압축된
+content를 풀어 넘긴다. 메시지 snippet은 결과 페이지의 원문으로 Python에서 만든다.
+
+기존 DB 색인 재구성:
+
+    cd server && python -m services.search rebuild
+"""
+
+import argparse
+import asyncio
+import re
+import unicodedata
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from database import engine, init_db
+from services.cold_storage import cold_storage
+
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+SNIPPET_TOKENS = 16
+SNIPPET_ELLIPSIS = "…"
+# unicode61 tokenizer와 같이 문자/숫자 연속을 토큰으로 봄
+_TOKEN = re.compile(r"[^\W_]+")
+
+SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts
+    USING fts5(content, content='', tokenize='unicode61 remove_diacritics 2')
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS chats_fts
+    USING fts5(title, tokenize='unicode61 remove_diacritics 2')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages
+    WHEN new.status != 'streaming'
+    BEGIN
+        INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, message_text(new.content));
+    END
+    """,
+    # 색인 대상은 status != 'streaming'인 행, 색인 내용은 원문.
+    # cold storage의 압축(text -> blob)은 원문이 같으므로 색인을 건드리지 않음
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content, status ON messages
+    BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content)
+        SELECT 'delete', old.rowid, message_text(old.content)
+        WHERE old.status != 'streaming'
+          AND (new.status = 'streaming' OR typeof(new.content) = 'text');
+        INSERT INTO messages_fts(rowid, content)
+        SELECT new.rowid, message_text(new.content)
+        WHERE new.status != 'streaming'
+          AND (old.status = 'streaming' OR typeof(new.content) = 'text');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages
+    WHEN old.status != 'streaming'
+    BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content)
+        VALUES ('delete', old.rowid, message_text(old.content));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chats_fts_insert AFTER INSERT ON chats
+    BEGIN
+        INSERT INTO chats_fts(rowid, title) VALUES (new.rowid, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chats_fts_update AFTER UPDATE OF title ON chats
+    BEGIN
+        DELETE FROM chats_fts WHERE rowid = old.rowid;
+        INSERT INTO chats_fts(rowid, title) VALUES (new.rowid, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chats_fts_delete AFTER DELETE ON chats
+    BEGIN
+        DELETE FROM chats_fts WHERE rowid = old.rowid;
+    END
+    """,
+]
+
+_SCHEMA_NAME = re.compile(r"CREATE (TRIGGER|VIRTUAL TABLE) IF NOT EXISTS (\w+)")
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.replace("IF NOT EXISTS ", "").split())
+
+
+async def _drop_changed_schema(conn: AsyncConnection) -> bool:
+    """정의가 SCHEMA와 달라진 FTS 테이블/트리거 삭제, 테이블을 지웠으면 True
+
+    IF NOT EXISTS는 기존 정의를 바꾸지 않으므로 직접 비교한다. 예전 DB의
+    messages_fts(원문 사본을 갖는 일반 FTS 테이블)도 여기서 contentless로 바뀐다.
+    """
+    result = await conn.execute(text("SELECT name, sql FROM sqlite_master WHERE sql IS NOT NULL"))
+    existing = {name: _normalize(sql) for name, sql in result}
+    dropped = False
+    for statement in SCHEMA:
+        match = _SCHEMA_NAME.search(statement)
+        kind, name = match[1], match[2]
+        if existing.get(name, _normalize(statement)) == _normalize(statement):
+            continue
+        if kind == "TRIGGER":
+            await conn.execute(text(f"DROP TRIGGER {name}"))
+        else:
+            await conn.execute(text(f"DROP TABLE {name}"))
+            dropped = True
+    return dropped
+
+
+async def init_search_index():
+    """FTS 테이블과 트리거 생성 (새로 만들었으면 기존 데이터로 색인 채움)"""
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'")
+        )
+        exists = result.first() is not None
+        if await _drop_changed_schema(conn):
+            exists = False
+        for statement in SCHEMA:
+            await conn.execute(text(statement))
+        if not exists:
+            await rebuild_search_index(conn)
+
+
+async def rebuild_search_index(conn: AsyncConnection):
+    """FTS 색인을 messages/chats 테이블 기준으로 전체 재구성"""
+    await conn.execute(text("INSERT INTO messages_fts(messages_fts) VALUES ('delete-all')"))
+    await conn.execute(text("DELETE FROM chats_fts"))
+    await conn.execute(
+        text(
+            "INSERT INTO messages_fts(rowid, content) "
+            "SELECT rowid, message_text(content) FROM messages WHERE status != 'streaming'"
+        )
+    )
+    await conn.execute(
+        text("INSERT INTO chats_fts(rowid, title) SELECT rowid, title FROM chats")
+    )
+    await conn.execute(text("INSERT INTO messages_fts(messages_fts) VALUES ('optimize')"))
+    await conn.execute(text("INSERT INTO chats_fts(chats_fts) VALUES ('optimize')"))
+
+
+def build_match_query(q: str) -> str:
+    """사용자 입력을 FTS5 MATCH 식으로 변환 (단어별 prefix 검색, AND 결합)"""
+    terms = [term.replace('"', '""') for term in q.split()]
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+
+def _fold(token: str) -> str:
+    """unicode61 remove_diacritics처럼 대소문자/발음 구별 기호를 무시한 비교용 형태"""
+    decomposed = unicodedata.normalize("NFKD", token.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return unicodedata.normalize("NFC", stripped)
+
+
+def make_snippet(content: str, q: str, tokens: int = SNIPPET_TOKENS) -> str:
+    """FTS5 snippet()과 같은 형식으로 첫 일치 주변 tokens개 토큰을 잘라 표시"""
+    prefixes = tuple(_fold(t) for t in _TOKEN.findall(q))
+    matches = list(_TOKEN.finditer(content))
+    if not matches:
+        return content[:200]
+    hits = {i for i, m in enumerate(matches) if prefixes and _fold(m[0]).startswith(prefixes)}
+    first = min(hits, default=0)
+    start = max(min(first - tokens // 4, len(matches) - tokens), 0)
+    end = min(start + tokens, len(matches))
+
+    parts = [SNIPPET_ELLIPSIS] if start > 0 else []
+    position = matches[start].start()
+    for i in range(start, end):
+        m = matches[i]
+        parts.append(content[position : m.start()])
+        if i in hits:
+            parts.append(SNIPPET_OPEN + m[0] + SNIPPET_CLOSE)
+        else:
+            parts.append(m[0])
+        position = m.end()
+    if end < len(matches):
+        parts.append(SNIPPET_ELLIPSIS)
+    else:
+        parts.append(content[position:])
+    return "".join(parts)
+
+
+async def search(
+    conn: AsyncConnection,
+    q: str,
+    chat_id: str | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[dict]:
+    """채팅 제목과 메시지 내용 검색
+
+    bm25 점수는 색인마다 말뭉치 통계가 달라 서로 비교할 수 없으므로 섞지 않는다.
+    제목이 일치한 채팅을 먼저, 그 뒤에 메시지를 두고 각각 자기 색인의 bm25 순으로
+    정렬한다.
+    """
+    match = build_match_query(q)
+    if not match:
+        return []
+
+    chat_filter = "AND c.id = :chat_id" if chat_id else ""
+    query = text(
+        f"""
+        SELECT * FROM (
+            SELECT c.id AS chat_id, c.title AS chat_title, m.id AS message_id,
+                   m.role AS role, m.rowid AS message_rowid, NULL AS snippet,
+                   bm25(messages_fts) AS rank, 1 AS source
+            FROM messages_fts
+            JOIN messages m ON m.rowid = messages_fts.rowid
+            JOIN chats c ON c.id = m.chat_id
+            WHERE messages_fts MATCH :match {chat_filter}
+            UNION ALL
+            SELECT c.id, c.title, NULL, NULL, NULL,
+                   snippet(chats_fts, 0, :open, :close, :ellipsis, :tokens),
+                   bm25(chats_fts), 0
+            FROM chats_fts
+            JOIN chats c ON c.rowid = chats_fts.rowid
+            WHERE chats_fts MATCH :match {chat_filter}
+        )
+        ORDER BY source, rank
+        LIMIT :limit OFFSET :offset
+        """
+    )
+    result = await conn.execute(
+        query,
+        {
+            "match": match,
+            "chat_id": chat_id,
+            "open": SNIPPET_OPEN,
+            "close": SNIPPET_CLOSE,
+            "ellipsis": SNIPPET_ELLIPSIS,
+            "tokens": SNIPPET_TOKENS,
+            "limit": limit,
+            "offset": offset,
+        },
+    )
+    rows = [dict(row) for row in result.mappings()]
+
+    # contentless 색인에는 원문이 없으므로 결과 페이지의 메시지만 읽어 snippet 생성
+    rowids = [row["message_rowid"] for row in rows if row["message_rowid"] is not None]
+    contents = {}
+    if rowids:
+        result = await conn.execute(
+            text(
+                "SELECT rowid, message_text(content) FROM messages WHERE rowid IN :rowids"
+            ).bindparams(bindparam("rowids", expanding=True)),
+            {"rowids": rowids},
+        )
+        contents = dict(result.all())
+    for row in rows:
+        del row["source"]
+        rowid = row.pop("message_rowid")
+        if rowid is not None:
+            row["snippet"] = make_snippet(contents.get(rowid) or "", q)
+    return rows
+
+
+async def _rebuild():
+    await init_db()
+    await cold_storage.load()
+    await init_search_index()
+    async with engine.begin() as conn:
+        await rebuild_search_index(conn)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="채팅 검색 색인 관리")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    asyncio.run(_rebuild())
+    print("Search index rebuilt")
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """세션과 분리된 Settings 행의 읽기 전용 사본"""
+
+    openai_api_key: str | None = None
+    anthropic_api_key: str | None = None
+    google_api_key: str | None = None
+    groq_api_key: str | None = None
+    default_model: str | None = "gemma3:1b"
+    pinned_models: tuple[str, ...] = ()
+
+    @classmethod
+    def from_row(cls, settings: Settings) -> "SettingsSnapshot":
+        return cls(
+            openai_api_key=settings.openai_api_key,
+            anthropic_api_key=settings.anthropic_api_key,
+            google_api_key=settings.google_api_key,
+            groq_api_key=settings.groq_api_key,
+            default_model=settings.default_model,
+            pinned_models=tuple(json.loads(settings.pinned_models or "[]")),
+        )
+
+    def api_key_for(self, provider: str) -> str | None:
+        key_map = {
+            "openai": self.openai_api_key,
+            "anthropic": self.anthropic_api_key,
+            "google": self.google_api_key,
+            "groq": self.groq_api_key,
+        }
+        return key_map.get(provider)
+
+
+class SettingsCache:
+    """Settings 행(id=1)을 한 번 읽어 메모리에서 제공하는 캐시
+
+    PATCH /api/settings는 commit 후 update()로 write-through 한다.
+    version은 변경마다 증가하며, 다른 워커에서 받은 version으로
+    invalidate()를 호출하면 다음 조회 때 DB에서 다시 읽는다.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._snapshot: SettingsSnapshot | None = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._listeners: list[Callable[[int], None]] = []
+
+    async def get(self, db: AsyncSession) -> SettingsSnapshot | None:
+        """캐시된 설정 반환 (최초 1회만 DB 조회)"""
+        if self._loaded:
+            return self._snapshot
+
+        async with self._lock:
+            if not self._loaded:
+                result = await db.execute(select(Settings).where(Settings.id == 1))
+                settings = result.scalar_one_or_none()
+                self._snapshot = SettingsSnapshot.from_row(settings) if settings else None
+                self._loaded = True
+        return self._snapshot
+
+    def update(self, settings: Settings):
+        """commit된 Settings 행으로 캐시 갱신 (write-through)"""
+        self._snapshot = SettingsSnapshot.from_row(settings)
+        self._loaded = True
+        self.version += 1
+        self._notify()
+
+    def invalidate(self, version: int | None = None):
+        """캐시 무효화 hook
+
+        version이 주어지면 현재 버전보다 새로운 경우에만 무효화한다.
+        """
+        if version is not None:
+            if version <= self.version:
+                return
+            self.version = version
+        else:
+            self.version += 1
+        self._snapshot = None
+        self._loaded = False
+        self._notify()
+
+    def subscribe(self, listener: Callable[[int], None]):
+        """설정 변경 시 새 version을 받을 listener 등록"""
+        self._listeners.append(listener)
+
+    def _notify(self):
+        for listener in self._listeners:
+            try:
+                listener(self.version)
+            except Exception as e:
+                logger.warning(f"Settings cache listener failed: {e}")
+
+
+settings_cache = SettingsCache()
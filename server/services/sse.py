@@ -0,0 +1,153 @@
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+
+from config import SSE_COALESCE_BYTES, SSE_COALESCE_WINDOW
+
+try:
+    import orjson
+except ImportError:  # PyPy 등 orjson이 없는 환경
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+FRAMING_HEADER = "X-Stream-Framing"
+_END = object()
+
+
+def dumps(data) -> bytes:
+    """SSE frame용 JSON 인코딩 (orjson이 있으면 사용)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class StreamFramer:
+    """LLM chunk를 모아 SSE frame으로 인코딩
+
+    작은 chunk는 coalesce_bytes에 도달하거나 window 시간이 지나면 한 frame으로
+    합쳐 보낸다. framing="raw"면 JSON 대신 텍스트를 그대로 data 줄에 싣는다
+    (여러 줄이면 SSE 규칙대로 data 줄을 나누며, 클라이언트는 줄바꿈으로 합친다).
+    """
+
+    def __init__(
+        self,
+        framing: str = "json",
+        coalesce_bytes: int = SSE_COALESCE_BYTES,
+        window: float = SSE_COALESCE_WINDOW,
+        on_token: Callable[[], None] | None = None,
+    ):
+        self.raw = framing == "raw"
+        self.coalesce_bytes = coalesce_bytes
+        self.window = window
+        # upstream chunk가 도착할 때마다 호출 (병합 전 토큰 타이밍 계측용)
+        self.on_token = on_token
+        self.tokens = 0
+        self.frames = 0
+        self.bytes = 0
+        self._started = time.perf_counter()
+
+    async def coalesce(self, chunks: AsyncIterator) -> AsyncIterator:
+        """upstream chunk를 크기/시간 기준으로 병합 (upstream 예외는 그대로 전달)
+
+        문자열이 아닌 항목(대기열 위치 등)은 병합하지 않고 그대로 전달한다.
+        """
+        if self.coalesce_bytes <= 0:
+            async for chunk in chunks:
+                if isinstance(chunk, str):
+                    self._count_token()
+                yield chunk
+            return
+
+        # upstream을 별도 task로 읽어야 chunk가 끊겨도 window가 지나면 flush 가능
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for chunk in chunks:
+                    await queue.put(chunk)
+                await queue.put(_END)
+            except Exception as e:
+                await queue.put(e)
+
+        pump_task = asyncio.create_task(pump())
+        buffer: list[str] = []
+        size = 0
+        deadline = 0.0
+        try:
+            while True:
+                timeout = None
+                if buffer:
+                    timeout = max(deadline - time.perf_counter(), 0)
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+                    continue
+
+                if item is _END or isinstance(item, Exception):
+                    if buffer:
+                        yield "".join(buffer)
+                    if item is _END:
+                        return
+                    raise item
+
+                if not isinstance(item, str):
+                    if buffer:
+                        yield "".join(buffer)
+                        buffer, size = [], 0
+                    yield item
+                    continue
+
+                self._count_token()
+                if not buffer:
+                    deadline = time.perf_counter() + self.window
+                buffer.append(item)
+                size += len(item.encode())
+                if size >= self.coalesce_bytes:
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+        finally:
+            pump_task.cancel()
+            # 연결 종료 시 upstream(LLM 스트림)도 정리
+            await asyncio.gather(pump_task, return_exceptions=True)
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+
+    def content(self, text: str) -> bytes:
+        if self.raw:
+            data = "".join(f"data: {line}\n" for line in text.split("\n"))
+            return self._frame(data.encode() + b"\n")
+        return self._frame(b"data: " + dumps({"content": text}) + b"\n\n")
+
+    def event(self, name: str, data: dict) -> bytes:
+        return self._frame(f"event: {name}\n".encode() + b"data: " + dumps(data) + b"\n\n")
+
+    def done(self) -> bytes:
+        return self._frame(b"data: [DONE]\n\n")
+
+    def report(self) -> dict:
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        return {
+            "frames": self.frames,
+            "tokens": self.tokens,
+            "bytes": self.bytes,
+            "frames_per_sec": round(self.frames / elapsed, 1),
+            "bytes_per_token": round(self.bytes / self.tokens, 1) if self.tokens else 0.0,
+        }
+
+    def log_report(self):
+        logger.info(f"SSE stream stats: {self.report()}")
+
+    def _count_token(self):
+        self.tokens += 1
+        if self.on_token is not None:
+            self.on_token()
+
+    def _frame(self, frame: bytes) -> bytes:
+        self.frames += 1
+        self.bytes += len(frame)
+        return frame
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+DISCONNECT_POLL_INTERVAL = 0.5
+
+_END = object()
+
+
+@dataclass
+class ActiveStream:
+    """진행 중인 LLM 스트림의 취소 핸들"""
+
+    key: str
+    cancelled: asyncio.Event = field(default_factory=asyncio.Event)
+    reason: str | None = None  # "disconnect" | "user" | "deleted"
+
+    def cancel(self, reason: str):
+        if not self.cancelled.is_set():
+            self.reason = reason
+            self.cancelled.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+    async def guard(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """취소되면 upstream 대기를 끊고 generator를 닫아 provider 연결까지 정리
+
+        provider generator는 한 task(_pump)에서만 진행하고 닫는다 (LangChain/httpx
+        스트림은 연 task에서 닫혀야 함). 취소하면 그 task를 cancel한다.
+        """
+        # 한 chunk만 미리 읽어 provider 쪽 흐름 제어를 유지
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        pump = asyncio.create_task(self._pump(chunks, queue))
+        waiter = asyncio.create_task(self.cancelled.wait())
+        try:
+            while True:
+                next_item = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    {next_item, waiter}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_item not in done:
+                    next_item.cancel()
+                    return
+                item = next_item.result()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            waiter.cancel()
+            pump.cancel()
+            await asyncio.gather(pump, return_exceptions=True)
+
+    @staticmethod
+    async def _pump(chunks: AsyncIterator[str], queue: asyncio.Queue):
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+            await queue.put(_END)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await chunks.aclose()
+
+
+class StreamRegistry:
+    """채팅별 진행 중인 스트림과 취소 통계"""
+
+    def __init__(self):
+        self._streams: dict[str, ActiveStream] = {}
+        self.completed_streams = 0
+        self.completed_tokens = 0
+        self.cancelled = Counter()
+        self.tokens_before_cancel = 0
+        self.estimated_tokens_saved = 0
+        # 마지막으로 스트림이 시작/종료된 시각 (monotonic, DB 유지보수의 유휴 판단용)
+        self.last_activity = time.monotonic()
+
+    def register(self, key: str) -> ActiveStream:
+        stream = ActiveStream(key)
+        self._streams[key] = stream
+        self.last_activity = time.monotonic()
+        return stream
+
+    def get(self, key: str) -> ActiveStream | None:
+        return self._streams.get(key)
+
+    def cancel(self, key: str, reason: str = "user") -> bool:
+        stream = self._streams.get(key)
+        if stream is None:
+            return False
+        stream.cancel(reason)
+        return True
+
+    def finish(self, stream: ActiveStream, tokens: int):
+        """스트림 종료 기록 (취소된 경우 평균 응답 길이로 절약한 토큰 추정)"""
+        if self._streams.get(stream.key) is stream:
+            del self._streams[stream.key]
+        self.last_activity = time.monotonic()
+
+        if not stream.is_cancelled:
+            self.completed_streams += 1
+            self.completed_tokens += tokens
+            return
+
+        self.cancelled[stream.reason] += 1
+        self.tokens_before_cancel += tokens
+        if self.completed_streams:
+            average = self.completed_tokens / self.completed_streams
+            self.estimated_tokens_saved += max(int(average) - tokens, 0)
+        logger.info(
+            f"Stream {stream.key} cancelled ({stream.reason}) after {tokens} chunks, "
+            f"estimated tokens saved so far: {self.estimated_tokens_saved}"
+        )
+
+    def idle_for(self) -> float:
+        """진행 중인 스트림이 없으면 마지막 활동 후 경과 시간 (초), 있으면 0"""
+        if self._streams:
+            return 0.0
+        return time.monotonic() - self.last_activity
+
+    def stats(self) -> dict:
+        return {
+            "active_streams": len(self._streams),
+            "completed_streams": self.completed_streams,
+            "cancelled_streams": dict(self.cancelled),
+            "tokens_before_cancel": self.tokens_before_cancel,
+            "estimated_tokens_saved": self.estimated_tokens_saved,
+        }
+
+
+async def watch_disconnect(
+    request: Request, stream: ActiveStream, interval: float = DISCONNECT_POLL_INTERVAL
+):
+    """클라이언트 연결이 끊기면 스트림 취소 (토큰이 오지 않는 동안에도 감지)"""
+    while not stream.is_cancelled:
+        if await request.is_disconnected():
+            stream.cancel("disconnect")
+            return
+        await asyncio.sleep(interval)
+
+
+stream_registry = StreamRegistry()
@@ -0,0 +1,49 @@
+import asyncio
+import importlib
+import logging
+import time
+
+from config import STARTUP_PRELOAD
+
+logger = logging.getLogger(__name__)
+
+# 첫 채팅 요청에서 불러오게 될 무거운 모듈 (기본 provider인 Ollama 기준)
+PRELOAD_MODULES = ("langchain_core.messages", "langchain_ollama")
+
+
+class Warmup:
+    """서버가 요청을 받기 시작한 뒤 백그라운드에서 하는 준비 작업
+
+    LangChain은 처음 쓸 때 import하므로 시작은 빨라지지만 첫 응답이 그만큼
+    늦어진다. /health가 ok를 반환한 뒤 별도 스레드에서 미리 import해 둔다.
+    """
+
+    def __init__(self, enabled: bool = STARTUP_PRELOAD):
+        self.enabled = enabled
+        self.status = "pending" if enabled else "disabled"
+        self.seconds: float | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        self.status = "running"
+        started = time.perf_counter()
+        for module in PRELOAD_MODULES:
+            try:
+                await asyncio.to_thread(importlib.import_module, module)
+            except ImportError as e:
+                logger.warning(f"Failed to preload {module}: {e}")
+        self.seconds = round(time.perf_counter() - started, 3)
+        self.status = "done"
+        logger.info(f"Warm-up finished in {self.seconds}s")
+
+
+warmup = Warmup()
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import bindparam, insert, update
+
+from config import WRITE_QUEUE_FLUSH_INTERVAL, WRITE_QUEUE_MAX_BATCH
+from database import async_session
+from models.chat import Chat, Message
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriteQueue:
+    """메시지 INSERT/append를 모아서 처리하는 write-behind 큐
+
+    스트리밍 응답은 enqueue()/append()로 넘긴다. 워커가 여러 채팅의 쓰기를 모아
+    하나의 트랜잭션으로 저장하므로 스트리밍 동안 DB 세션을 붙잡고 있지 않는다.
+    반환되는 Future는 해당 쓰기가 commit되면 완료된다.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = WRITE_QUEUE_MAX_BATCH,
+        flush_interval: float = WRITE_QUEUE_FLUSH_INTERVAL,
+    ):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[tuple[str, dict, asyncio.Future]] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def enqueue(self, message: dict) -> asyncio.Future:
+        """Message 컬럼 값 dict를 INSERT 대기열에 추가"""
+        message.setdefault("created_at", datetime.utcnow())
+        return self._put("insert", message)
+
+    def append(self, message_id: str, content: str, status: str) -> asyncio.Future:
+        """기존 메시지 content 뒤에 이어 붙이고 status 갱신"""
+        return self._put(
+            "append", {"b_id": message_id, "b_content": content, "b_status": status}
+        )
+
+    def _put(self, op: str, values: dict) -> asyncio.Future:
+        saved = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((op, values, saved))
+        self.start()
+        return saved
+
+    async def flush(self):
+        """대기 중인 메시지가 모두 저장될 때까지 대기"""
+        if self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def close(self):
+        """남은 메시지를 저장하고 워커 종료 (서버 종료 시)"""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # 짧게 기다려 동시에 끝난 스트림의 메시지를 함께 모음
+            await asyncio.sleep(self.flush_interval)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._write(batch)
+                for _, _, saved in batch:
+                    _resolve(saved)
+            except Exception as e:
+                logger.error(f"Batch message write failed, retrying one by one: {e}")
+                for item in batch:
+                    try:
+                        await self._write([item])
+                        _resolve(item[2])
+                    except Exception as err:
+                        logger.error(f"Failed to save message write ({item[0]}): {err}")
+                        _resolve(item[2], err)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: list[tuple[str, dict, asyncio.Future]]):
+        # append는 항상 같은 메시지의 insert 뒤에 들어오므로 insert를 먼저 실행
+        inserts = [values for op, values, _ in batch if op == "insert"]
+        appends = [values for op, values, _ in batch if op == "append"]
+        async with async_session() as session:
+            async with session.begin():
+                if inserts:
+                    await session.execute(insert(Message), inserts)
+                    await session.execute(
+                        update(Chat)
+                        .where(Chat.id.in_({values["chat_id"] for values in inserts}))
+                        .values(updated_at=datetime.utcnow())
+                    )
+                if appends:
+                    # 여러 행 UPDATE는 ORM bulk update 대신 Core executemany로 실행
+                    messages = Message.__table__
+                    conn = await session.connection()
+                    await conn.execute(
+                        update(messages)
+                        .where(messages.c.id == bindparam("b_id"))
+                        .values(
+                            content=messages.c.content + bindparam("b_content"),
+                            status=bindparam("b_status"),
+                        ),
+                        appends,
+                    )
+
+
+def _resolve(saved: asyncio.Future, error: Exception | None = None):
+    if saved.done():
+        return
+    if error is None:
+        saved.set_result(None)
+    else:
+        saved.set_exception(error)
+
+
+message_queue = MessageWriteQueue()
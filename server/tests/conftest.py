@@ -0,0 +1,30 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# 앱 모듈이 import 시점에 설정을 읽으므로 먼저 임시 경로를 지정 (실제 DB를 건드리지 않도록)
+_tmp = tempfile.mkdtemp(prefix="otemee-tests-")
+os.environ["OTEMEE_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/chats.db"
+os.environ["OTEMEE_RESPONSE_CACHE_PATH"] = f"{_tmp}/response_cache.db"
+os.environ["OTEMEE_MEMORY_INDEX_DIR"] = f"{_tmp}/memory_index"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def chat_id() -> str:
+    """테스트마다 새 채팅 하나 (임시 DB 스키마도 이때 만듦)"""
+    from database import async_session, init_db
+    from models.chat import Chat
+
+    await init_db()
+    chat_id = str(uuid.uuid4())
+    async with async_session() as session:
+        session.add(Chat(id=chat_id, title="test"))
+        await session.commit()
+    return chat_id
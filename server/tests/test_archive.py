@@ -0,0 +1,81 @@
+import gzip
+import json
+
+import pytest
+from sqlalchemy import delete, select
+
+from database import async_session
+from models.chat import Chat, Message
+from services.archive import export_archive, import_archive
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunked(data: bytes, size: int = 7):
+    # 줄/압축 블록 경계가 chunk 중간에 걸리도록 잘게 나눔
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+async def export_bytes() -> bytes:
+    return b"".join([chunk async for chunk in export_archive()])
+
+
+async def test_export_import_round_trip(chat_id):
+    async with async_session() as session:
+        session.add_all(
+            [
+                Message(id=f"{chat_id}-1", chat_id=chat_id, role="user", content="안녕"),
+                Message(id=f"{chat_id}-2", chat_id=chat_id, role="assistant", content="hi\nthere"),
+            ]
+        )
+        await session.commit()
+
+    archive = await export_bytes()
+    lines = [json.loads(line) for line in gzip.decompress(archive).splitlines()]
+    assert lines[0]["type"] == "header"
+    assert any(line["type"] == "chat" and line["id"] == chat_id for line in lines)
+
+    # 같은 DB에 다시 가져오면 전부 건너뜀
+    stats = await import_archive(chunked(archive))
+    assert stats.chats_imported == 0 and stats.messages_imported == 0
+    assert stats.chats_skipped >= 1 and stats.messages_skipped >= 2
+
+    async with async_session() as session:
+        await session.execute(delete(Message).where(Message.chat_id == chat_id))
+        await session.execute(delete(Chat).where(Chat.id == chat_id))
+        await session.commit()
+
+    stats = await import_archive(chunked(archive))
+    assert stats.chats_imported == 1
+    assert stats.messages_imported == 2
+    async with async_session() as session:
+        contents = (
+            await session.execute(
+                select(Message.content).where(Message.chat_id == chat_id).order_by(Message.id)
+            )
+        ).scalars().all()
+    assert contents == ["안녕", "hi\nthere"]
+
+
+async def test_plain_ndjson_and_orphan_messages(chat_id):
+    lines = [
+        {"type": "header", "format": "otemee-archive", "version": 1},
+        {"type": "message", "id": "orphan", "chat_id": "missing", "role": "user", "content": "x"},
+        {"type": "message", "id": f"{chat_id}-plain", "chat_id": chat_id, "role": "user", "content": "y"},
+    ]
+    data = b"\n".join(json.dumps(line).encode() for line in lines)
+    stats = await import_archive(chunked(data))
+    # chat이 없는 message는 FK 오류 없이 건너뜀
+    assert stats.messages_imported == 1
+    assert stats.messages_skipped == 1
+
+
+async def test_rejects_unknown_or_broken_archives():
+    with pytest.raises(ValueError, match="Unknown archive format"):
+        await import_archive(chunked(b'{"type": "header", "format": "other"}\n'))
+    with pytest.raises(ValueError, match="line 2"):
+        await import_archive(chunked(b'{"type": "header", "format": "otemee-archive"}\nnot json\n'))
+    truncated = gzip.compress(b'{"type": "header", "format": "otemee-archive"}\n')[:-8]
+    with pytest.raises(ValueError, match="Truncated"):
+        await import_archive(chunked(truncated))
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+import routers.batch
+from database import init_db
+from services.batch import JobTarget
+from services.context import estimate_tokens
+from services.llm import BaseLLMService
+
+pytestmark = pytest.mark.anyio
+
+
+class EchoLLM(BaseLLMService):
+    def __init__(self, fail_on: str | None = None):
+        self.fail_on = fail_on
+        self.prompts = []
+
+    async def stream(self, message, model):
+        self.prompts.append(message)
+        if message == self.fail_on:
+            raise RuntimeError("model failed")
+        yield f"{model} says "
+        yield message
+
+
+@pytest.fixture
+def services() -> dict[str, EchoLLM]:
+    return {"good": EchoLLM(), "flaky": EchoLLM(fail_on="second")}
+
+
+@pytest.fixture
+async def client(monkeypatch, services):
+    await init_db()
+
+    async def build_targets(db, models):
+        return {model: JobTarget("fake", service=services[model]) for model in models}
+
+    monkeypatch.setattr(routers.batch, "build_targets", build_targets)
+    app = FastAPI()
+    app.include_router(routers.batch.router)
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as client:
+        yield client
+
+
+async def post_lines(client, url: str, **kwargs) -> list[dict]:
+    response = await client.post(url, **kwargs)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_run_then_resume_only_reruns_unfinished_jobs(client, services):
+    lines = await post_lines(
+        client, "/api/batch", json={"prompts": ["first", "second"], "models": ["good", "flaky"]}
+    )
+    batch_id = lines[0]["batch_id"]
+    jobs = {(job["prompt_index"], job["model"]): job for job in lines[1:-1]}
+    assert len(jobs) == 4
+    assert lines[-1]["status"] == "partial"
+    assert lines[-1]["failed"] == 1
+
+    ok = jobs[(0, "good")]
+    assert ok["status"] == "complete"
+    assert ok["output"] == "good says first"
+    assert ok["tokens"] == estimate_tokens("good says first")
+    assert jobs[(1, "flaky")]["status"] == "error"
+    assert "model failed" in jobs[(1, "flaky")]["error"]
+
+    # 재개 시 완료된 작업은 다시 실행하지 않고 바로 내보냄
+    services["flaky"].fail_on = None
+    good_calls = len(services["good"].prompts)
+    lines = await post_lines(client, f"/api/batch/{batch_id}/resume")
+    resumed = [job for job in lines[1:-1] if job.get("resumed")]
+    assert len(resumed) == 3
+    assert len(services["good"].prompts) == good_calls
+    assert lines[-1]["status"] == "complete"
+
+    batch = (await client.get(f"/api/batch/{batch_id}")).json()
+    assert batch["status"] == "complete"
+    assert all(job["tokens"] for job in batch["jobs"])
+
+
+async def test_rejects_too_many_jobs(client, monkeypatch):
+    monkeypatch.setattr(routers.batch, "BATCH_MAX_JOBS", 1)
+    response = await client.post("/api/batch", json={"prompts": ["a", "b"], "models": ["good"]})
+    assert response.status_code == 400
@@ -0,0 +1,58 @@
+import pytest
+
+from database import async_session
+from models.chat import Message
+from services.checkpoint import ResponseCheckpointer, mark_interrupted_streams
+from services.write_queue import MessageWriteQueue
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def queue():
+    queue = MessageWriteQueue(flush_interval=0.01)
+    yield queue
+    await queue.close()
+
+
+async def load(message_id: str) -> Message:
+    async with async_session() as session:
+        return await session.get(Message, message_id)
+
+
+async def test_partial_response_is_saved_every_n_chunks(queue, chat_id):
+    checkpointer = ResponseCheckpointer(chat_id, queue, every_chunks=2, interval=3600)
+    checkpointer.begin()
+    for chunk in ["a", "b", "c"]:
+        checkpointer.add(chunk)
+    await queue.flush()
+
+    # 세 번째 chunk는 아직 다음 checkpoint를 기다림
+    saved = await load(checkpointer.message_id)
+    assert (saved.content, saved.status) == ("ab", "streaming")
+
+    await checkpointer.complete()
+    saved = await load(checkpointer.message_id)
+    assert (saved.content, saved.status) == ("abc", "complete")
+    assert checkpointer.abort() is None
+
+
+async def test_abort_keeps_what_was_streamed(queue, chat_id):
+    checkpointer = ResponseCheckpointer(chat_id, queue, every_chunks=100, interval=3600)
+    checkpointer.begin()
+    checkpointer.add("partial")
+    await checkpointer.abort()
+
+    saved = await load(checkpointer.message_id)
+    assert (saved.content, saved.status) == ("partial", "aborted")
+
+
+async def test_interrupted_streams_are_marked_aborted_on_startup(queue, chat_id):
+    checkpointer = ResponseCheckpointer(chat_id, queue, every_chunks=1, interval=3600)
+    checkpointer.begin()
+    checkpointer.add("cut off")
+    await queue.flush()
+
+    await mark_interrupted_streams()
+    saved = await load(checkpointer.message_id)
+    assert (saved.content, saved.status) == ("cut off", "aborted")
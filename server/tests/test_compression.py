@@ -0,0 +1,69 @@
+import pytest
+
+from services import compression
+
+TEXT = "안녕하세요, 오늘 날씨는 맑습니다. " * 20 + "The quick brown fox jumps over the lazy dog."
+DICTIONARY_ID = 7
+
+CODECS = [
+    pytest.param("zlib"),
+    pytest.param(
+        "zstd",
+        marks=pytest.mark.skipif(
+            not compression.available("zstd"), reason="zstandard not installed"
+        ),
+    ),
+]
+
+
+@pytest.fixture(autouse=True)
+def isolated_dictionaries(monkeypatch):
+    monkeypatch.setattr(compression, "dictionaries", {})
+    monkeypatch.setattr(compression, "_zstd_compressors", {})
+    monkeypatch.setattr(compression, "_zstd_decompressors", {})
+
+
+@pytest.fixture
+def dictionary():
+    compression.dictionaries[DICTIONARY_ID] = "오늘 날씨는 맑습니다. quick brown fox".encode()
+    return DICTIONARY_ID
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_round_trip_without_dictionary(codec):
+    blob = compression.compress(TEXT, codec)
+    assert compression.HEADER.unpack_from(blob) == (compression.CODECS[codec], 0)
+    assert len(blob) < len(TEXT.encode())
+    assert compression.decompress(blob) == TEXT
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_round_trip_with_dictionary(codec, dictionary):
+    blob = compression.compress(TEXT, codec, dictionary)
+    assert compression.HEADER.unpack_from(blob) == (compression.CODECS[codec], dictionary)
+    assert compression.decompress(blob) == TEXT
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_missing_dictionary_is_reported(codec, dictionary):
+    blob = compression.compress(TEXT, codec, dictionary)
+    del compression.dictionaries[dictionary]
+    with pytest.raises(LookupError):
+        compression.decompress(blob)
+
+
+def test_unknown_codec_is_rejected():
+    blob = compression.HEADER.pack(99, 0) + b"payload"
+    with pytest.raises(ValueError):
+        compression.decompress(blob)
+
+
+def test_zlib_dictionary_fits_window():
+    samples = [f"질문 {i}: 스트리밍 응답을 저장하는 방법" for i in range(200)]
+    trained = compression.train_dictionary("zlib", samples, 64 * 1024)
+    assert 0 < len(trained) <= compression.ZLIB_MAX_DICT
+
+    compression.dictionaries[1] = trained
+    blob = compression.compress(samples[0], "zlib", 1)
+    assert compression.decompress(blob) == samples[0]
+    assert len(blob) < len(compression.compress(samples[0], "zlib"))
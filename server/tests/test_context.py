@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from database import async_session
+from models.chat import ChatSummary, Message
+from services import context
+from services.context import SUMMARY_PROMPT, ContextBuilder, estimate_tokens
+from services.llm import BaseLLMService
+from services.streams import stream_registry
+
+pytestmark = pytest.mark.anyio
+
+MODEL = "budget-test"
+BASE = datetime(2025, 1, 1)
+# estimate_tokens 기준 14토큰 (ASCII 40자)
+CONTENT = "x" * 40
+
+
+class RecordingLLM(BaseLLMService):
+    def __init__(self):
+        self.prompts = []
+
+    async def stream(self, message, model):
+        self.prompts.append(message)
+        yield "summary"
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    def set_budget(tokens: int):
+        monkeypatch.setitem(context.MODEL_TOKEN_BUDGETS, MODEL, tokens)
+
+    return set_budget
+
+
+async def add_messages(chat_id: str, count: int) -> list[datetime]:
+    times = [BASE + timedelta(minutes=i) for i in range(count)]
+    async with async_session() as session:
+        session.add_all(
+            Message(
+                id=f"{chat_id}-{i}",
+                chat_id=chat_id,
+                role="user",
+                content=f"{i:02d}{CONTENT[2:]}",
+                created_at=at,
+            )
+            for i, at in enumerate(times)
+        )
+        await session.commit()
+    return times
+
+
+async def load_summary(chat_id: str) -> ChatSummary | None:
+    async with async_session() as session:
+        return await session.get(ChatSummary, chat_id)
+
+
+async def test_build_keeps_newest_messages_within_budget(chat_id, budget):
+    times = await add_messages(chat_id, 10)
+    # 질문 4토큰 + 메시지 6개(84토큰)까지
+    budget(4 + 6 * estimate_tokens(CONTENT) + 5)
+    builder = ContextBuilder()
+    llm = RecordingLLM()
+
+    async with async_session() as session:
+        messages = await builder.build(session, chat_id, "hi", MODEL, llm)
+
+    history = [m.content[:2] for m in messages[:-1]]
+    assert history == ["04", "05", "06", "07", "08", "09"]
+    assert messages[-1] == HumanMessage(content="hi")
+    # 밀려난 4개 중 가장 최신 메시지까지 요약 예약
+    assert builder._pending[chat_id] == (times[3], MODEL, llm)
+
+
+async def test_build_puts_summary_before_uncovered_history(chat_id, budget):
+    times = await add_messages(chat_id, 4)
+    async with async_session() as session:
+        session.add(ChatSummary(chat_id=chat_id, content="earlier", covered_until=times[1]))
+        await session.commit()
+    budget(1000)
+
+    async with async_session() as session:
+        messages = await ContextBuilder().build(session, chat_id, "hi", MODEL)
+
+    assert messages[0] == SystemMessage(content="이전 대화 요약:\nearlier")
+    assert [m.content[:2] for m in messages[1:-1]] == ["02", "03"]
+
+
+async def test_summary_transcript_is_capped_to_the_budget(chat_id, budget):
+    times = await add_messages(chat_id, 5)
+    line_cost = estimate_tokens(f"user: {CONTENT}")
+    budget(estimate_tokens(SUMMARY_PROMPT) + 2 * line_cost + 5)
+    llm = RecordingLLM()
+
+    await ContextBuilder()._summarize(chat_id, times[-1], MODEL, llm)
+
+    transcript = llm.prompts[0][1].content
+    assert transcript.count("user: ") == 2
+    summary = await load_summary(chat_id)
+    # 요약에 넣은 메시지까지만 covered로 표시
+    assert (summary.content, summary.covered_until) == ("summary", times[1])
+
+
+async def test_summary_skips_messages_when_budget_is_used_up(chat_id, budget):
+    times = await add_messages(chat_id, 3)
+    previous = "p" * 400
+    async with async_session() as session:
+        session.add(ChatSummary(chat_id=chat_id, content=previous, covered_until=BASE))
+        await session.commit()
+    budget(estimate_tokens(SUMMARY_PROMPT) + estimate_tokens(previous) - 1)
+    llm = RecordingLLM()
+
+    await ContextBuilder()._summarize(chat_id, times[-1], MODEL, llm)
+
+    assert llm.prompts == []
+    summary = await load_summary(chat_id)
+    assert (summary.content, summary.covered_until) == (previous, BASE)
+
+
+async def test_summary_does_not_wait_forever_for_idle(chat_id, budget, monkeypatch):
+    times = await add_messages(chat_id, 2)
+    budget(1000)
+    monkeypatch.setattr(context, "SUMMARY_MAX_DEFER", 0.05)
+    monkeypatch.setattr(context, "SUMMARY_IDLE_POLL", 0.01)
+    busy = stream_registry.register("another-chat")
+    try:
+        await ContextBuilder()._summarize(chat_id, times[-1], MODEL, RecordingLLM())
+    finally:
+        stream_registry.finish(busy, 0)
+
+    assert (await load_summary(chat_id)).covered_until == times[-1]
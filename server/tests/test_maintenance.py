@@ -0,0 +1,31 @@
+import pytest
+
+from database import init_db
+from services.maintenance import DatabaseMaintenance
+
+pytestmark = pytest.mark.anyio
+
+
+def test_writers_keep_the_database_busy():
+    maintenance = DatabaseMaintenance(enabled=False, idle_seconds=0)
+    assert maintenance.idle()
+    with maintenance.writing():
+        # idle_seconds=0이어도 쓰기 작업 중에는 유휴가 아님
+        assert maintenance.idle_for() == 0
+        assert not maintenance.idle()
+    assert maintenance.idle()
+
+
+async def test_full_vacuum_waits_for_writers():
+    await init_db()
+    maintenance = DatabaseMaintenance(enabled=False, idle_seconds=0)
+    maintenance.notify(vacuum=True)
+
+    with maintenance.writing():
+        await maintenance.run_once()
+    # 일괄 생성/가져오기 도중에는 요청을 남겨 두고 다음 실행으로 미룸
+    assert maintenance._vacuum_requested
+
+    await maintenance.run_once()
+    assert not maintenance._vacuum_requested
+    assert maintenance.runs == 2
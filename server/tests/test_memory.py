@@ -0,0 +1,65 @@
+import pytest
+
+import services.memory as memory
+from database import async_session
+from models.chat import Message
+from services.embeddings import StubEmbedder
+from services.memory import MemoryIndex, VectorIndex
+
+np = pytest.importorskip("numpy")
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def numpy_enabled(monkeypatch):
+    # OTEMEE_MEMORY를 켜지 않은 환경에서도 색인 코드를 실행
+    monkeypatch.setattr(memory, "np", np)
+
+
+async def open_index(directory) -> MemoryIndex:
+    index = MemoryIndex(directory=str(directory), enabled=True)
+    index.embedder = StubEmbedder(dim=64)
+    await index._open()
+    index._ready.set()
+    while await index.index_pending():
+        pass
+    return index
+
+
+def test_vector_index_ranks_by_cosine(tmp_path):
+    index = VectorIndex(tmp_path)
+    index.reset("stub:3", 3)
+    index.append(memory._normalize([[1, 0, 0], [0, 1, 0], [1, 1, 0]]))
+    results = index.search(np.array([1, 0, 0], dtype=np.float32), k=2)
+    assert [row for row, _ in results] == [0, 2]
+    assert results[0][1] == pytest.approx(1.0)
+
+
+async def test_indexes_messages_once_and_finds_similar_ones(tmp_path, chat_id):
+    contents = ["how do I repot a fiddle leaf fig", "kubernetes pod keeps restarting"]
+    async with async_session() as session:
+        session.add_all(
+            Message(id=f"mem-{i}", chat_id=chat_id, role="user", content=content)
+            for i, content in enumerate(contents)
+        )
+        await session.commit()
+
+    index = await open_index(tmp_path)
+    hits = await index.search("repot a fiddle leaf fig", k=1)
+    assert hits[0]["message_id"] == "mem-0"
+    excluded = await index.search("repot a fiddle leaf fig", exclude_chat_id=chat_id)
+    assert all(hit["chat_id"] != chat_id for hit in excluded)
+
+    # 다시 열어도 이미 색인한 메시지는 임베딩하지 않음
+    rows = index.index.rows
+    reopened = await open_index(tmp_path)
+    assert reopened.index.rows == rows
+    assert await reopened.index_pending() == 0
+
+    # 임베더가 바뀌면 처음부터 다시 색인
+    changed = MemoryIndex(directory=str(tmp_path), enabled=True)
+    changed.embedder = StubEmbedder(dim=32)
+    await changed._open()
+    assert await changed.index_pending() > 0
+    assert changed.index.dim == 32
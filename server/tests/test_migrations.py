@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.schema import CreateTable
+
+import models  # noqa: F401 (모든 테이블을 metadata에 등록)
+from database import Base, _rebuild_foreign_keys
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """ON DELETE CASCADE가 없던 이전 스키마의 DB"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            ddl = str(CreateTable(table).compile(dialect=conn.dialect))
+            conn.execute(text(ddl.replace(" ON DELETE CASCADE", "")))
+        conn.execute(text("INSERT INTO chats (id, title) VALUES ('c1', 'kept'), ('c2', 'x')"))
+        conn.execute(
+            text(
+                "INSERT INTO messages (rowid, id, chat_id, role, content, status) VALUES "
+                "(10, 'm1', 'c1', 'user', 'hello', 'complete'), "
+                "(20, 'm2', 'c2', 'user', 'bye', 'complete'), "
+                "(30, 'orphan', 'gone', 'user', 'lost', 'complete')"
+            )
+        )
+    # 앱 연결과 같이 FK를 켠 상태에서 마이그레이션
+    event.listen(engine, "connect", lambda c, _: c.execute("PRAGMA foreign_keys=ON"))
+    engine.dispose()
+    yield engine
+    engine.dispose()
+
+
+def on_delete_rules(conn, table: str) -> set[tuple[str, str]]:
+    return {(row[3], row[6]) for row in conn.execute(text(f"PRAGMA foreign_key_list({table})"))}
+
+
+def test_rebuild_adds_cascade_and_keeps_rowids(legacy_engine):
+    with legacy_engine.begin() as conn:
+        assert ("chat_id", "NO ACTION") in on_delete_rules(conn, "messages")
+        _rebuild_foreign_keys(conn)
+
+    with legacy_engine.begin() as conn:
+        assert ("chat_id", "CASCADE") in on_delete_rules(conn, "messages")
+        assert ("chat_id", "CASCADE") in on_delete_rules(conn, "chat_summaries")
+        rows = conn.execute(text("SELECT rowid, id FROM messages ORDER BY rowid")).all()
+        # 고아 행은 빠지고 FTS 색인이 참조하는 rowid는 그대로
+        assert [tuple(row) for row in rows] == [(10, "m1"), (20, "m2")]
+        assert conn.execute(text("PRAGMA foreign_key_check")).all() == []
+
+        conn.execute(text("DELETE FROM chats WHERE id = 'c2'"))
+        remaining = conn.execute(text("SELECT id FROM messages")).scalars().all()
+        assert remaining == ["m1"]
+
+
+def test_rebuild_is_a_no_op_when_rules_match(legacy_engine):
+    with legacy_engine.begin() as conn:
+        _rebuild_foreign_keys(conn)
+    with legacy_engine.begin() as conn:
+        before = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'messages'"))
+        before = before.scalar()
+        _rebuild_foreign_keys(conn)
+        after = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'messages'"))
+        assert after.scalar() == before
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, HTTPException, Response
+from httpx import ASGITransport, AsyncClient
+
+from database import async_session, init_db
+from models.chat import Chat, Message
+from routers.chats import list_chats, list_messages, router
+from services.pagination import decode_cursor, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+BASE = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def test_cursor_round_trip():
+    timestamp = BASE + timedelta(microseconds=123)
+    cursor = encode_cursor(timestamp, "chat|with|pipes")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, "chat|with|pipes")
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", encode_cursor(BASE, "x")[:-3]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+async def db():
+    await init_db()
+    async with async_session() as session:
+        yield session
+
+
+async def test_list_messages_pages_back_without_gaps(db):
+    chat = Chat(id="paged", title="paged", opened_at=datetime.utcnow())
+    # 같은 created_at이 페이지 경계에 걸쳐도 id로 이어져야 함
+    created = [BASE, BASE, BASE, BASE + timedelta(seconds=1), BASE + timedelta(seconds=2)]
+    messages = [
+        Message(id=f"m{i}", chat_id=chat.id, role="user", content=f"text {i}", created_at=at)
+        for i, at in enumerate(created)
+    ]
+    db.add(chat)
+    db.add_all(messages)
+    await db.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = await list_messages(chat.id, limit=2, cursor=cursor, db=db)
+        assert len(page.messages) <= 2
+        # 각 페이지는 오래된 순, 페이지는 최신부터
+        seen = [m.id for m in page.messages] + seen
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == ["m0", "m1", "m2", "m3", "m4"]
+    assert pages == 3
+
+
+async def test_list_messages_rejects_bad_cursor(db):
+    db.add(Chat(id="bad-cursor", title="t", opened_at=datetime.utcnow()))
+    await db.commit()
+    with pytest.raises(HTTPException) as exc:
+        await list_messages("bad-cursor", limit=2, cursor="garbage", db=db)
+    assert exc.value.status_code == 400
+
+
+async def test_list_chats_keyset(db):
+    ids = [f"list-{i}" for i in range(5)]
+    db.add_all(
+        Chat(id=chat_id, title=chat_id, created_at=BASE, updated_at=BASE - timedelta(days=1))
+        for chat_id in ids
+    )
+    await db.commit()
+
+    seen, cursor = [], None
+    while True:
+        response = Response()
+        page = await list_chats(response, limit=2, cursor=cursor, fields="summary", db=db)
+        seen.extend(row.id for row in page if row.id in ids)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    # updated_at이 모두 같으면 id 내림차순
+    assert seen == sorted(ids, reverse=True)
+
+
+async def test_header_only_chat_has_no_messages_key(db):
+    app = FastAPI()
+    app.include_router(router)
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as client:
+        chat = (await client.post("/api/chats", json={"title": "header"})).json()
+        header = await client.get(f"/api/chats/{chat['id']}?include_messages=false")
+        detail = await client.get(f"/api/chats/{chat['id']}")
+
+    # 메시지를 생략한 응답이 빈 채팅처럼 보이지 않아야 함
+    assert "messages" not in header.json()
+    assert detail.json()["messages"] == []
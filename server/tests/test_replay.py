@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from services.replay import ReplayBuffer
+
+pytestmark = pytest.mark.anyio
+
+
+def frame(n: int) -> bytes:
+    return b"data: %d\n\n" % n
+
+
+def event_ids(payload: bytes) -> list[int]:
+    return [int(line[4:]) for line in payload.split(b"\n") if line.startswith(b"id: ")]
+
+
+def gap(payload: bytes) -> dict | None:
+    for block in payload.split(b"\n\n"):
+        if block.startswith(b"event: replay_gap\n"):
+            return json.loads(block.split(b"data: ", 1)[1])
+    return None
+
+
+async def collect(buffer: ReplayBuffer, last_event_id: int | None = None) -> bytes:
+    return b"".join([chunk async for chunk in buffer.subscribe(last_event_id)])
+
+
+async def test_replays_frames_after_last_event_id():
+    buffer = ReplayBuffer("chat", "sse", capacity=8)
+    for n in range(4):
+        buffer.push(frame(n))
+    buffer.close()
+    ids = [event_id for event_id, _ in buffer.frames]
+
+    payload = await collect(buffer, ids[1])
+    assert event_ids(payload) == ids[2:]
+    assert gap(payload) is None
+
+
+async def test_reports_gap_when_frames_were_evicted():
+    buffer = ReplayBuffer("chat", "sse", capacity=3)
+    for n in range(3):
+        buffer.push(frame(n))
+    missed = buffer.last_id
+    for n in range(3, 6):
+        buffer.push(frame(n))
+    buffer.close()
+
+    payload = await collect(buffer, missed - 1)
+    remaining = [event_id for event_id, _ in buffer.frames]
+    assert gap(payload) == {"resume_from": remaining[0]}
+    assert event_ids(payload) == remaining
+
+
+async def test_interleaved_ids_are_not_a_gap():
+    # event id는 모든 스트림이 공유하므로 한 버퍼 안에서 연속이 아님
+    buffer = ReplayBuffer("a", "sse", capacity=4)
+    other = ReplayBuffer("b", "sse", capacity=4)
+    for n in range(3):
+        buffer.push(frame(n))
+        other.push(frame(n))
+    buffer.close()
+    ids = [event_id for event_id, _ in buffer.frames]
+
+    payload = await collect(buffer, ids[0])
+    assert gap(payload) is None
+    assert event_ids(payload) == ids[1:]
+
+
+async def test_slow_subscriber_gets_gap():
+    buffer = ReplayBuffer("chat", "sse", capacity=2)
+    buffer.push(frame(0))
+    stream = buffer.subscribe()
+    first = await stream.__anext__()
+    assert gap(first) is None
+
+    # 구독자가 읽지 않는 동안 링이 한 바퀴 넘게 돎
+    for n in range(1, 5):
+        buffer.push(frame(n))
+    buffer.close()
+    rest = b"".join([chunk async for chunk in stream])
+    remaining = [event_id for event_id, _ in buffer.frames]
+    assert gap(rest) == {"resume_from": remaining[0]}
+    assert event_ids(rest) == remaining
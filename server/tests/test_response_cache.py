@@ -0,0 +1,79 @@
+import unicodedata
+
+import pytest
+
+from services.llm import BaseLLMService, QueuePosition
+from services.response_cache import CachedLLMService, ResponseCache, cache_key
+
+pytestmark = pytest.mark.anyio
+
+
+class CountingLLM(BaseLLMService):
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    async def stream(self, message, model):
+        async for item in self.stream_events(message, model):
+            if isinstance(item, str):
+                yield item
+
+    async def stream_events(self, message, model):
+        self.calls += 1
+        yield QueuePosition(1)
+        yield "hello "
+        if self.fail:
+            raise RuntimeError("upstream failed")
+        yield "world"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_cache_key_normalizes_only_unicode_and_edges():
+    key = cache_key("ollama", "gemma3:1b", "카페")
+    # NFD로 입력된 같은 문자열, 앞뒤 공백은 같은 키
+    assert cache_key("ollama", "gemma3:1b", "  카페\n") == key
+    assert cache_key("ollama", "gemma3:1b", "카페".encode().decode()) == key
+    assert cache_key("ollama", "gemma3:1b", "café") == cache_key("ollama", "gemma3:1b", "café")
+
+    # 줄바꿈/들여쓰기/대소문자는 모델 입력이 달라지므로 다른 키
+    assert cache_key("ollama", "m", "a\n  b") != cache_key("ollama", "m", "a b")
+    assert cache_key("ollama", "m", "Hello") != cache_key("ollama", "m", "hello")
+    assert cache_key("ollama", "m", "hi") != cache_key("ollama", "other", "hi")
+
+
+async def test_second_request_is_served_from_cache(cache):
+    inner = CountingLLM()
+    service = CachedLLMService(inner, "ollama", cache=cache)
+
+    first = [item async for item in service.stream_events("hi", "m")]
+    # miss일 때는 대기열 위치도 그대로 전달
+    assert first == [QueuePosition(1), "hello ", "world"]
+
+    second = [item async for item in service.stream_events(" hi ", "m")]
+    assert second == ["hello ", "world"]
+    assert inner.calls == 1
+
+
+async def test_failed_response_is_not_cached(cache):
+    service = CachedLLMService(CountingLLM(fail=True), "ollama", cache=cache)
+    with pytest.raises(RuntimeError):
+        [chunk async for chunk in service.stream("hi", "m")]
+    assert await cache.get(cache_key("ollama", "m", "hi")) is None
+
+
+async def test_oversized_and_expired_entries(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "small.db"), max_bytes=64, ttl=-1)
+    try:
+        await cache.set("big", ["x" * 4096 + str(i) for i in range(64)])
+        assert await cache.get("big") is None
+        await cache.set("old", ["a"])
+        # ttl이 음수면 저장 즉시 만료
+        assert await cache.get("old") is None
+    finally:
+        cache.close()
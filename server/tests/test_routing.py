@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+import services.routing as routing
+from services.latency import LatencyTracker
+from services.llm import BaseLLMService, QueuePosition
+from services.routing import Route, RoutedLLMService
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeLLM(BaseLLMService):
+    def __init__(self, items=(), error: Exception | None = None, stall: bool = False):
+        self.items = list(items)
+        self.error = error
+        self.stall = stall
+        self.started = 0
+        self.closed = 0
+
+    async def stream(self, message, model):
+        async for item in self.stream_events(message, model):
+            if isinstance(item, str):
+                yield item
+
+    async def stream_events(self, message, model):
+        self.started += 1
+        try:
+            if self.error:
+                raise self.error
+            if self.stall:
+                # 대기열 위치만 계속 알리고 토큰은 보내지 않음
+                for position in range(1000, 0, -1):
+                    yield QueuePosition(position)
+                    await asyncio.sleep(0.01)
+            for item in self.items:
+                yield item
+        finally:
+            self.closed += 1
+
+
+def routed(*services: FakeLLM, hedge: bool = False) -> RoutedLLMService:
+    routes = [Route(f"p{i}", "m", service) for i, service in enumerate(services)]
+    return RoutedLLMService(routes, hedge=hedge, tracker=LatencyTracker())
+
+
+async def collect(service: RoutedLLMService) -> list:
+    async def run():
+        return [item async for item in service.stream_events("hi", "m")]
+
+    return await asyncio.wait_for(run(), 2)
+
+
+async def test_falls_back_when_first_route_fails_before_first_token():
+    primary = FakeLLM(error=RuntimeError("down"))
+    secondary = FakeLLM(["ok"])
+    service = routed(primary, secondary)
+    assert await collect(service) == ["ok"]
+    assert service.last_route.provider == "p1"
+
+
+async def test_raises_last_error_when_every_route_fails():
+    service = routed(FakeLLM(error=RuntimeError("a")), FakeLLM(error=RuntimeError("b")))
+    with pytest.raises(RuntimeError, match="b"):
+        await collect(service)
+
+
+async def test_hedge_deadline_is_not_pushed_back_by_queue_positions(monkeypatch):
+    monkeypatch.setattr(routing, "HEDGE_DEFAULT_DELAY", 0.05)
+    primary = FakeLLM(["late"], stall=True)
+    secondary = FakeLLM(["fast"])
+    service = routed(primary, secondary, hedge=True)
+
+    items = await collect(service)
+    # 첫 경로의 대기열 위치는 hedge 전까지만 전달하고 응답은 먼저 온 쪽
+    assert items[-1] == "fast"
+    assert items[0] == QueuePosition(1000)
+    assert all(isinstance(item, QueuePosition) for item in items[:-1])
+    assert service.last_route.provider == "p1"
+    # 진 경로의 스트림은 정리됨
+    assert primary.closed == 1
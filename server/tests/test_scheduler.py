@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from services.llm import BaseLLMService, QueuePosition
+from services.scheduler import AdmissionScheduler, QueueFullError, ScheduledLLMService
+
+
+def make_scheduler(**limits) -> AdmissionScheduler:
+    scheduler = AdmissionScheduler()
+    scheduler.configure("test", requests_per_minute=0, **limits)
+    return scheduler
+
+
+def test_admits_up_to_limit_then_queues_in_order():
+    scheduler = make_scheduler(max_in_flight=2, model_max_in_flight=2, max_queue=4)
+    running = [scheduler.enqueue("test", "m") for _ in range(2)]
+    waiting = [scheduler.enqueue("test", "m") for _ in range(2)]
+
+    assert all(t.admitted for t in running)
+    assert [t.position for t in waiting] == [1, 2]
+
+    scheduler.release(running[0])
+    assert waiting[0].admitted and waiting[0].position == 0
+    assert waiting[1].position == 1
+
+
+def test_rejects_when_queue_is_full():
+    scheduler = make_scheduler(max_in_flight=1, max_queue=1)
+    scheduler.enqueue("test", "m")
+    scheduler.enqueue("test", "m")
+    assert not scheduler.has_capacity("test")
+
+    with pytest.raises(QueueFullError):
+        scheduler.enqueue("test", "m")
+    stats = scheduler.stats()["test"]
+    assert stats["rejected"] == 1
+    assert stats["queued"] == 1
+
+
+def test_model_limit_does_not_block_other_models():
+    scheduler = make_scheduler(max_in_flight=3, model_max_in_flight=1, max_queue=4)
+    first = scheduler.enqueue("test", "a")
+    second = scheduler.enqueue("test", "a")
+    other = scheduler.enqueue("test", "b")
+
+    assert first.admitted
+    assert not second.admitted and second.position == 1
+    # 앞의 요청이 모델 한도에 걸려 있어도 다른 모델은 입장
+    assert other.admitted
+
+    scheduler.release(first)
+    assert second.admitted
+
+
+def test_cancelled_waiter_leaves_queue():
+    scheduler = make_scheduler(max_in_flight=1, max_queue=4)
+    running = scheduler.enqueue("test", "m")
+    leaving = scheduler.enqueue("test", "m")
+    staying = scheduler.enqueue("test", "m")
+
+    scheduler.release(leaving)
+    scheduler.release(leaving)
+    assert staying.position == 1
+
+    scheduler.release(running)
+    assert staying.admitted
+    assert scheduler.stats()["test"]["in_flight"] == 1
+
+
+class FakeLLM(BaseLLMService):
+    def __init__(self):
+        self.gate = asyncio.Event()
+
+    async def stream(self, message, model):
+        await self.gate.wait()
+        yield "hello"
+
+
+@pytest.mark.anyio
+async def test_scheduled_service_reports_queue_position():
+    scheduler = make_scheduler(max_in_flight=1, max_queue=4)
+    inner = FakeLLM()
+    service = ScheduledLLMService(inner, "test", scheduler)
+
+    first = service.stream_events("hi", "m")
+    first_task = asyncio.create_task(first.__anext__())
+    await asyncio.sleep(0)
+
+    second = service.stream_events("hi", "m")
+    assert await second.__anext__() == QueuePosition(1)
+
+    inner.gate.set()
+    assert await first_task == "hello"
+    await first.aclose()
+    assert await second.__anext__() == "hello"
+    await second.aclose()
+    assert scheduler.stats()["test"]["in_flight"] == 0
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import text
+
+from database import engine, init_db
+from services.compression import compress
+from services.search import SNIPPET_CLOSE, SNIPPET_OPEN, init_search_index, make_snippet, search
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def conn():
+    await init_db()
+    await init_search_index()
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO chats (id, title) VALUES ('s1', 'search chat')"))
+        yield conn
+        await conn.execute(text("DELETE FROM chats WHERE id = 's1'"))
+
+
+async def add_message(conn, message_id: str, content, status: str = "complete"):
+    await conn.execute(
+        text(
+            "INSERT INTO messages (id, chat_id, role, content, status) "
+            "VALUES (:id, 's1', 'user', :content, :status)"
+        ),
+        {"id": message_id, "content": content, "status": status},
+    )
+
+
+async def found(conn, q: str) -> list[str]:
+    # 다른 테스트가 남긴 메시지와 섞이지 않도록 이 채팅 안에서만 검색
+    rows = await search(conn, q, chat_id="s1")
+    return [row["message_id"] for row in rows if row["message_id"]]
+
+
+async def integrity_check(conn):
+    await conn.execute(text("INSERT INTO messages_fts(messages_fts) VALUES ('integrity-check')"))
+
+
+async def test_streaming_message_is_indexed_once_complete(conn):
+    await add_message(conn, "s1-a", "partial aardvark", status="streaming")
+    assert await found(conn, "aardvark") == []
+
+    await conn.execute(
+        text("UPDATE messages SET content = 'final aardvark', status = 'complete' WHERE id = 's1-a'")
+    )
+    assert await found(conn, "aardvark") == ["s1-a"]
+    assert await found(conn, "partial") == []
+    await integrity_check(conn)
+
+
+async def test_edit_and_delete_update_the_index(conn):
+    await add_message(conn, "s1-b", "original bumblebee")
+    await conn.execute(text("UPDATE messages SET content = 'edited bumblebee' WHERE id = 's1-b'"))
+    assert await found(conn, "original") == []
+    assert await found(conn, "edited") == ["s1-b"]
+
+    await conn.execute(text("DELETE FROM chats WHERE id = 's1'"))
+    assert await found(conn, "bumblebee") == []
+    await integrity_check(conn)
+
+
+async def test_compressed_content_stays_searchable(conn):
+    await add_message(conn, "s1-c", "cold chinchilla archive")
+    # cold storage는 같은 원문을 BLOB으로 바꿔 쓰므로 색인은 그대로 유지
+    await conn.execute(
+        text("UPDATE messages SET content = :blob WHERE id = 's1-c'"),
+        {"blob": compress("cold chinchilla archive", "zlib")},
+    )
+    rows = [row for row in await search(conn, "chinchilla", chat_id="s1") if row["message_id"]]
+    assert [row["message_id"] for row in rows] == ["s1-c"]
+    assert SNIPPET_OPEN + "chinchilla" + SNIPPET_CLOSE in rows[0]["snippet"]
+
+    await conn.execute(text("DELETE FROM messages WHERE id = 's1-c'"))
+    assert await found(conn, "chinchilla") == []
+    await integrity_check(conn)
+
+
+def test_make_snippet_marks_prefix_matches():
+    content = " ".join(f"word{i}" for i in range(40)) + " Streaming 응답"
+    snippet = make_snippet(content, "stream", tokens=8)
+    assert snippet.startswith("…")
+    assert snippet.endswith(SNIPPET_OPEN + "Streaming" + SNIPPET_CLOSE + " 응답")
+    assert make_snippet("짧은 문장", "없음") == "짧은 문장"
+
+
+async def test_title_hits_rank_before_message_hits(conn):
+    await conn.execute(text("UPDATE chats SET title = 'dingo notes' WHERE id = 's1'"))
+    # 메시지 색인 쪽 bm25가 더 좋아 보여도 섞지 않고 제목 일치를 먼저
+    await add_message(conn, "s1-d", "dingo dingo dingo")
+    rows = await search(conn, "dingo", chat_id="s1")
+    assert [row["message_id"] for row in rows] == [None, "s1-d"]
+    assert SNIPPET_OPEN + "dingo" + SNIPPET_CLOSE in rows[0]["snippet"]
+    assert "source" not in rows[0]
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+from services.sse import StreamFramer
+
+pytestmark = pytest.mark.anyio
+
+
+async def collect(framer: StreamFramer, chunks) -> list:
+    return [item async for item in framer.coalesce(chunks)]
+
+
+async def from_list(items, delay: float = 0.0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+async def test_small_chunks_are_merged_up_to_the_byte_limit():
+    framer = StreamFramer(coalesce_bytes=4, window=10)
+    frames = await collect(framer, from_list(["a", "b", "c", "d", "e"]))
+    assert frames == ["abcd", "e"]
+    assert framer.tokens == 5
+
+
+async def test_window_flushes_a_partial_buffer():
+    framer = StreamFramer(coalesce_bytes=1024, window=0.01)
+    # chunk 사이 간격이 window보다 길면 모으지 않고 바로 보냄
+    frames = await collect(framer, from_list(["a", "b"], delay=0.05))
+    assert frames == ["a", "b"]
+
+
+async def test_non_text_items_pass_through_unmerged():
+    framer = StreamFramer(coalesce_bytes=1024, window=10)
+    marker = object()
+    frames = await collect(framer, from_list(["a", "b", marker, "c"]))
+    assert frames == ["ab", marker, "c"]
+    assert framer.tokens == 3
+
+
+async def test_upstream_error_flushes_then_raises():
+    async def failing():
+        yield "partial"
+        raise RuntimeError("upstream failed")
+
+    framer = StreamFramer(coalesce_bytes=1024, window=10)
+    frames = []
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        async for frame in framer.coalesce(failing()):
+            frames.append(frame)
+    assert frames == ["partial"]
+
+
+async def test_coalescing_disabled_counts_every_chunk():
+    ticks = []
+    framer = StreamFramer(coalesce_bytes=0, on_token=lambda: ticks.append(1))
+    frames = await collect(framer, from_list(["a", "b"]))
+    assert frames == ["a", "b"]
+    assert len(ticks) == 2
+
+
+def test_frame_encoding():
+    framer = StreamFramer()
+    frame = framer.content("안녕")
+    assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+    assert json.loads(frame[len(b"data: ") :]) == {"content": "안녕"}
+
+    # raw는 줄마다 data 줄로 나눔
+    raw = StreamFramer(framing="raw")
+    assert raw.content("a\nb") == b"data: a\ndata: b\n\n"
+    assert raw.done() == b"data: [DONE]\n\n"
+    assert raw.report()["frames"] == 2
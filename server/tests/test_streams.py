@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from services.streams import StreamRegistry
+
+pytestmark = pytest.mark.anyio
+
+
+class Upstream:
+    """진행/종료가 어느 task에서 일어났는지 기록하는 provider 스트림 흉내"""
+
+    def __init__(self, items, hang: bool = False, error: Exception | None = None):
+        self.items = items
+        self.hang = hang
+        self.error = error
+        self.tasks = set()
+        self.closed_in = None
+
+    async def __call__(self):
+        try:
+            for item in self.items:
+                self.tasks.add(asyncio.current_task())
+                yield item
+            self.tasks.add(asyncio.current_task())
+            if self.error:
+                raise self.error
+            if self.hang:
+                await asyncio.Event().wait()
+        finally:
+            self.closed_in = asyncio.current_task()
+
+
+async def test_cancel_stops_a_silent_upstream_and_closes_it_in_its_own_task():
+    registry = StreamRegistry()
+    active = registry.register("chat")
+    upstream = Upstream(["a"], hang=True)
+
+    received = []
+
+    async def consume():
+        async for chunk in active.guard(upstream()):
+            received.append(chunk)
+            # 토큰이 오지 않는 동안 취소
+            asyncio.get_running_loop().call_later(0.01, registry.cancel, "chat")
+
+    await asyncio.wait_for(consume(), 1)
+    assert received == ["a"]
+    assert active.reason == "user"
+    # generator는 한 task에서만 진행되고 같은 task에서 닫힘
+    assert len(upstream.tasks) == 1
+    assert upstream.closed_in in upstream.tasks
+
+
+async def test_early_close_and_errors():
+    registry = StreamRegistry()
+    active = registry.register("chat")
+
+    upstream = Upstream(["a", "b", "c"])
+    guarded = active.guard(upstream())
+    assert await guarded.__anext__() == "a"
+    await guarded.aclose()
+    assert upstream.closed_in in upstream.tasks
+
+    failing = Upstream(["a"], error=RuntimeError("provider failed"))
+    received = []
+    with pytest.raises(RuntimeError, match="provider failed"):
+        async for chunk in active.guard(failing()):
+            received.append(chunk)
+    assert received == ["a"]
+
+
+def test_finish_records_cancel_stats():
+    registry = StreamRegistry()
+    done = registry.register("a")
+    registry.finish(done, 100)
+    cancelled = registry.register("b")
+    assert registry.idle_for() == 0
+    assert registry.cancel("b", reason="disconnect")
+    assert not registry.cancel("missing")
+    registry.finish(cancelled, 30)
+
+    stats = registry.stats()
+    assert stats["active_streams"] == 0
+    assert stats["cancelled_streams"] == {"disconnect": 1}
+    assert stats["tokens_before_cancel"] == 30
+    assert stats["estimated_tokens_saved"] == 70
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import select
+
+from database import async_session
+from models.chat import Chat, Message
+from services.write_queue import MessageWriteQueue
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def queue():
+    queue = MessageWriteQueue(flush_interval=0.01)
+    yield queue
+    await queue.close()
+
+
+def message(message_id: str, chat_id: str, content: str = "", **values) -> dict:
+    return {"id": message_id, "chat_id": chat_id, "role": "user", "content": content, **values}
+
+
+async def load(message_id: str) -> Message | None:
+    async with async_session() as session:
+        return await session.get(Message, message_id)
+
+
+async def test_insert_then_appends_are_saved_in_order(queue, chat_id):
+    async with async_session() as session:
+        before = (await session.get(Chat, chat_id)).updated_at
+
+    queue.enqueue(message(f"{chat_id}-a", chat_id, role="assistant", status="streaming"))
+    queue.append(f"{chat_id}-a", "hello ", "streaming")
+    await queue.append(f"{chat_id}-a", "world", "complete")
+
+    saved = await load(f"{chat_id}-a")
+    assert (saved.content, saved.status) == ("hello world", "complete")
+    async with async_session() as session:
+        assert (await session.get(Chat, chat_id)).updated_at > before
+
+
+async def test_flush_waits_for_every_pending_write(queue, chat_id):
+    for i in range(20):
+        queue.enqueue(message(f"{chat_id}-{i}", chat_id, str(i)))
+    await queue.flush()
+
+    async with async_session() as session:
+        result = await session.execute(select(Message.id).where(Message.chat_id == chat_id))
+        assert len(result.all()) == 20
+
+
+async def test_failed_write_does_not_drop_the_rest_of_the_batch(queue, chat_id):
+    # 없는 채팅을 참조하는 메시지는 FK 제약으로 실패
+    bad = queue.enqueue(message(f"{chat_id}-bad", "missing", "x"))
+    good = queue.enqueue(message(f"{chat_id}-good", chat_id, "y"))
+    await good
+    with pytest.raises(Exception):
+        await bad
+
+    assert await load(f"{chat_id}-good") is not None
+    assert await load(f"{chat_id}-bad") is None
@@ -13,6 +13,7 @@ export interface MessageResponse {
   chat_id: string
   role: 'user' | 'assistant'
   content: string
+  status?: 'streaming' | 'complete' | 'aborted'
   created_at: string
 }
 